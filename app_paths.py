@@ -0,0 +1,32 @@
+# app_paths.py (Per-user data and cache locations)
+import os
+import sys
+
+APP_NAME = "PyPlay"
+
+
+def _base_dirs():
+    override = os.environ.get("PYPLAY_HOME")
+    if override: return os.path.join(override, "data"), os.path.join(override, "cache")
+    home = os.path.expanduser("~")
+    if sys.platform == "win32":
+        roaming = os.environ.get("APPDATA") or os.path.join(home, "AppData", "Roaming")
+        local = os.environ.get("LOCALAPPDATA") or os.path.join(home, "AppData", "Local")
+        return os.path.join(roaming, APP_NAME), os.path.join(local, APP_NAME, "cache")
+    if sys.platform == "darwin":
+        return os.path.join(home, "Library", "Application Support", APP_NAME), os.path.join(home, "Library", "Caches", APP_NAME)
+    data = os.environ.get("XDG_DATA_HOME") or os.path.join(home, ".local", "share")
+    cache = os.environ.get("XDG_CACHE_HOME") or os.path.join(home, ".cache")
+    return os.path.join(data, APP_NAME), os.path.join(cache, APP_NAME)
+
+
+def data_path(*parts):
+    """Returns a path inside the per-user data folder, creating the folder if needed."""
+    base = _base_dirs()[0]; os.makedirs(base, exist_ok=True)
+    return os.path.join(base, *parts)
+
+
+def cache_path(*parts):
+    """Returns a path inside the per-user cache folder, creating the folder if needed."""
+    base = _base_dirs()[1]; os.makedirs(base, exist_ok=True)
+    return os.path.join(base, *parts)
@@ -0,0 +1,307 @@
+# fake_vlc.py (Simulated python-vlc for benchmarks: the API surface PyPlay uses, without libvlc or a display)
+"""
+Install before anything imports vlc:
+
+    import fake_vlc; sys.modules["vlc"] = fake_vlc
+
+Players run a clock thread per playback, like libvlc's per-player event
+thread: Opening, a few Buffering steps, LengthChanged, Playing, Vout (for
+video files), then TimeChanged + PositionChanged at config.event_rate_hz until
+the end of the media. Media lengths and tracks are derived from the path, so
+runs are reproducible. Objects are counted in `created` and `released`; see live_objects().
+"""
+import os
+import time
+import zlib
+import ctypes
+import threading
+from enum import IntEnum
+from collections import Counter
+from types import SimpleNamespace
+
+__version__ = "3.0.20-simulated"
+
+config = SimpleNamespace(
+    event_rate_hz=50,          # TimeChanged/PositionChanged pairs per second while playing (libvlc 3 sends ~4-50)
+    speed=1.0,                 # media time per wall-clock time
+    open_delay_s=0.005,        # Opening -> Playing
+    frame_rate=25,             # decoded video frames per second of media time, for media stats
+    drop_ratio=0.0,            # share of decoded frames reported lost (late) instead of displayed
+    bitrate_kbps=4000,         # input read rate, for media stats
+    parse_delay_s=0.001,       # parse_with_options -> MediaParsedChanged
+    min_length_ms=60_000, max_length_ms=3_600_000,
+)
+
+created = Counter(); released = Counter()
+
+
+def live_objects():
+    """{kind: simulated libvlc objects created but not released}."""
+    return {kind: n - released[kind] for kind, n in created.items() if n > released[kind]}
+
+
+_AUDIO_EXTENSIONS = {".mp3", ".wav", ".ogg", ".flac", ".aac", ".m4a", ".opus", ".wma"}
+
+
+class State(IntEnum):
+    NothingSpecial = 0; Opening = 1; Buffering = 2; Playing = 3; Paused = 4; Stopped = 5; Ended = 6; Error = 7
+
+
+class EventType(IntEnum):
+    MediaMetaChanged = 0; MediaParsedChanged = 3; MediaStateChanged = 5
+    MediaPlayerOpening = 0x102; MediaPlayerBuffering = 0x103; MediaPlayerPlaying = 0x104; MediaPlayerPaused = 0x105
+    MediaPlayerStopped = 0x106; MediaPlayerEndReached = 0x109; MediaPlayerEncounteredError = 0x10A
+    MediaPlayerTimeChanged = 0x10B; MediaPlayerPositionChanged = 0x10C; MediaPlayerLengthChanged = 0x111; MediaPlayerVout = 0x112
+
+
+class MediaParseFlag(IntEnum): local = 0; network = 1; fetch_local = 2; fetch_network = 4; do_interact = 8
+class MediaParsedStatus(IntEnum): skipped = 1; failed = 2; timeout = 3; done = 4
+class MediaSlaveType(IntEnum): subtitle = 0; audio = 1
+class TrackType(IntEnum): unknown = -1; audio = 0; video = 1; ext = 2
+class Meta(IntEnum):
+    Title = 0; Artist = 1; Genre = 2; Copyright = 3; Album = 4; TrackNumber = 5; Description = 6; Rating = 7; Date = 8
+
+
+class VLCException(Exception): pass
+
+
+class CallbackDecorators:
+    VideoLockCb = ctypes.CFUNCTYPE(ctypes.c_void_p, ctypes.c_void_p, ctypes.POINTER(ctypes.c_void_p))
+    VideoUnlockCb = ctypes.CFUNCTYPE(None, ctypes.c_void_p, ctypes.c_void_p, ctypes.POINTER(ctypes.c_void_p))
+    VideoDisplayCb = ctypes.CFUNCTYPE(None, ctypes.c_void_p, ctypes.c_void_p)
+
+
+def libvlc_get_version(): return b"3.0.20 Vetinari (simulated)"
+def libvlc_get_last_error(): return None
+def libvlc_errmsg(): return b""
+
+
+class _Object:
+    kind = "object"
+
+    def __init__(self): created[self.kind] += 1; self._released = False
+
+    def release(self):
+        if not self._released: self._released = True; released[self.kind] += 1
+
+
+class Event:
+    __slots__ = ("type", "u")
+
+    def __init__(self, event_type, **fields): self.type = event_type; self.u = SimpleNamespace(**fields)
+
+
+class EventManager:
+    def __init__(self): self._callbacks = {}; self._lock = threading.Lock()
+
+    def event_attach(self, event_type, callback, *args, **kwargs):
+        with self._lock: self._callbacks.setdefault(event_type, []).append((callback, args, kwargs))
+        return 0
+
+    def event_detach(self, event_type):
+        with self._lock: self._callbacks.pop(event_type, None)
+
+    def emit(self, event_type, **fields):
+        with self._lock: callbacks = list(self._callbacks.get(event_type, ()))
+        if not callbacks: return
+        event = Event(event_type, **fields)
+        for callback, args, kwargs in callbacks: callback(event, *args, **kwargs)
+
+
+class AudioEqualizer(_Object):
+    kind = "equalizer"
+
+    def __init__(self): super().__init__(); self.preamp = 0.0
+    def set_preamp(self, preamp): self.preamp = preamp; return 0
+    def get_preamp(self): return self.preamp
+
+
+class MediaStats:
+    """libvlc_media_stats_t; Media.get_stats() fills it."""
+    def __init__(self):
+        for name in ("read_bytes", "demux_read_bytes", "demux_corrupted", "demux_discontinuity", "decoded_video", "decoded_audio",
+                     "displayed_pictures", "lost_pictures", "played_abuffers", "lost_abuffers", "sent_packets", "sent_bytes"): setattr(self, name, 0)
+        self.input_bitrate = self.demux_bitrate = self.send_bitrate = 0.0
+
+
+class Media(_Object):
+    kind = "media"
+
+    def __init__(self, mrl):
+        super().__init__()
+        self.mrl = mrl; self.path = _path_of(mrl); self.options = []; self.slaves = []
+        self._events = EventManager(); self._parsed = 0
+        seed = zlib.crc32(self.path.encode("utf-8", "surrogatepass"))
+        self.length_ms = config.min_length_ms + seed % max(1, config.max_length_ms - config.min_length_ms)
+        self.has_video = os.path.splitext(self.path)[1].lower() not in _AUDIO_EXTENSIONS
+        self.decoded_video = 0.0; self.decoded_audio = 0.0; self.read_bytes = 0.0
+
+    def get_mrl(self): return self.mrl
+    def event_manager(self): return self._events
+    def add_option(self, option): self.options.append(option)
+    def add_options(self, *options): self.options.extend(options)
+    def slaves_add(self, slave_type, priority, uri): self.slaves.append((slave_type, priority, uri)); return 0
+
+    def parse_with_options(self, flags, timeout_ms):
+        def finish(): self._parsed = MediaParsedStatus.done; self._events.emit(EventType.MediaParsedChanged, new_status=MediaParsedStatus.done)
+        timer = threading.Timer(config.parse_delay_s, finish); timer.daemon = True; timer.start()
+        return 0
+
+    def get_stats(self, stats):
+        stats.decoded_video = int(self.decoded_video); stats.lost_pictures = int(self.decoded_video * config.drop_ratio)
+        stats.displayed_pictures = stats.decoded_video - stats.lost_pictures
+        stats.decoded_audio = stats.played_abuffers = int(self.decoded_audio)
+        stats.read_bytes = stats.demux_read_bytes = int(self.read_bytes)
+        return True
+
+    def get_parsed_status(self): return self._parsed or MediaParsedStatus.skipped
+    def get_duration(self): return self.length_ms if self._parsed else -1
+    def get_meta(self, meta): return os.path.splitext(os.path.basename(self.path))[0] if meta == Meta.Title else None
+
+    def tracks_get(self):
+        tracks = [SimpleNamespace(type=TrackType.audio, id=1, codec=int.from_bytes(b"mp4a", "little"), description=None, language=b"eng", video=None)]
+        if self.has_video:
+            video = SimpleNamespace(contents=SimpleNamespace(width=1920, height=1080))
+            tracks.insert(0, SimpleNamespace(type=TrackType.video, id=0, codec=int.from_bytes(b"h264", "little"), description=None, language=None, video=video))
+        return tracks
+
+
+def _path_of(mrl):
+    if mrl.startswith("file://"):
+        from urllib.parse import unquote, urlsplit
+        from urllib.request import url2pathname
+        return url2pathname(unquote(urlsplit(mrl).path))
+    return mrl
+
+
+class MediaPlayer(_Object):
+    kind = "player"
+
+    def __init__(self, instance=None):
+        super().__init__()
+        self._media = None; self._state = State.NothingSpecial; self._time_ms = 0.0; self._rate = 1.0; self._volume = 100
+        self._audio_track = 1; self._video_track = 0; self._events = EventManager(); self._lock = threading.RLock()
+        self._thread = None; self._stop = threading.Event(); self._resume = threading.Event(); self._resume.set()
+        self.events_emitted = 0
+
+    def event_manager(self): return self._events
+
+    def _emit(self, event_type, **fields):
+        self.events_emitted += 1; self._events.emit(event_type, **fields)
+
+    def _set_state(self, state, event_type):
+        self._state = state; self._emit(event_type)
+
+    # --- Playback clock (the simulated libvlc event thread) ---
+    def _run(self, media, stop, resume):
+        self._set_state(State.Opening, EventType.MediaPlayerOpening); media.decoded_video = media.decoded_audio = media.read_bytes = 0.0   # libvlc counts per playback
+        if any(o.startswith(":sout=") for o in media.options):   # stream output (loudness analysis): no PCM is simulated
+            self._set_state(State.Ended, EventType.MediaPlayerEndReached); return
+        time.sleep(config.open_delay_s)
+        for cache in (25.0, 50.0, 75.0, 100.0): self._emit(EventType.MediaPlayerBuffering, new_cache=cache)
+        self._emit(EventType.MediaPlayerLengthChanged, new_length=media.length_ms)
+        self._set_state(State.Playing, EventType.MediaPlayerPlaying)
+        if media.has_video: self._emit(EventType.MediaPlayerVout, new_count=1)
+        last = time.perf_counter()
+        while not stop.is_set():
+            if not resume.is_set():
+                resume.wait(0.05); last = time.perf_counter(); continue
+            time.sleep(1.0 / config.event_rate_hz)
+            now = time.perf_counter()
+            with self._lock:
+                if stop.is_set(): return
+                step_s = min(media.length_ms - self._time_ms, (now - last) * 1000.0 * self._rate * config.speed) / 1000.0
+                self._time_ms += step_s * 1000.0; t = self._time_ms
+                media.decoded_audio += step_s * 44100 / 1024; media.read_bytes += step_s * config.bitrate_kbps * 125
+                if media.has_video and self._video_track != -1: media.decoded_video += step_s * config.frame_rate
+            last = now
+            self._emit(EventType.MediaPlayerTimeChanged, new_time=int(t))
+            self._emit(EventType.MediaPlayerPositionChanged, new_position=t / media.length_ms)
+            if t >= media.length_ms:
+                self._set_state(State.Ended, EventType.MediaPlayerEndReached); return
+
+    def _halt(self):
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set(); self._resume.set()
+            if thread is not threading.current_thread(): thread.join()
+
+    # --- python-vlc API ---
+    def set_media(self, media):
+        self._halt(); self._media = media; self._time_ms = 0.0; self._video_track = 0
+        if self._state != State.NothingSpecial: self._state = State.NothingSpecial
+
+    def get_media(self): return self._media
+
+    def play(self):
+        with self._lock:
+            if self._media is None: return -1
+            if self._thread is not None and self._thread.is_alive():
+                if not self._resume.is_set(): self._resume.set(); self._set_state(State.Playing, EventType.MediaPlayerPlaying)
+                return 0
+            if self._state == State.Ended: self._time_ms = 0.0
+            self._stop = threading.Event(); self._resume = threading.Event(); self._resume.set()
+            self._thread = threading.Thread(target=self._run, args=(self._media, self._stop, self._resume), name="SimulatedLibvlcEvents", daemon=True)
+            self._thread.start()
+        return 0
+
+    def set_pause(self, do_pause):
+        if self._thread is None or self._state not in (State.Playing, State.Paused): return
+        if do_pause and self._resume.is_set(): self._resume.clear(); self._set_state(State.Paused, EventType.MediaPlayerPaused)
+        elif not do_pause and not self._resume.is_set(): self._resume.set(); self._set_state(State.Playing, EventType.MediaPlayerPlaying)
+
+    def pause(self): self.set_pause(self._state == State.Playing)
+
+    def stop(self):
+        if self._thread is None and self._state in (State.NothingSpecial, State.Stopped): return
+        self._halt(); self._time_ms = 0.0
+        self._set_state(State.Stopped, EventType.MediaPlayerStopped)
+
+    def release(self): self._halt(); super().release()
+
+    def get_state(self): return self._state
+    def is_playing(self): return int(self._state == State.Playing)
+    def will_play(self): return int(self._media is not None)
+    def is_seekable(self): return self._media is not None
+    def get_time(self): return int(self._time_ms) if self._media is not None else -1
+    def get_length(self): return self._media.length_ms if self._media is not None and self._state in (State.Playing, State.Paused) else 0
+    def get_position(self): return self._time_ms / self._media.length_ms if self._media is not None else -1.0
+
+    def set_time(self, time_ms):
+        with self._lock: self._time_ms = max(0.0, float(time_ms))
+
+    def set_position(self, position):
+        if self._media is not None: self.set_time(position * self._media.length_ms)
+
+    def get_rate(self): return self._rate
+    def set_rate(self, rate): self._rate = float(rate); return 0
+    def audio_get_volume(self): return self._volume
+    def audio_set_volume(self, volume): self._volume = int(volume); return 0
+    def audio_get_track(self): return self._audio_track if self._media is not None else -1
+    def audio_set_track(self, track_id): self._audio_track = track_id; return 0
+    def audio_get_track_description(self): return [(-1, b"Disable"), (1, b"Track 1 - [English]")] if self._media is not None else []
+    def video_get_track_count(self): return int(self._media is not None and self._media.has_video)
+    def video_get_track(self): return self._video_track if self._media is not None and self._media.has_video else -1
+    def video_set_track(self, track_id): self._video_track = track_id; return 0
+    def video_get_track_description(self): return [(-1, b"Disable"), (0, b"Track 1")] if self._media is not None and self._media.has_video else []
+    def video_set_aspect_ratio(self, ratio): pass
+    def video_take_snapshot(self, num, path, width, height): return -1
+    def video_set_callbacks(self, lock, unlock, display, opaque): pass
+    def video_set_format(self, chroma, width, height, pitch): pass
+    def add_slave(self, slave_type, uri, select): return 0
+    def set_equalizer(self, equalizer): return 0
+    def set_xwindow(self, win_id): pass
+    def set_hwnd(self, win_id): pass
+    def set_nsobject(self, win_id): pass
+
+
+class Instance(_Object):
+    kind = "instance"
+
+    def __init__(self, *args): super().__init__(); self.args = list(args[0]) if args and isinstance(args[0], (list, tuple)) else list(args)
+
+    def media_new(self, mrl, *options):
+        media = Media(mrl); media.add_options(*options); return media
+
+    def media_new_path(self, path): return Media(path)
+    def media_player_new(self, uri=None): return MediaPlayer(self)
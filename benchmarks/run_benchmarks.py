@@ -0,0 +1,482 @@
+# run_benchmarks.py (Benchmark suite: playlist, folder scanning, event delivery, the UI on the synthetic engine, startup, the stream cache and duplicate detection, on a simulated libvlc)
+"""
+Runs without media files, libvlc or a display (Qt's offscreen platform is used
+unless QT_QPA_PLATFORM is set), so it works on a headless Linux box:
+
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --quick --only playlist,scan
+    python benchmarks/run_benchmarks.py --output new.json --compare results.json
+
+Every result is one JSON record {"name", "params", "value", "unit", "better",
+"extra"}; --compare matches records by name and params and exits with status
+1 when any value got worse by more than --threshold.
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCH_DIR)
+MAIN_SCRIPT = os.path.join(PROJECT_ROOT, "main.py")
+sys.path[:0] = [BENCH_DIR, PROJECT_ROOT]
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import fake_vlc
+sys.modules["vlc"] = fake_vlc
+from playback_backend import PlaybackState
+
+SCHEMA_VERSION = 1
+GROUPS = ("playlist", "scan", "events", "ui", "startup", "streams", "duplicates")
+# Child processes run main.py with the simulated vlc module installed first.
+_LAUNCHER = ("import sys, runpy; sys.path[:0] = [{bench!r}]; import fake_vlc; sys.modules['vlc'] = fake_vlc; "
+             "sys.argv = [{main!r}] + sys.argv[1:]; runpy.run_path({main!r}, run_name='__main__')")
+
+
+def percentile(values, fraction):
+    if not values: return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def median(values): return percentile(values, 0.5)
+
+
+class Suite:
+    def __init__(self, repeat=3):
+        self.repeat = repeat; self.results = []
+
+    def record(self, name, value, unit, better="lower", params=None, **extra):
+        result = {"name": name, "params": params or {}, "value": round(value, 3), "unit": unit, "better": better,
+                  "extra": {k: (round(v, 3) if isinstance(v, float) else v) for k, v in extra.items()}}
+        self.results.append(result)
+        shown = " ".join(f"{k}={v}" for k, v in result["params"].items())
+        print(f"  {name:<34} {shown:<22} {result['value']:>12} {unit}", flush=True)
+        return result
+
+    def timed(self, fn, setup=None, repeat=None):
+        """Median wall time in seconds of fn(setup()) over repeat runs, and the last return value."""
+        times = []; value = None
+        for _ in range(repeat or self.repeat):
+            arg = setup() if setup else None
+            started = time.perf_counter(); value = fn(arg) if setup else fn(); times.append(time.perf_counter() - started)
+        return median(times), value
+
+
+def spin(app, until, timeout_s):
+    """Processes events until until() is true. Returns False on timeout."""
+    deadline = time.perf_counter() + timeout_s
+    while not until():
+        if time.perf_counter() > deadline: return False
+        app.processEvents(); time.sleep(0.0005)
+    return True
+
+
+# --- Playlist ---
+def synthetic_paths(count, offset=0):
+    extensions = (".mp3", ".flac", ".mkv", ".mp4")
+    return [f"/media/library/Artist {i // 1000:04d}/Album {i // 12 % 500:03d}/{i % 12 + 1:02d} - Song {i:07d}{extensions[i % 4]}"
+            for i in range(offset, offset + count)]
+
+
+def bench_playlist(suite, app, sizes):
+    from playlist_model import PlaylistModel
+    from playlist_search import PlaylistFilterModel
+    from playback_scheduler import PlaybackScheduler
+    print("Playlist")
+    rng = random.Random(1234)
+    for n in sizes:
+        paths = synthetic_paths(n); repeat = suite.repeat if n <= 100_000 else 1; params = {"entries": n}
+
+        def add_batched():
+            model = PlaylistModel()
+            for i in range(0, n, 256): model.add_paths(paths[i:i + 256])   # the folder scanner's batch size
+            return model
+        seconds, model = suite.timed(add_batched, repeat=repeat)
+        suite.record("playlist.add_batched", seconds * 1000, "ms", params=params, entries_per_s=n / seconds,
+                     bytes_per_entry=model.memory_usage()["bytes_per_entry"])
+        seconds, _ = suite.timed(lambda m: m.add_paths(paths), setup=PlaylistModel, repeat=repeat)
+        suite.record("playlist.add_one_batch", seconds * 1000, "ms", params=params, entries_per_s=n / seconds)
+        seconds, _ = suite.timed(lambda: model.add_paths(paths), repeat=repeat)
+        suite.record("playlist.dedupe_all", seconds * 1000, "ms", params=params, entries_per_s=n / seconds)
+        mixed = paths[n // 2:] + synthetic_paths(n // 2, offset=n)
+        def half_new():
+            m = PlaylistModel(); m.add_paths(paths); return m
+        seconds, _ = suite.timed(lambda m: m.add_paths(mixed), setup=half_new, repeat=repeat)
+        suite.record("playlist.add_half_duplicates", seconds * 1000, "ms", params=params)
+
+        scattered = rng.sample(range(n), min(1000, n))
+        seconds, _ = suite.timed(lambda m: m.remove_rows(scattered), setup=half_new, repeat=repeat)
+        suite.record("playlist.remove_scattered", seconds * 1000, "ms", params=dict(params, removed=len(scattered)))
+        block = range(n // 2, n // 2 + n // 10)
+        seconds, _ = suite.timed(lambda m: m.remove_rows(block), setup=half_new, repeat=repeat)
+        suite.record("playlist.remove_block", seconds * 1000, "ms", params=dict(params, removed=len(block)))
+
+        for mode in ("shuffle", "shuffle_folders"):
+            seconds, scheduler = suite.timed(lambda: PlaybackScheduler(model, mode, seed=1), repeat=repeat)
+            scheduler.jump_to(model[0]); steps = min(n, 100_000)
+            started = time.perf_counter()
+            for _ in range(steps): scheduler.advance()
+            step_us = (time.perf_counter() - started) / steps * 1e6
+            suite.record(f"scheduler.{mode}_build", seconds * 1000, "ms", params=params, next_us=step_us)
+        def scheduled_half():
+            m = half_new(); sched = PlaybackScheduler(m, "shuffle", seed=1)
+            m.rowsAboutToBeRemoved.connect(lambda parent, first, last: sched.entries_removed(m[first:last + 1]))
+            return m
+        seconds, _ = suite.timed(lambda m: m.remove_rows(scattered), setup=scheduled_half, repeat=repeat)
+        suite.record("scheduler.remove_scattered", seconds * 1000, "ms", params=dict(params, removed=len(scattered)))
+
+        proxy = PlaylistFilterModel(model)
+        for label, query in (("rare", "song 000004"), ("common", "album 001")):
+            first_ms = []; total_ms = []
+            for _ in range(repeat):
+                proxy.set_query("")
+                started = time.perf_counter(); proxy.set_query(query); first_ms.append((time.perf_counter() - started) * 1000)
+                spin(app, lambda: not proxy.is_searching(), 120); total_ms.append((time.perf_counter() - started) * 1000)
+            suite.record(f"playlist.search_{label}", median(total_ms), "ms", params=params, first_results_ms=median(first_ms), matches=proxy.rowCount())
+        proxy.set_query(""); proxy.setSourceModel(None); del proxy, model
+
+
+# --- Folder scanning ---
+def build_tree(root, files, per_dir=50):
+    """files entries spread over nested folders; a quarter of them are not media (covers, .nfo, .txt)."""
+    extensions = (".mkv", ".mp3", ".flac", ".jpg", ".mp4", ".nfo", ".avi", ".txt")
+    for i in range(0, files, per_dir):
+        folder = os.path.join(root, f"Artist {i // (per_dir * 20):03d}", f"Album {i // per_dir:05d}")
+        os.makedirs(folder, exist_ok=True)
+        for j in range(i, min(files, i + per_dir)):
+            open(os.path.join(folder, f"{j % per_dir:02d} - Track {j}{extensions[j % len(extensions)]}"), "wb").close()
+
+
+def bench_scan(suite, app, files):
+    from folder_scanner import FolderScanner, iter_media_files
+    from media_formats import SUPPORTED_MEDIA_EXTENSIONS
+    print("Folder scanning")
+    root = tempfile.mkdtemp(prefix="pyplay-bench-tree-")
+    try:
+        started = time.perf_counter(); build_tree(root, files)
+        print(f"  (built {files} files in {time.perf_counter() - started:.1f} s)")
+        params = {"files": files}
+        seconds, found = suite.timed(lambda: sum(1 for _ in iter_media_files(root, SUPPORTED_MEDIA_EXTENSIONS)))
+        suite.record("scan.sequential", seconds * 1000, "ms", params=params, matched=found, files_per_s=files / seconds)
+
+        scanner = FolderScanner(SUPPORTED_MEDIA_EXTENSIONS)
+        state = {}
+        scanner.batch_found.connect(lambda batch: state.setdefault("first", time.perf_counter()))
+        scanner.finished.connect(lambda found, cancelled: state.update(done=time.perf_counter(), found=found))
+        totals = []; firsts = []
+        for _ in range(suite.repeat):
+            state.clear(); started = time.perf_counter(); scanner.start(root)
+            spin(app, lambda: "done" in state, 300)
+            totals.append(state["done"] - started); firsts.append(state.get("first", state["done"]) - started)
+        scanner.shutdown()
+        suite.record("scan.threaded", median(totals) * 1000, "ms", params=params, matched=state.get("found"),
+                     first_batch_ms=median(firsts) * 1000, files_per_s=files / median(totals))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+# --- libvlc events -> MediaController -> PlayerWindow slots ---
+def bench_events(suite, app, rates, seconds):
+    from PyQt5.QtCore import QTimer
+    from player_ui import PlayerWindow
+    print("Event delivery")
+    media_dir = tempfile.mkdtemp(prefix="pyplay-bench-media-")
+    files = []
+    for i in range(len(rates)):
+        files.append(os.path.join(media_dir, f"clip {i}.mp4")); open(files[-1], "wb").close()
+    window = PlayerWindow(); window.show()
+    if not spin(app, lambda: window._engine_ready, 10):
+        print("  PlayerWindow did not finish initializing; skipped.", file=sys.stderr); window.close(); return
+    window.open_paths(files)
+    controller = window.media_controller; player = controller.media_player
+    stamps = {}; received = []
+    player.event_manager().event_attach(fake_vlc.EventType.MediaPlayerTimeChanged, lambda e: stamps.__setitem__(e.u.new_time, time.perf_counter()))
+    controller.time_changed.connect(lambda ms: received.append((ms, time.perf_counter())))
+    lag = []; lag_timer = QTimer(); lag_timer.setInterval(10)
+    last_tick = [0.0]
+    def tick():
+        now = time.perf_counter()
+        if last_tick[0]: lag.append(max(0.0, (now - last_tick[0]) * 1000 - 10))
+        last_tick[0] = now
+    lag_timer.timeout.connect(tick)
+    for row, rate in enumerate(rates):
+        fake_vlc.config.event_rate_hz = rate
+        window._play_from_playlist(row)
+        spin(app, lambda: controller.get_state() == PlaybackState.Playing, 10)
+        stamps.clear(); received.clear(); lag.clear(); last_tick[0] = 0.0
+        events_before = player.events_emitted; bridge_before = controller.event_bridge.stats()
+        cpu_before = time.process_time(); started = time.perf_counter(); lag_timer.start()
+        spin(app, lambda: time.perf_counter() - started >= seconds, seconds + 5)
+        lag_timer.stop(); elapsed = time.perf_counter() - started; cpu = time.process_time() - cpu_before
+        events = player.events_emitted - events_before; bridge = controller.event_bridge.stats()
+        latencies = [(at - stamps[ms]) * 1000 for ms, at in received if ms in stamps]
+        delivered = bridge["snapshots_delivered"] - bridge_before["snapshots_delivered"]
+        suite.record("events.ui_latency_p95", percentile(latencies, 0.95) or 0.0, "ms", params={"event_rate_hz": rate},
+                     latency_p50_ms=percentile(latencies, 0.5), libvlc_events_per_s=events / elapsed, ui_updates_per_s=len(received) / elapsed,
+                     snapshots_per_s=delivered / elapsed, cpu_percent=100.0 * cpu / elapsed,
+                     loop_lag_p95_ms=percentile(lag, 0.95), loop_lag_max_ms=max(lag) if lag else None)
+    window.close(); app.processEvents()
+    leaked = fake_vlc.live_objects()
+    suite.record("events.libvlc_objects_leaked", float(sum(leaked.values())), "objects", params={}, by_kind=leaked)
+    shutil.rmtree(media_dir, ignore_errors=True)
+
+
+# --- Whole UI on the synthetic engine (no libvlc at all) ---
+def bench_ui(suite, app, rates, media_count, seconds):
+    from PyQt5.QtCore import QTimer
+    from player_ui import PlayerWindow
+    from synthetic_backend import synthetic_playlist
+    print("UI on the synthetic engine")
+    for rate in rates:
+        # speed makes every made-up track (30 s to 20 min) end within seconds, so track changes are part of the load
+        window = PlayerWindow(backend="synthetic", backend_options={"event_rate_hz": rate, "speed": 600.0, "open_delay_ms": 5}); window.show()
+        if not spin(app, lambda: window._engine_ready, 10):
+            print("  PlayerWindow did not finish initializing; skipped.", file=sys.stderr); window.close(); continue
+        engine = window.media_controller
+        window._handle_opened_files(synthetic_playlist(media_count))
+        spin(app, lambda: engine.get_state() == PlaybackState.Playing, 10)
+        updates = [0]; changes = [0]
+        engine.time_changed.connect(lambda ms: updates.__setitem__(0, updates[0] + 1))
+        engine.media_advanced.connect(lambda path: changes.__setitem__(0, changes[0] + 1))
+        lag = []; lag_timer = QTimer(); lag_timer.setInterval(10); last_tick = [0.0]
+        def tick():
+            now = time.perf_counter()
+            if last_tick[0]: lag.append(max(0.0, (now - last_tick[0]) * 1000 - 10))
+            last_tick[0] = now
+        lag_timer.timeout.connect(tick)
+        events_before = engine.events_posted; cpu_before = time.process_time(); started = time.perf_counter(); lag_timer.start()
+        spin(app, lambda: time.perf_counter() - started >= seconds, seconds + 5)
+        lag_timer.stop(); elapsed = time.perf_counter() - started; cpu = time.process_time() - cpu_before
+        suite.record("ui.loop_lag_p95", percentile(lag, 0.95) or 0.0, "ms", params={"event_rate_hz": rate, "media": media_count},
+                     engine_events_per_s=(engine.events_posted - events_before) / elapsed, ui_updates_per_s=updates[0] / elapsed,
+                     track_changes_per_s=changes[0] / elapsed, cpu_percent=100.0 * cpu / elapsed, loop_lag_max_ms=max(lag) if lag else None)
+        active = {"cpu_percent": 100.0 * cpu / elapsed, "ui_updates_per_s": updates[0] / elapsed}
+        # The same playback with the window minimized: idle mode drops UI updates, rate polling and (audio only) video frames.
+        window.audio_only_minimized_action.setChecked(True); window.showMinimized()
+        if not spin(app, lambda: window.visibility.level == "hidden", 5): print("  The minimized window never went idle.", file=sys.stderr)
+        ui_before = window._ui_updates; frames_before = engine.frames_decoded; cpu_before = time.process_time(); started = time.perf_counter()
+        spin(app, lambda: time.perf_counter() - started >= seconds, seconds + 5)
+        elapsed = time.perf_counter() - started; cpu = time.process_time() - cpu_before
+        suite.record("ui.minimized_cpu", 100.0 * cpu / elapsed, "%", params={"event_rate_hz": rate, "media": media_count},
+                     active_cpu_percent=active["cpu_percent"], ui_updates_per_s=(window._ui_updates - ui_before) / elapsed,
+                     active_ui_updates_per_s=active["ui_updates_per_s"], frames_decoded_per_s=(engine.frames_decoded - frames_before) / elapsed)
+        window.close(); app.processEvents()
+
+
+# --- Startup ---
+def _child_command(*args):
+    return [sys.executable, "-c", _LAUNCHER.format(bench=BENCH_DIR, main=MAIN_SCRIPT), *args]
+
+
+def bench_startup(suite, runs, home):
+    print("Startup")
+    env = dict(os.environ, PYPLAY_HOME=os.path.join(home, "startup"), QT_QPA_PLATFORM=os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    marks = {}; walls = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        proc = subprocess.run(_child_command("--measure-startup"), env=env, capture_output=True, text=True, timeout=120)
+        walls.append((time.perf_counter() - started) * 1000)
+        line = next((l for l in proc.stdout.splitlines() if l.startswith("{")), None)
+        if line is None:
+            print(f"  --measure-startup failed (exit {proc.returncode}): {proc.stderr.strip()[-500:]}", file=sys.stderr); return
+        for name, value in json.loads(line).items():
+            if isinstance(value, (int, float)): marks.setdefault(name, []).append(value)
+    for name in ("first_paint_ms", "interactive_ms", "vlc_ready_ms"):
+        if name in marks: suite.record(f"startup.{name[:-3]}", median(marks[name]), "ms", params={"runs": runs})
+    suite.record("startup.process_wall", median(walls), "ms", params={"runs": runs})
+
+    # A second launch handing its paths to the running player (single instance).
+    primary = subprocess.Popen(_child_command(), env=env, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    try:
+        deadline = time.monotonic() + 30
+        for line in primary.stdout:
+            if "Listening for open requests" in line or time.monotonic() > deadline: break
+        forwards = []
+        for i in range(runs):
+            started = time.perf_counter()
+            proc = subprocess.run(_child_command("--enqueue", f"bench-{i}.mp4"), env=env, capture_output=True, timeout=60)
+            if proc.returncode == 0: forwards.append((time.perf_counter() - started) * 1000)
+        if forwards: suite.record("startup.forward_to_running", median(forwards), "ms", params={"runs": runs})
+    finally:
+        primary.terminate()
+        try: primary.wait(timeout=10)
+        except subprocess.TimeoutExpired: primary.kill()
+
+
+# --- Streams ---
+def _origin_server(payload):
+    """A local HTTP origin with byte-range support serving payload, and its .playlist text at /live/index.m3u8; counts the bytes it sends."""
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+    class Origin(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.startswith("/live/"):
+                body = self.server.playlist.encode("utf-8"); self.send_response(200); self.send_header("Content-Type", "application/vnd.apple.mpegurl")
+                self.send_header("Content-Length", str(len(body))); self.end_headers(); self.wfile.write(body); return
+            start, _, end = (self.headers.get("Range") or "bytes=0-").partition("=")[2].partition("-")
+            start = int(start); end = min(int(end) if end else len(payload) - 1, len(payload) - 1)
+            self.send_response(206); self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(payload)}"); self.send_header("Content-Length", str(end - start + 1)); self.end_headers()
+            self.wfile.write(payload[start:end + 1]); self.server.bytes_sent += end - start + 1
+        def log_message(self, format, *args): pass
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Origin); server.daemon_threads = True; server.bytes_sent = 0; server.playlist = ""
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def bench_streams(suite, size_mb):
+    from urllib.request import Request, urlopen
+    from network_streams import StreamProxy, RangeCache
+    print("Streams")
+    payload = random.Random(7).randbytes(size_mb * 1024 * 1024)
+    origin = _origin_server(payload)
+    base = f"http://127.0.0.1:{origin.server_address[1]}"
+    cache_dir = tempfile.mkdtemp(prefix="pyplay-bench-streams-")
+    proxy = StreamProxy(RangeCache(cache_dir)); proxy.start()
+    try:
+        url = proxy.url_for(f"{base}/media.bin")
+        def fetch(start=None, end=None):
+            headers = {"Range": f"bytes={start}-{end}"} if start is not None else {}
+            with urlopen(Request(url, headers=headers), timeout=60) as response: return response.read()
+        params = {"mb": size_mb}
+        for label in ("cold", "warm"):
+            before = origin.bytes_sent; started = time.perf_counter(); data = fetch()
+            elapsed = time.perf_counter() - started
+            if data != payload: print(f"  {label} read through the proxy returned wrong data", file=sys.stderr)
+            suite.record(f"streams.read_{label}", elapsed * 1000, "ms", params=params, origin_mb=(origin.bytes_sent - before) / 1048576, mb_per_s=size_mb / elapsed)
+        # Seeking back: a range in the middle, already cached.
+        start = len(payload) // 3; before = origin.bytes_sent
+        seek_s, data = suite.timed(lambda: fetch(start, start + 1024 * 1024 - 1))
+        if data != payload[start:start + 1024 * 1024]: print("  seek read through the proxy returned wrong data", file=sys.stderr)
+        suite.record("streams.seek_back_1mb", seek_s * 1000, "ms", params=params, origin_bytes=origin.bytes_sent - before)
+        # HLS: absolute segment links must come back pointing at the proxy.
+        segments = [f"{base}/seg/{i:05d}.ts" for i in range(2000)]
+        origin.playlist = "#EXTM3U\n#EXT-X-TARGETDURATION:6\n" + "".join(f"#EXTINF:6.0,\n{s}\n" for s in segments)
+        rewrite_s, text = suite.timed(lambda: urlopen(proxy.url_for(f"{base}/live/index.m3u8"), timeout=60).read().decode("utf-8"))
+        links = [l for l in text.splitlines() if l and not l.startswith("#")]
+        if links != [proxy.url_for(s) for s in segments]: print("  HLS playlist was not rewritten to the proxy", file=sys.stderr)
+        suite.record("streams.hls_playlist_rewrite", rewrite_s * 1000, "ms", params={"segments": len(segments)})
+    finally:
+        proxy.stop(); origin.shutdown(); origin.server_close(); shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+# --- Duplicate detection ---
+def build_copies(root, files, copy_every=10, per_dir=500):
+    """files small files of a few hundred distinct sizes (so nearly all need a fingerprint); every copy_every-th one is a copy of the one before, in another folder."""
+    rng = random.Random(11); paths = []; previous = None
+    for i in range(files):
+        folder = os.path.join(root, f"Disk {i // per_dir:04d}"); os.makedirs(folder, exist_ok=True)
+        data = previous if i % copy_every == copy_every - 1 else rng.randbytes(1024 + (i % 400) * 16)
+        paths.append(os.path.join(folder, f"{i:06d}.mp3"))
+        with open(paths[-1], "wb") as f: f.write(data)
+        previous = data
+    return paths
+
+
+def bench_duplicates(suite, files):
+    from duplicates import FingerprintCache, find_duplicates
+    print("Duplicate detection")
+    root = tempfile.mkdtemp(prefix="pyplay-bench-dups-")
+    try:
+        started = time.perf_counter(); paths = build_copies(root, files)
+        print(f"  (built {files} files in {time.perf_counter() - started:.1f} s)")
+        cache = FingerprintCache(os.path.join(root, "fingerprints.sqlite3")); params = {"files": files}
+        for label in ("cold", "warm"):   # warm: every fingerprint comes from the cache, no file is read
+            started = time.perf_counter(); groups, stats = find_duplicates(paths, cache); elapsed = time.perf_counter() - started
+            suite.record(f"duplicates.{label}", elapsed * 1000, "ms", params=params, groups=stats["groups"], hashed=stats["hashed"],
+                         cached=stats["cached"], mb_read=stats["bytes_read"] / 1048576, files_per_s=files / elapsed)
+        cache.close()
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+# --- Reporting ---
+def environment():
+    from PyQt5.QtCore import QT_VERSION_STR, PYQT_VERSION_STR
+    try: commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError): commit = None
+    return {"git_commit": commit, "python": platform.python_version(), "qt": QT_VERSION_STR, "pyqt": PYQT_VERSION_STR,
+            "platform": platform.platform(), "machine": platform.machine(), "cpu_count": os.cpu_count(), "vlc": "simulated"}
+
+
+def _key(result): return result["name"], json.dumps(result["params"], sort_keys=True)
+
+
+def compare(results, baseline_path, threshold):
+    """Prints the change of every result against the baseline file. Returns the number of regressions."""
+    with open(baseline_path, "r", encoding="utf-8") as f: baseline = {_key(r): r for r in json.load(f)["results"]}
+    regressions = 0
+    print(f"\nCompared with {baseline_path} (threshold {threshold:.0%}):")
+    for result in results:
+        old = baseline.get(_key(result))
+        if old is None or not old["value"] or not result["value"]: continue
+        change = result["value"] / old["value"] - 1.0
+        worse = change > threshold if result["better"] == "lower" else change < -threshold
+        regressions += worse
+        shown = " ".join(f"{k}={v}" for k, v in result["params"].items())
+        print(f"  {'REGRESSION' if worse else 'ok':<10} {result['name']:<34} {shown:<22} {old['value']:>10} -> {result['value']:>10} {result['unit']} ({change:+.1%})")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="PyPlay benchmarks on a simulated libvlc.")
+    parser.add_argument("--only", default=",".join(GROUPS), help=f"Comma-separated groups to run ({', '.join(GROUPS)}).")
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes and shorter runs, for a quick check.")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Playlist sizes (default 10000,100000,1000000).")
+    parser.add_argument("--scan-files", type=int, default=20000, help="Files in the synthetic folder tree (default 20000).")
+    parser.add_argument("--event-rates", default="50,500,5000", help="Simulated libvlc time events per second (default 50,500,5000).")
+    parser.add_argument("--event-seconds", type=float, default=3.0, help="Seconds of playback per event rate (default 3).")
+    parser.add_argument("--ui-media", type=int, default=100000, help="Playlist entries for the synthetic-engine UI run (default 100000).")
+    parser.add_argument("--startup-runs", type=int, default=5, help="Launches per startup measurement (default 5).")
+    parser.add_argument("--stream-mb", type=int, default=64, help="Size of the resource read through the stream cache, in MiB (default 64).")
+    parser.add_argument("--dup-files", type=int, default=20000, help="Files checked for duplicates (default 20000).")
+    parser.add_argument("--repeat", type=int, default=3, help="Repetitions of each micro-benchmark; the median is kept (default 3).")
+    parser.add_argument("--output", metavar="FILE", help="Write the results as JSON to FILE.")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare with an earlier --output file; exit status 1 on regressions.")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Relative change counted as a regression (default 0.15).")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.sizes = "10000,100000"; args.scan_files = min(args.scan_files, 5000); args.event_seconds = 1.0; args.ui_media = min(args.ui_media, 10000)
+        args.startup_runs = min(args.startup_runs, 3); args.repeat = 1
+        args.stream_mb = min(args.stream_mb, 16); args.dup_files = min(args.dup_files, 5000)
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    groups = [g.strip() for g in args.only.split(",") if g.strip()]
+    unknown = set(groups) - set(GROUPS)
+    if unknown: print(f"Unknown benchmark group(s): {', '.join(sorted(unknown))}", file=sys.stderr); return 2
+    home = tempfile.mkdtemp(prefix="pyplay-bench-home-")
+    os.environ["PYPLAY_HOME"] = home   # history, caches and the single-instance lock stay out of the user's profile
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    suite = Suite(repeat=max(1, args.repeat)); started = time.time()
+    try:
+        if "playlist" in groups: bench_playlist(suite, app, [int(s) for s in args.sizes.split(",") if s])
+        if "scan" in groups: bench_scan(suite, app, args.scan_files)
+        if "events" in groups: bench_events(suite, app, [int(r) for r in args.event_rates.split(",") if r], args.event_seconds)
+        if "ui" in groups: bench_ui(suite, app, [int(r) for r in args.event_rates.split(",") if r], args.ui_media, args.event_seconds)
+        if "startup" in groups: bench_startup(suite, args.startup_runs, home)
+        if "streams" in groups: bench_streams(suite, args.stream_mb)
+        if "duplicates" in groups: bench_duplicates(suite, args.dup_files)
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
+    report = {"schema": SCHEMA_VERSION, "suite": "pyplay", "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(started)),
+              "duration_s": round(time.time() - started, 1), "environment": environment(), "results": suite.results}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f: json.dump(report, f, indent=1)
+        print(f"Results written to {args.output}.")
+    if args.compare: return 1 if compare(suite.results, args.compare, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
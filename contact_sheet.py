@@ -0,0 +1,180 @@
+# contact_sheet.py (Parallel contact-sheet / batch snapshot export over a process pool)
+import os
+import sys
+import time
+import zlib
+import hashlib
+import struct
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from lazy_import import lazy_import
+vlc = lazy_import("vlc")
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from video_frames import FrameGrabber, source_video_size
+
+_worker_instance = None
+
+
+def _png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+
+def encode_png(rgb, width, height):
+    """Encodes packed 8-bit RGB rows as a PNG without any imaging dependency."""
+    stride = width * 3
+    raw = b"".join(b"\x00" + rgb[y * stride:(y + 1) * stride] for y in range(height))
+    return (b"\x89PNG\r\n\x1a\n" + _png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + _png_chunk(b"IDAT", zlib.compress(raw, 6)) + _png_chunk(b"IEND", b""))
+
+
+def bgrx_to_rgb(frame):
+    """Converts libvlc RV32 (BGRX in memory) to packed RGB with three strided slice copies."""
+    rgb = bytearray(len(frame) // 4 * 3)
+    rgb[0::3] = frame[2::4]; rgb[1::3] = frame[1::4]; rgb[2::3] = frame[0::4]
+    return rgb
+
+
+def build_sheet(tiles, tile_width, tile_height, columns, padding=4, background=(16, 16, 16)):
+    """Lays RGB tiles out on a grid. Returns (rgb, width, height)."""
+    columns = max(1, min(columns, len(tiles))); rows = (len(tiles) + columns - 1) // columns
+    width = columns * tile_width + (columns + 1) * padding; height = rows * tile_height + (rows + 1) * padding
+    sheet = bytearray(bytes(background) * (width * height))
+    tile_stride = tile_width * 3; sheet_stride = width * 3
+    for i, tile in enumerate(tiles):
+        x = padding + (i % columns) * (tile_width + padding); y = padding + (i // columns) * (tile_height + padding)
+        for row in range(tile_height):
+            start = (y + row) * sheet_stride + x * 3
+            sheet[start:start + tile_stride] = tile[row * tile_stride:(row + 1) * tile_stride]
+    return sheet, width, height
+
+
+def sheet_timestamps(duration_ms, count=None, interval_ms=None):
+    """Evenly spaced timestamps (frame centres), or one every interval_ms."""
+    if duration_ms <= 0: return [0]
+    if interval_ms:
+        return list(range(int(interval_ms / 2), int(duration_ms), int(interval_ms))) or [0]
+    count = max(1, count or 16)
+    return [int((i + 0.5) * duration_ms / count) for i in range(count)]
+
+
+def export_contact_sheet(job):
+    """Process-pool worker: grabs the frames for one file and writes job["output_name"] (<name>_sheet.png). Returns a result dict."""
+    global _worker_instance
+    started = time.perf_counter(); path = job["path"]
+    result = {"path": path, "output": None, "frames": 0, "seconds": 0.0, "error": None}
+    try:
+        if _worker_instance is None:
+            _worker_instance = vlc.Instance(["--quiet", "--no-audio", "--no-xlib", "--no-osd", "--no-spu", "--no-sub-autodetect-file"])
+        media = _worker_instance.media_new_path(path)
+        try:
+            if not source_video_size(media): raise ValueError("no video track")
+            duration_ms = media.get_duration()
+        finally:
+            media.release()
+        timestamps = job.get("timestamps") or sheet_timestamps(duration_ms, job.get("count"), job.get("interval_ms"))
+        grabber = FrameGrabber(_worker_instance, job.get("tile_width", 320), job.get("tile_height", 320))
+        try:
+            if not grabber.open(path): raise ValueError("no video track")
+            tiles = []
+            for time_ms in timestamps:
+                frame = grabber.grab(time_ms)
+                if frame is not None: tiles.append(bgrx_to_rgb(frame))
+            width, height = grabber.width, grabber.height
+        finally:
+            grabber.close()
+        if not tiles: raise ValueError("no frames could be decoded")
+        sheet, sheet_width, sheet_height = build_sheet(tiles, width, height, job.get("columns", 4))
+        os.makedirs(job["output_dir"], exist_ok=True)
+        output = os.path.join(job["output_dir"], job.get("output_name") or sheet_name(path))
+        with open(output, "wb") as f: f.write(encode_png(bytes(sheet), sheet_width, sheet_height))
+        result.update(output=output, frames=len(tiles))
+    except Exception as e:
+        result["error"] = str(e)
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+def sheet_name(path, unique=False):
+    """<name>_sheet.png; unique adds a short hash of the full path, for files of the same name in different folders."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if unique: stem += "_" + hashlib.blake2b(os.path.abspath(path).encode("utf-8", "surrogateescape"), digest_size=4).hexdigest()
+    return stem + "_sheet.png"
+
+
+def make_jobs(paths, output_dir, count=16, interval_ms=None, columns=4, tile_width=320, tile_height=320):
+    # S01/episode1.mkv and S02/episode1.mkv would write the same sheet; names shared in the batch (ignoring case) get a path hash.
+    names = [sheet_name(p).lower() for p in paths]; shared = {n for n, uses in Counter(names).items() if uses > 1}
+    return [{"path": p, "output_dir": output_dir, "output_name": sheet_name(p, unique=n in shared), "count": count, "interval_ms": interval_ms,
+             "columns": columns, "tile_width": tile_width, "tile_height": tile_height} for p, n in zip(paths, names)]
+
+
+def summarize(results, elapsed):
+    done = sum(1 for r in results if r["output"]); failed = len(results) - done
+    per_minute = (len(results) / elapsed * 60.0) if elapsed > 0 else 0.0
+    return f"Contact sheets: {done} written, {failed} failed in {elapsed:.1f} s ({per_minute:.1f} files/min)."
+
+
+def _process_pool(workers):
+    # Spawned, not forked: a fork of the GUI process copies locks held by its libvlc and Qt threads into the workers.
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count(), mp_context=multiprocessing.get_context("spawn"))
+
+
+def run_batch(jobs, workers=None, on_result=None):
+    """Runs jobs on a process pool (one libvlc instance per worker). Returns (results, elapsed seconds)."""
+    started = time.perf_counter(); results = []
+    with _process_pool(workers) as pool:
+        for future in as_completed([pool.submit(export_contact_sheet, job) for job in jobs]):
+            result = future.result(); results.append(result)
+            if on_result: on_result(result)
+    return results, time.perf_counter() - started
+
+
+def run_cli(args):
+    """Entry point for main.py --contact-sheet. Returns the process exit code."""
+    from headless import expand_inputs
+    paths = expand_inputs(args.paths)
+    if not paths: print("Contact sheets: no media files given.", file=sys.stderr); return 2
+    jobs = make_jobs(paths, args.contact_sheet, count=args.frames, interval_ms=int(args.interval * 1000) if args.interval else None,
+                     columns=args.columns, tile_width=args.tile_width, tile_height=args.tile_width)
+    def report(result):
+        if result["error"]: print(f"FAILED {result['path']}: {result['error']}", file=sys.stderr)
+        else: print(f"{result['output']} ({result['frames']} frames, {result['seconds']:.1f} s)")
+    results, elapsed = run_batch(jobs, workers=args.workers, on_result=report)
+    print(summarize(results, elapsed))
+    return 0 if all(r["output"] for r in results) else 1
+
+
+class ContactSheetExporter(QObject):
+    """Runs a batch from the GUI without blocking it; results arrive as queued signals."""
+    file_done = pyqtSignal(dict)
+    finished = pyqtSignal(str)   # summary line
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pool = None; self._pending = 0; self._results = []; self._started = 0.0
+
+    def is_running(self): return self._pending > 0
+
+    def start(self, jobs, workers=None):
+        if self.is_running() or not jobs: return False
+        self._pool = _process_pool(workers)
+        self._pending = len(jobs); self._results = []; self._started = time.perf_counter()
+        for job in jobs: self._pool.submit(export_contact_sheet, job).add_done_callback(self._job_done)
+        return True
+
+    def _job_done(self, future):
+        try: result = future.result()
+        except Exception as e: result = {"path": None, "output": None, "frames": 0, "seconds": 0.0, "error": str(e)}
+        self._results.append(result); self._pending -= 1
+        self.file_done.emit(result)
+        if self._pending == 0:
+            summary = summarize(self._results, time.perf_counter() - self._started); print(summary)
+            self.finished.emit(summary)
+            self._pool.shutdown(wait=False); self._pool = None
+
+    def shutdown(self):
+        if self._pool is not None: self._pool.shutdown(wait=False, cancel_futures=True); self._pool = None
+        self._pending = 0
@@ -0,0 +1,217 @@
+# duplicates.py (Finds the same recording under several paths: size first, then a partial content fingerprint cached by path+mtime)
+import os
+import sys
+import mmap
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from app_paths import cache_path
+import tracing
+
+FINGERPRINT_DB_NAME = "fingerprints.sqlite3"
+BLOCK_SIZE = 64 * 1024   # bytes hashed at the head, middle and tail; files up to three blocks are hashed whole
+CHUNK_SIZE = 256         # files per worker job
+_LOOKUP_BATCH = 500      # paths per "IN (...)" query, below SQLite's old 999-variable limit
+
+
+def fingerprint(path, block_size=BLOCK_SIZE):
+    """
+    Returns (size, mtime_ns, digest, bytes_read) of the file: a BLAKE2b of
+    its size and its head, middle and tail blocks, read through mmap so only
+    those pages are touched. Size and mtime come from the open file, so the
+    digest is cached under the identity it was computed from.
+    """
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno()); size = st.st_size
+        digest = hashlib.blake2b(size.to_bytes(8, "little"), digest_size=16)
+        offsets = [0] if size <= 3 * block_size else [0, (size - block_size) // 2, size - block_size]
+        length = size if len(offsets) == 1 else block_size
+        if size:   # mmap refuses empty files
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                    for offset in offsets: digest.update(view[offset:offset + length])
+            except (ValueError, OSError):   # files some filesystems cannot map (e.g. FUSE, pipes); plain reads give the same digest
+                digest = hashlib.blake2b(size.to_bytes(8, "little"), digest_size=16)
+                for offset in offsets: f.seek(offset); digest.update(f.read(length))
+    return size, st.st_mtime_ns, digest.hexdigest(), length * len(offsets) if size else 0
+
+
+class FingerprintCache:
+    """
+    SQLite store of fingerprints keyed by path and valid only while the
+    file's size and mtime match, like LoudnessCache. lookup() checks many
+    paths per query, so a 100k-file check costs a few hundred queries and
+    reads no unchanged file again.
+    """
+    def __init__(self, db_path=None):
+        self.db_path = db_path or cache_path(FINGERPRINT_DB_NAME)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL"); self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS fingerprints (
+            path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, block_size INTEGER, digest TEXT, fingerprinted_at REAL) WITHOUT ROWID""")
+        self._conn.commit()
+
+    def lookup(self, identities, block_size=BLOCK_SIZE):
+        """identities: {path: (size, mtime_ns)}. Returns {path: digest} for the paths whose stored fingerprint still matches."""
+        paths = list(identities); found = {}
+        for i in range(0, len(paths), _LOOKUP_BATCH):
+            batch = paths[i:i + _LOOKUP_BATCH]
+            with self._lock:
+                rows = self._conn.execute(f"SELECT path, size, mtime_ns, block_size, digest FROM fingerprints WHERE path IN ({', '.join('?' * len(batch))})",
+                                          batch).fetchall()
+            for path, size, mtime_ns, stored_block, digest in rows:
+                if (size, mtime_ns) == identities[path] and stored_block == block_size: found[path] = digest
+        return found
+
+    def put_many(self, entries, block_size=BLOCK_SIZE):
+        """entries: (path, size, mtime_ns, digest) tuples, written in one transaction."""
+        if not entries: return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO fingerprints (path, size, mtime_ns, block_size, digest, fingerprinted_at) VALUES (?, ?, ?, ?, ?, ?)",
+                                   [(path, size, mtime_ns, block_size, digest, now) for path, size, mtime_ns, digest in entries])
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            try: self._conn.close()
+            except Exception: pass
+
+
+def _stat_chunk(paths):
+    results = []
+    for path in paths:
+        try: st = os.stat(path)
+        except OSError: continue
+        results.append((path, st.st_size, st.st_mtime_ns, (st.st_dev, st.st_ino)))
+    return results
+
+
+def _fingerprint_chunk(paths, block_size):
+    results = []; failed = 0; bytes_read = 0
+    for path in paths:
+        try: size, mtime_ns, digest, read = fingerprint(path, block_size)
+        except OSError as e:
+            failed += 1; print(f"Warning: Could not fingerprint {path}: {e}", file=sys.stderr); continue
+        results.append((path, size, mtime_ns, digest)); bytes_read += read
+    return results, failed, bytes_read
+
+
+def _chunks(items, size): return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def find_duplicates(paths, cache=None, max_workers=None, block_size=BLOCK_SIZE, progress=None, cancel_event=None):
+    """
+    Groups paths holding the same content. Returns (groups, stats): groups
+    are lists of two or more paths in input order, ordered by their first
+    path. Only files whose size another file shares are fingerprinted, paths
+    of one file (hard links, the same inode through a bind mount) need no
+    hashing, and cached fingerprints of unchanged files are reused.
+    progress(done, total) is called from worker threads while hashing.
+    """
+    started = time.perf_counter(); paths = list(dict.fromkeys(paths))
+    stats = {"files": len(paths), "candidates": 0, "cached": 0, "hashed": 0, "failed": 0, "bytes_read": 0, "groups": 0, "duplicates": 0}
+    cancelled = lambda: cancel_event is not None and cancel_event.is_set()
+    trace = tracing.begin_async("find_duplicates", files=len(paths))
+    with ThreadPoolExecutor(max_workers=max_workers or min(8, (os.cpu_count() or 1) * 2), thread_name_prefix="PyPlayDuplicates") as executor:
+        # 1. Sizes: a file with a size of its own has no duplicate (and empty files are not recordings).
+        by_size = defaultdict(list)
+        for chunk in executor.map(_stat_chunk, _chunks(paths, CHUNK_SIZE)):
+            for path, size, mtime_ns, inode in chunk: by_size[size].append((path, mtime_ns, inode))
+        if cancelled(): tracing.end_async(trace, cancelled=True); return [], stats
+        keys = {}; to_check = {}   # path -> group key; inode representative -> (size, mtime_ns)
+        for size, entries in by_size.items():
+            if len(entries) < 2 or not size: continue
+            representatives = {}
+            for path, mtime_ns, inode in entries: representatives.setdefault(inode, (path, mtime_ns))
+            if len(representatives) == 1:
+                for path, _mtime, inode in entries: keys[path] = (size, inode)
+                continue
+            for path, mtime_ns, inode in entries:
+                representative = representatives[inode][0]; keys[path] = representative
+                if path == representative: to_check[path] = (size, mtime_ns)
+        stats["candidates"] = len(keys)
+        # 2. Fingerprints: cached ones while size and mtime match, the rest read on the pool.
+        cached = cache.lookup(to_check, block_size) if cache else {}
+        digests = {path: (to_check[path][0], digest) for path, digest in cached.items()}
+        stats["cached"] = len(digests)
+        missing = [p for p in to_check if p not in digests]; done = 0
+        for results, failed, bytes_read in executor.map(lambda chunk: _fingerprint_chunk(chunk, block_size) if not cancelled() else ([], 0, 0),
+                                                        _chunks(missing, CHUNK_SIZE)):
+            for path, size, mtime_ns, digest in results: digests[path] = (size, digest)
+            if cache: cache.put_many(results, block_size)
+            stats["hashed"] += len(results); stats["failed"] += failed; stats["bytes_read"] += bytes_read
+            done += len(results) + failed
+            if progress: progress(done, len(missing))
+        if cancelled(): tracing.end_async(trace, cancelled=True); return [], stats
+    # 3. Groups: same size and digest, or the same inode.
+    grouped = defaultdict(list)
+    for path in paths:
+        key = keys.get(path)
+        if key is None: continue
+        if isinstance(key, str):
+            if key not in digests: continue   # unreadable
+            key = digests[key]
+        grouped[key].append(path)
+    groups = [group for group in grouped.values() if len(group) > 1]
+    stats["groups"] = len(groups); stats["duplicates"] = sum(len(g) - 1 for g in groups); stats["seconds"] = round(time.perf_counter() - started, 3)
+    tracing.end_async(trace, **{k: v for k, v in stats.items() if k != "files"})
+    return groups, stats
+
+
+def summarize(stats):
+    megabytes = stats["bytes_read"] / 1048576
+    return (f"{stats['duplicates']} duplicate(s) in {stats['groups']} group(s) among {stats['files']} files "
+            f"({stats['hashed']} fingerprinted, {megabytes:.1f} MiB read, {stats['cached']} cached) in {stats.get('seconds', 0):.1f} s.")
+
+
+class DuplicateFinder(QObject):
+    """
+    Runs find_duplicates() on a background thread with a FingerprintCache
+    opened on first use. Signals are emitted from that thread and arrive
+    queued on the GUI thread. A new start() cancels a check in progress.
+    """
+    progress = pyqtSignal(int, int)        # files fingerprinted, files to fingerprint
+    finished = pyqtSignal(object, object)  # groups, stats (None when cancelled)
+
+    def __init__(self, max_workers=None, parent=None):
+        super().__init__(parent)
+        self.max_workers = max_workers; self.cache = None
+        self._cancel_event = threading.Event(); self._cancel_event.set(); self._thread = None
+
+    def is_running(self): return self._thread is not None and self._thread.is_alive() and not self._cancel_event.is_set()
+
+    def start(self, paths):
+        self.cancel()
+        if self.cache is None:
+            try: self.cache = FingerprintCache()
+            except sqlite3.Error as e: print(f"Warning: Fingerprint cache unavailable, every file will be read: {e}", file=sys.stderr)
+        cancel_event = threading.Event(); self._cancel_event = cancel_event
+        self._thread = threading.Thread(target=self._run, args=(list(paths), cancel_event), name="PyPlayDuplicateFinder", daemon=True)
+        self._thread.start()
+
+    def _run(self, paths, cancel_event):
+        try:
+            groups, stats = find_duplicates(paths, self.cache, self.max_workers, progress=lambda done, total: self.progress.emit(done, total),
+                                            cancel_event=cancel_event)
+        except Exception as e:
+            print(f"ERROR: Duplicate check failed: {e}", file=sys.stderr); groups, stats = [], None
+        if cancel_event.is_set(): return
+        cancel_event.set()
+        if stats: print(summarize(stats))
+        self.finished.emit(groups, stats)
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def shutdown(self):
+        self.cancel()
+        if self._thread is not None: self._thread.join(timeout=2.0); self._thread = None
+        if self.cache is not None: self.cache.close(); self.cache = None
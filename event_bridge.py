@@ -0,0 +1,68 @@
+# event_bridge.py (Coalescing bridge from libvlc callback threads to the Qt UI)
+from collections import namedtuple
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+PlaybackSnapshot = namedtuple("PlaybackSnapshot", "time_ms position length_ms seq")
+
+
+class PlaybackEventBridge(QObject):
+    """
+    libvlc threads post values into a single latest-value slot: an immutable
+    PlaybackSnapshot that is replaced, never mutated, so reading it needs no lock.
+    A GUI-thread timer delivers at most one snapshot per frame, and only when
+    something changed since the previous delivery. Each bridge expects one
+    writer thread (libvlc uses one event thread per media player).
+    """
+    snapshot_ready = pyqtSignal(object)
+
+    def __init__(self, rate_hz=10, parent=None):
+        super().__init__(parent)
+        self._slot = PlaybackSnapshot(-1, -1.0, -1, 0)
+        self._delivered_seq = 0
+        self.events_received = 0; self.snapshots_delivered = 0
+        self._timer = QTimer(self); self._timer.timeout.connect(self._deliver)
+        self.set_rate(rate_hz)
+
+    def set_rate(self, rate_hz):
+        """Sets how many snapshots per second may reach the UI."""
+        self.rate_hz = max(1, int(rate_hz)); self._timer.setInterval(int(1000 / self.rate_hz))
+
+    def start(self): self._timer.start()
+    def stop(self): self._timer.stop()
+    def is_active(self): return self._timer.isActive()
+
+    # --- Writer side (libvlc event thread) ---
+    def post_time(self, time_ms):
+        slot = self._slot; self.events_received += 1
+        self._slot = slot._replace(time_ms=time_ms, seq=slot.seq + 1)
+
+    def post_position(self, position):
+        slot = self._slot; self.events_received += 1
+        self._slot = slot._replace(position=position, seq=slot.seq + 1)
+
+    def post_length(self, length_ms):
+        slot = self._slot; self.events_received += 1
+        self._slot = slot._replace(length_ms=length_ms, seq=slot.seq + 1)
+
+    def reset(self):
+        slot = self._slot
+        self._slot = PlaybackSnapshot(-1, -1.0, -1, slot.seq + 1)
+
+    # --- Reader side (GUI thread) ---
+    def latest(self): return self._slot
+
+    def _deliver(self):
+        slot = self._slot
+        if slot.seq == self._delivered_seq: return
+        self._delivered_seq = slot.seq; self.snapshots_delivered += 1
+        self.snapshot_ready.emit(slot)
+
+    def flush(self):
+        """Delivers any pending snapshot immediately (e.g. after a seek)."""
+        self._deliver()
+
+    def stats(self):
+        received, delivered = self.events_received, self.snapshots_delivered
+        return {"events_received": received, "snapshots_delivered": delivered, "rate_hz": self.rate_hz,
+                "coalesced_ratio": (1.0 - delivered / received) if received else 0.0}
@@ -0,0 +1,144 @@
+# folder_scanner.py (Recursive os.scandir media scanner running on a worker pool)
+import os
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+def _scan_directory(path, extensions, follow_symlinks):
+    """Lists one directory. Returns (sorted matching files, subdirectories)."""
+    files = []; subdirs = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    if follow_symlinks or not entry.is_symlink(): subdirs.append(entry.path)
+                elif os.path.splitext(entry.name)[1].lower() in extensions and entry.is_file():
+                    files.append(entry.path)
+            except OSError:
+                continue
+    files.sort(); subdirs.sort()
+    return files, subdirs
+
+
+def iter_media_files(root, extensions, max_depth=None, follow_symlinks=False, cancel_event=None):
+    """Sequential depth-first variant of the scanner, for callers without an event loop."""
+    extensions = frozenset(ext.lower() for ext in extensions)
+    visited = set(); stack = [(root, 0)]
+    while stack:
+        if cancel_event is not None and cancel_event.is_set(): return
+        path, depth = stack.pop()
+        if follow_symlinks:
+            try: st = os.stat(path); key = (st.st_dev, st.st_ino)
+            except OSError: continue
+            if key in visited: continue
+            visited.add(key)
+        try: files, subdirs = _scan_directory(path, extensions, follow_symlinks)
+        except OSError: continue
+        yield from files
+        if max_depth is None or depth < max_depth:
+            stack.extend((d, depth + 1) for d in reversed(subdirs))
+
+
+class _ScanRun:
+    """State of one scan. Tasks of a cancelled run keep updating their own run only, never the one that replaced it."""
+    def __init__(self, pending):
+        self.lock = threading.Lock(); self.cancel_event = threading.Event()
+        self.pending = pending; self.dirs_scanned = 0; self.files_found = 0; self.errors = 0
+        self.buffer = []; self.last_flush = 0.0; self.visited = set()
+
+
+class FolderScanner(QObject):
+    """
+    Walks folder trees with os.scandir on a thread pool, one task per directory,
+    and streams matches back as sorted batches. Signals are emitted from worker
+    threads and arrive queued on the GUI thread.
+    """
+    batch_found = pyqtSignal(list)
+    progress = pyqtSignal(int, int)      # directories scanned, files matched
+    finished = pyqtSignal(int, bool)     # files matched, cancelled
+
+    def __init__(self, extensions, max_depth=None, follow_symlinks=False, max_workers=4,
+                 batch_size=256, flush_interval=0.1, parent=None):
+        super().__init__(parent)
+        self.extensions = frozenset(ext.lower() for ext in extensions)
+        self.max_depth = max_depth; self.follow_symlinks = follow_symlinks
+        self.batch_size = batch_size; self.flush_interval = flush_interval
+        self._max_workers = max_workers; self._executor = None
+        self._run = None
+
+    def is_running(self): return self._run is not None and not self._run.cancel_event.is_set()
+
+    def start(self, root_paths):
+        """Starts a new scan, cancelling any scan still in progress."""
+        self.cancel()
+        if isinstance(root_paths, str): root_paths = [root_paths]
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="PyPlayScan")
+        run = _ScanRun(len(root_paths)); self._run = run
+        if not root_paths:
+            run.cancel_event.set(); self.finished.emit(0, False); return
+        for root in root_paths: self._executor.submit(self._scan_task, run, root, 0)
+
+    def cancel(self):
+        run = self._run
+        if run is None or run.cancel_event.is_set(): return
+        run.cancel_event.set()
+        with run.lock: files_found = run.files_found; run.buffer = []
+        self.finished.emit(files_found, True)
+
+    def shutdown(self):
+        self.cancel()
+        if self._executor: self._executor.shutdown(wait=False, cancel_futures=True); self._executor = None
+
+    def _scan_task(self, run, path, depth):
+        try:
+            if run.cancel_event.is_set(): return
+            if self.follow_symlinks:
+                try:
+                    st = os.stat(path); key = (st.st_dev, st.st_ino)
+                    with run.lock:
+                        if key in run.visited: return
+                        run.visited.add(key)
+                except OSError:
+                    return
+            try:
+                files, subdirs = _scan_directory(path, self.extensions, self.follow_symlinks)
+            except OSError as e:
+                with run.lock: run.errors += 1
+                print(f"Warning: Could not scan folder {path}: {e}", file=sys.stderr)
+                return
+            if run.cancel_event.is_set(): return
+            if self.max_depth is not None and depth >= self.max_depth: subdirs = []
+            with run.lock:
+                run.pending += len(subdirs); run.dirs_scanned += 1
+                run.files_found += len(files); run.buffer.extend(files)
+            for subdir in subdirs: self._executor.submit(self._scan_task, run, subdir, depth + 1)
+            self._maybe_flush(run)
+        except Exception as e:
+            print(f"ERROR: Folder scan task failed for {path}: {e}", file=sys.stderr)
+        finally:
+            with run.lock:
+                run.pending -= 1; done = run.pending == 0
+            if done and not run.cancel_event.is_set(): self._finish(run)
+
+    def _maybe_flush(self, run, force=False):
+        now = time.monotonic()
+        with run.lock:
+            if not run.buffer: return
+            if not force and len(run.buffer) < self.batch_size and now - run.last_flush < self.flush_interval: return
+            batch, run.buffer = sorted(run.buffer), []
+            run.last_flush = now; dirs, files = run.dirs_scanned, run.files_found
+        if run.cancel_event.is_set(): return
+        self.batch_found.emit(batch); self.progress.emit(dirs, files)
+
+    def _finish(self, run):
+        self._maybe_flush(run, force=True)
+        with run.lock: dirs, files, errors = run.dirs_scanned, run.files_found, run.errors
+        if run.cancel_event.is_set(): return
+        run.cancel_event.set()
+        self.progress.emit(dirs, files); self.finished.emit(files, False)
+        print(f"Folder scan finished: {files} media files in {dirs} folders ({errors} unreadable).")
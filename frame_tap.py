@@ -0,0 +1,180 @@
+# frame_tap.py (Zero-copy frame access for analysis plugins)
+import sys
+import time
+import threading
+from collections import deque
+
+from lazy_import import lazy_import
+vlc = lazy_import("vlc")
+
+from video_frames import AlignedFrameBuffer, VIDEO_CHROMA, BYTES_PER_PIXEL, source_video_size, fit_size
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class Frame:
+    """
+    One decoded picture living in a ring slot. The pixel data is exposed
+    without copying; it stays valid until release() (or the end of a with-block),
+    after which the slot may be reused by the decoder.
+    """
+    __slots__ = ("seq", "timestamp", "width", "height", "pitch", "_tap", "_slot", "_released")
+
+    def __init__(self, tap, slot, seq, timestamp):
+        self._tap = tap; self._slot = slot; self._released = False
+        self.seq = seq; self.timestamp = timestamp
+        self.width = tap.width; self.height = tap.height; self.pitch = tap.pitch
+
+    @property
+    def view(self):
+        """memoryview over the BGRX bytes (height * pitch)."""
+        return self._tap._buffers[self._slot].view()
+
+    def as_array(self):
+        """NumPy (height, width, 4) uint8 view of the BGRX pixels. Requires numpy."""
+        if np is None: raise RuntimeError("numpy is required for Frame.as_array()")
+        return np.frombuffer(self.view, dtype=np.uint8).reshape(self.height, self.pitch // BYTES_PER_PIXEL, BYTES_PER_PIXEL)[:, :self.width]
+
+    def release(self):
+        if not self._released: self._released = True; self._tap._release_slot(self._slot)
+
+    def __enter__(self): return self
+    def __exit__(self, *exc): self.release()
+
+
+class FrameSubscription:
+    """A consumer fed on its own thread. Frames it cannot keep up with are dropped and counted, never queued."""
+    def __init__(self, tap, callback, every_nth=1, max_fps=None, max_pending=2):
+        self.tap = tap; self.callback = callback
+        self.every_nth = max(1, int(every_nth)); self.min_interval = (1.0 / max_fps) if max_fps else 0.0
+        self.max_pending = max(1, int(max_pending))
+        self.delivered = 0; self.dropped = 0; self.skipped = 0
+        self._pending = deque(); self._condition = threading.Condition(); self._active = True
+        self._last_accept = 0.0
+        self._thread = threading.Thread(target=self._run, name="PyPlayFrameTap", daemon=True); self._thread.start()
+
+    def _offer(self, seq, timestamp, slot):
+        """Called on the decoder thread. Returns True if the subscriber took a reference to slot."""
+        if seq % self.every_nth or (self.min_interval and timestamp - self._last_accept < self.min_interval):
+            self.skipped += 1; return False
+        with self._condition:
+            if not self._active: return False
+            if len(self._pending) >= self.max_pending: self.dropped += 1; self.tap.frames_dropped += 1; return False
+            self._last_accept = timestamp
+            self._pending.append(Frame(self.tap, slot, seq, timestamp)); self._condition.notify()
+        return True
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._pending and self._active: self._condition.wait()
+                if not self._pending: return
+                frame = self._pending.popleft()
+            try: self.callback(frame)
+            except Exception as e: print(f"Warning: Frame tap consumer raised: {e}", file=sys.stderr)
+            finally: frame.release(); self.delivered += 1
+
+    def cancel(self):
+        with self._condition:
+            self._active = False
+            while self._pending: self._pending.popleft().release()
+            self._condition.notify()
+        self.tap._remove(self)
+
+    def stats(self):
+        return {"delivered": self.delivered, "dropped": self.dropped, "skipped": self.skipped, "every_nth": self.every_nth}
+
+
+class FrameTap:
+    """
+    Registers libvlc video callbacks on a media player and decodes into a
+    preallocated ring of aligned buffers. A slot is reused only once every
+    subscriber holding it has released it; if the decoder finds no free slot,
+    the picture goes to a scratch buffer and counts as a ring overrun.
+
+    Attaching a tap replaces the player's on-screen output, so use it on a
+    dedicated or headless player, before the first play().
+    """
+    def __init__(self, width, height, ring_size=8):
+        self.width = int(width); self.height = int(height); self.pitch = self.width * BYTES_PER_PIXEL
+        frame_bytes = self.pitch * self.height
+        self._buffers = [AlignedFrameBuffer(frame_bytes) for _ in range(ring_size)]
+        self._scratch = AlignedFrameBuffer(frame_bytes)
+        self._refs = [0] * ring_size; self._write_pos = 0; self._in_flight = deque()
+        self._lock = threading.Lock(); self._subscribers = []
+        self.frames_decoded = 0; self.frames_published = 0; self.frames_dropped = 0; self.ring_overruns = 0
+        self.player = None
+        self._lock_cb = vlc.CallbackDecorators.VideoLockCb(self._on_lock)
+        self._unlock_cb = vlc.CallbackDecorators.VideoUnlockCb(self._on_unlock)
+        self._display_cb = vlc.CallbackDecorators.VideoDisplayCb(self._on_display)
+
+    @classmethod
+    def for_media(cls, media, max_width=1280, max_height=720, ring_size=8):
+        """Builds a tap sized to the media's first video track, scaled into the given box."""
+        size = source_video_size(media)
+        if not size: raise ValueError("media has no video track")
+        return cls(*fit_size(size[0], size[1], max_width, max_height), ring_size=ring_size)
+
+    def attach(self, media_player):
+        self.player = media_player
+        media_player.video_set_callbacks(self._lock_cb, self._unlock_cb, self._display_cb, None)
+        media_player.video_set_format(VIDEO_CHROMA, self.width, self.height, self.pitch)
+
+    def subscribe(self, callback, every_nth=1, max_fps=None, max_pending=2):
+        """Calls callback(frame) on a consumer thread for every n-th frame (and/or at most max_fps)."""
+        subscription = FrameSubscription(self, callback, every_nth, max_fps, max_pending)
+        with self._lock: self._subscribers = self._subscribers + [subscription]
+        return subscription
+
+    def _remove(self, subscription):
+        with self._lock: self._subscribers = [s for s in self._subscribers if s is not subscription]
+
+    # --- libvlc callbacks (decoder / video output threads) ---
+    def _on_lock(self, opaque, planes):
+        with self._lock:
+            ring_size = len(self._buffers)
+            for step in range(ring_size):
+                slot = (self._write_pos + step) % ring_size
+                if self._refs[slot] == 0:
+                    self._refs[slot] = 1; self._write_pos = (slot + 1) % ring_size; self._in_flight.append(slot)
+                    planes[0] = self._buffers[slot].address
+                    return slot + 1
+            self.ring_overruns += 1
+        planes[0] = self._scratch.address
+        return None
+
+    def _on_unlock(self, opaque, picture, planes):
+        pass
+
+    def _on_display(self, opaque, picture):
+        self.frames_decoded += 1
+        if not picture: return
+        slot = picture - 1; seq = self.frames_decoded; timestamp = time.monotonic()
+        with self._lock:
+            # Pictures locked before this one but never displayed were dropped by the video output.
+            while self._in_flight:
+                locked = self._in_flight.popleft()
+                if locked == slot: break
+                self._refs[locked] -= 1
+        published = False
+        for subscription in self._subscribers:
+            self._acquire_slot(slot)
+            if subscription._offer(seq, timestamp, slot): published = True
+            else: self._release_slot(slot)
+        if published: self.frames_published += 1
+        self._release_slot(slot)   # the decoder's own reference
+
+    def _acquire_slot(self, slot):
+        with self._lock: self._refs[slot] += 1
+
+    def _release_slot(self, slot):
+        with self._lock: self._refs[slot] -= 1
+
+    def stats(self):
+        subscribers = [s.stats() for s in self._subscribers]
+        return {"frames_decoded": self.frames_decoded, "frames_published": self.frames_published,
+                "ring_overruns": self.ring_overruns, "ring_size": len(self._buffers),
+                "dropped_by_consumers": self.frames_dropped, "subscribers": subscribers}
@@ -0,0 +1,167 @@
+# headless.py (Window-less playback engine and CLI driver for main.py --headless)
+import os
+import sys
+import json
+import signal
+from concurrent.futures import ThreadPoolExecutor
+
+import vlc
+from PyQt5.QtCore import QCoreApplication, QObject, QTimer
+
+from media_controls import MediaController
+from playback_backend import PlaybackState
+from media_formats import SUPPORTED_MEDIA_EXTENSIONS, is_playlist_file, is_url
+from folder_scanner import iter_media_files
+from playlist_io import iter_playlist, ExistenceChecker
+
+
+def expand_inputs(paths):
+    """Turns files, folders, playlists (M3U/PLS/XSPF; missing entries skipped) and stream URLs into a flat list of entries."""
+    entries = []; checker = ExistenceChecker()
+    for path in paths:
+        if is_url(path): entries.append(path)
+        elif os.path.isdir(path): entries.extend(iter_media_files(path, SUPPORTED_MEDIA_EXTENSIONS))
+        elif is_playlist_file(path):
+            try: entries.extend(entry for entry in iter_playlist(path, keep_urls=True) if is_url(entry) or checker.exists(entry))
+            except (OSError, ValueError, SyntaxError) as e: print(f"Warning: Could not read playlist {path}: {e}", file=sys.stderr)
+        else: entries.append(os.path.abspath(path))
+    return entries
+
+
+def _format_time(ms):
+    if ms is None or ms < 0: ms = 0
+    minutes, seconds = divmod(int(ms / 1000), 60); hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02}:{seconds:02}" if hours else f"{minutes:02}:{seconds:02}"
+
+
+class HeadlessPlayer(QObject):
+    """Plays a list of entries through MediaController with no widgets, reporting status as text or JSON lines."""
+    STATE_NAMES = {PlaybackState.NothingSpecial: "idle", PlaybackState.Opening: "opening", PlaybackState.Buffering: "buffering",
+                   PlaybackState.Playing: "playing", PlaybackState.Paused: "paused", PlaybackState.Stopped: "stopped",
+                   PlaybackState.Ended: "ended", PlaybackState.Error: "error"}
+
+    def __init__(self, controller, entries, loop=False, status_interval=1.0, json_status=False, out=None, parent=None):
+        super().__init__(parent)
+        self.controller = controller; self.entries = list(entries); self.loop = loop
+        self.json_status = json_status; self.out = out or sys.stdout
+        self.index = -1; self.errors = 0; self.played = 0; self._finished = False
+        self.status_timer = QTimer(self); self.status_timer.setInterval(max(100, int(status_interval * 1000)))
+        self.status_timer.timeout.connect(self._report_status)
+        controller.playback_state_changed.connect(self._state_changed)
+        controller.media_advanced.connect(self._media_advanced)
+        controller.error_occurred.connect(self._error)
+
+    def start(self):
+        if not self.entries: self._finish(); return
+        self.status_timer.start(); self._play(0)
+
+    def _next_index(self, index):
+        if index + 1 < len(self.entries): return index + 1
+        return 0 if self.loop and self.entries else -1
+
+    def _play(self, index):
+        while index >= 0 and not self._finished:
+            self.index = index
+            if self.controller.load_media(self.entries[index]):
+                self.controller.play(); self.played += 1; self._emit("track", path=self.entries[index], index=index + 1)
+                self._prepare_next(); return
+            self.errors += 1; index = self._next_index(index)
+            if index == 0 and self.loop and self.errors >= len(self.entries): break
+        self._finish()
+
+    def _prepare_next(self):
+        next_index = self._next_index(self.index)
+        if next_index < 0: self.controller.clear_next()
+        else: self.controller.prepare_next(self.entries[next_index])
+
+    def _media_advanced(self, path):
+        self.index = self._next_index(self.index); self.played += 1
+        self._emit("track", path=path, index=self.index + 1); self._prepare_next()
+
+    def _state_changed(self, state):
+        if self._finished: return
+        if state == PlaybackState.Ended and not self.controller.advance_pending:
+            QTimer.singleShot(0, lambda: self._play(self._next_index(self.index)))
+        elif state == PlaybackState.Error:
+            self.errors += 1; QTimer.singleShot(0, lambda: self._play(self._next_index(self.index)))
+
+    def _error(self, message):
+        self._emit("error", message=message.replace("\n", " "))
+
+    def _report_status(self):
+        if self.index < 0: return
+        state = self.controller.get_state(); extra = {}
+        stream = self.controller.stream_stats()
+        if stream is not None: extra["stream"] = stream
+        self._emit("status", state=self.STATE_NAMES.get(state, str(state)), path=self.entries[self.index], index=self.index + 1,
+                   time_ms=self.controller.get_time_ms(), duration_ms=self.controller.get_duration_ms(), **extra)
+
+    def _emit(self, kind, **fields):
+        if self.json_status:
+            print(json.dumps(dict(event=kind, **fields)), file=self.out, flush=True); return
+        if kind == "status":
+            line = f"[{fields['state']}] {_format_time(fields['time_ms'])} / {_format_time(fields['duration_ms'])}  ({fields['index']}/{len(self.entries)}) {os.path.basename(fields['path'])}"
+            if "stream" in fields: line += f"  [{fields['stream']['rebuffers']} rebuffer(s), {fields['stream']['stalled_ms']:.0f} ms stalled]"
+        elif kind == "track": line = f"Now playing ({fields['index']}/{len(self.entries)}): {fields['path']}"
+        elif kind == "error": line = f"Error: {fields['message']}"
+        else: line = " ".join(f"{k}={v}" for k, v in fields.items())
+        print(line, file=self.out, flush=True)
+
+    def stop(self):
+        self.controller.stop(); self._finish()
+
+    def _finish(self):
+        if self._finished: return
+        self._finished = True; self.status_timer.stop()
+        cache = self.controller.resource_stats()
+        drops = self.controller.stats_recorder.totals
+        self._emit("finished", played=self.played, errors=self.errors, cache_hits=cache["hits"], cache_misses=cache["misses"],
+                   frames_dropped=drops["dropped"], audio_buffers_lost=drops["lost_audio"])
+        QCoreApplication.exit(1 if self.errors and not self.played else 0)
+
+
+def run_probe(entries, json_status=False, out=None, workers=4):
+    """Parses every entry with libvlc and prints one metadata record per file."""
+    from media_library import probe_media
+    out = out or sys.stdout
+    instance = vlc.Instance(["--quiet", "--no-video", "--no-audio", "--no-xlib"])
+    failures = 0
+    def probe(path):
+        try: return probe_media(instance, path)
+        except OSError as e: return {"path": path, "status": "failed", "error": str(e)}
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for record in pool.map(probe, entries):
+                if record.get("status") != "done": failures += 1
+                if json_status: print(json.dumps(record), file=out, flush=True); continue
+                details = [f"{record.get('status')}", _format_time(record.get("duration_ms"))]
+                if record.get("width"): details.append(f"{record['width']}x{record['height']}")
+                codecs = "/".join(c for c in (record.get("video_codec"), record.get("audio_codec")) if c)
+                if codecs: details.append(codecs)
+                print(f"{record['path']}: {', '.join(details)}", file=out, flush=True)
+    finally:
+        instance.release()
+    return 1 if failures else 0
+
+
+def run_headless(args):
+    """Entry point for main.py --headless. Returns the process exit code."""
+    # Status goes to the real stdout; incidental diagnostics are moved to stderr so --json output stays parseable.
+    status_out = sys.stdout; sys.stdout = sys.stderr
+    entries = expand_inputs(args.paths)
+    if not entries:
+        print("Headless mode: no media files given.", file=sys.stderr); return 2
+    if args.probe: return run_probe(entries, json_status=args.json, out=status_out)
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    controller = MediaController()
+    if not controller.initialize(["--no-video"]): return 1
+    if args.volume is not None: controller.set_volume(args.volume)
+    player = HeadlessPlayer(controller, entries, loop=args.loop, status_interval=args.status_interval,
+                            json_status=args.json, out=status_out)
+    QTimer.singleShot(0, player.start)
+    # Qt's loop blocks Python signal handling; wake it periodically so Ctrl+C stops playback cleanly.
+    signal.signal(signal.SIGINT, lambda *_: QTimer.singleShot(0, player.stop))
+    wakeup_timer = QTimer(); wakeup_timer.timeout.connect(lambda: None); wakeup_timer.start(200)
+    exit_code = app.exec_()
+    controller.release_resources()
+    return exit_code
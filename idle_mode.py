@@ -0,0 +1,126 @@
+# idle_mode.py (Works out how much of the player window anyone can see, and measures what that saves)
+import time
+
+from PyQt5.QtCore import Qt, QObject, QEvent, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QApplication
+
+import tracing
+
+ACTIVE = "active"                    # window on screen with its controls
+CONTROLS_HIDDEN = "controls_hidden"  # fullscreen video, control bar auto-hidden
+HIDDEN = "hidden"                    # minimized, hidden, fully covered or the application hidden
+LEVELS = (ACTIVE, CONTROLS_HIDDEN, HIDDEN)
+IDLE_UI_RATE_HZ = {CONTROLS_HIDDEN: 2, HIDDEN: 1}   # time/position snapshots per second while idle (watch history still needs them)
+ENTER_DELAY_MS = 300     # a level has to hold this long before going idle; becoming visible again applies at once
+SAMPLE_INTERVAL_MS = 5000
+
+
+class VisibilityMonitor(QObject):
+    """
+    Follows a window's visibility and emits level_changed(level) with one of
+    LEVELS. HIDDEN covers minimized and hidden windows, windows the platform
+    reports as not exposed (fully covered, on macOS and Wayland; X11 rarely
+    tells) and a hidden or suspended application (e.g. a locked screen).
+    CONTROLS_HIDDEN is a fullscreen window whose `controls` widget is hidden.
+
+    While running it keeps wall time, process CPU time (which includes
+    libvlc's decoder threads) and the deltas of the counters returned by
+    counters() per level, so stats() shows what each level costs. Counters
+    may drop back to zero (e.g. per-media decoder counts); the count after
+    the reset is used then.
+    """
+    level_changed = pyqtSignal(str)
+
+    def __init__(self, window, controls, counters=None, parent=None):
+        super().__init__(parent)
+        self.window = window; self.controls = controls; self.counters = counters or (lambda: {})
+        self.level = ACTIVE; self._running = False; self._handle = None
+        self._totals = {level: {"seconds": 0.0, "cpu_seconds": 0.0} for level in LEVELS}
+        self._sample = None
+        self._enter_timer = QTimer(self); self._enter_timer.setSingleShot(True); self._enter_timer.setInterval(ENTER_DELAY_MS)
+        self._enter_timer.timeout.connect(self._apply)
+        self._sample_timer = QTimer(self); self._sample_timer.setInterval(SAMPLE_INTERVAL_MS); self._sample_timer.timeout.connect(self._take_sample)
+
+    def start(self):
+        """Starts following the window; call once it has been shown."""
+        if self._running: return
+        self._running = True
+        self.window.installEventFilter(self); self.controls.installEventFilter(self)
+        app = QApplication.instance()
+        if app is not None: app.applicationStateChanged.connect(self._changed)
+        self._watch_handle(); self._take_sample(); self._sample_timer.start(); self._apply()
+
+    def stop(self):
+        if not self._running: return
+        self._take_sample(); self._running = False
+        self._enter_timer.stop(); self._sample_timer.stop()
+        self.window.removeEventFilter(self); self.controls.removeEventFilter(self)
+        if self._handle is not None: self._handle.removeEventFilter(self); self._handle = None
+        app = QApplication.instance()
+        if app is not None:
+            try: app.applicationStateChanged.disconnect(self._changed)
+            except TypeError: pass
+
+    def _watch_handle(self):
+        # Expose events go to the QWindow, which only exists once the widget has been shown.
+        handle = self.window.windowHandle()
+        if handle is not None and handle is not self._handle:
+            if self._handle is not None: self._handle.removeEventFilter(self)
+            self._handle = handle; handle.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        kind = event.type()
+        if kind in (QEvent.WindowStateChange, QEvent.Show, QEvent.Hide, QEvent.Expose): self._changed()
+        if kind == QEvent.Show and obj is self.window: self._watch_handle()
+        return False
+
+    def current_level(self):
+        window = self.window
+        app_state = QApplication.applicationState() if QApplication.instance() is not None else Qt.ApplicationActive
+        if (not window.isVisible() or window.isMinimized() or (self._handle is not None and not self._handle.isExposed())
+                or app_state in (Qt.ApplicationHidden, Qt.ApplicationSuspended)): return HIDDEN
+        if window.isFullScreen() and not self.controls.isVisible(): return CONTROLS_HIDDEN
+        return ACTIVE
+
+    def _changed(self, *args):
+        if not self._running: return
+        level = self.current_level()
+        if level == self.level: self._enter_timer.stop()
+        elif LEVELS.index(level) < LEVELS.index(self.level): self._enter_timer.stop(); self._apply()
+        elif not self._enter_timer.isActive(): self._enter_timer.start()
+
+    def _apply(self):
+        level = self.current_level()
+        if level == self.level: return
+        self._take_sample(); self.level = level
+        tracing.instant("visibility_level", level=level)
+        self.level_changed.emit(level)
+
+    # --- Measurements ---
+    def _take_sample(self):
+        now = (time.perf_counter(), time.process_time(), dict(self.counters()))
+        if self._sample is not None and self._running:
+            totals = self._totals[self.level]; (wall, cpu, counters) = self._sample
+            totals["seconds"] += now[0] - wall; totals["cpu_seconds"] += now[1] - cpu
+            for name, value in now[2].items():
+                previous = counters.get(name, 0)
+                totals[name] = totals.get(name, 0) + (value - previous if value >= previous else value)
+        self._sample = now
+
+    def stats(self):
+        """Per level: seconds spent, CPU percent and every counter per second."""
+        self._take_sample(); result = {}
+        for level, totals in self._totals.items():
+            seconds = totals["seconds"]
+            if seconds <= 0: continue
+            entry = {"seconds": round(seconds, 1), "cpu_percent": round(100.0 * totals["cpu_seconds"] / seconds, 1)}
+            entry.update((f"{name}_per_s", round(value / seconds, 1)) for name, value in totals.items() if name not in ("seconds", "cpu_seconds"))
+            result[level] = entry
+        return result
+
+    def summary(self):
+        parts = []
+        for level, entry in self.stats().items():
+            rates = ", ".join(f"{value:g} {name[:-6].replace('_', ' ')}/s" for name, value in entry.items() if name.endswith("_per_s"))
+            parts.append(f"{level.replace('_', ' ')} {entry['seconds']:.0f} s at {entry['cpu_percent']:.1f}% CPU" + (f" ({rates})" if rates else ""))
+        return "Visibility: " + "; ".join(parts) + "." if parts else None
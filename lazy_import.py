@@ -0,0 +1,23 @@
+# lazy_import.py (Deferred module loading for startup-critical paths)
+import types
+import importlib
+
+
+class _LazyModule(types.ModuleType):
+    """Stand-in that imports the real module on first attribute access, then mirrors its namespace."""
+    def __getattr__(self, attr):
+        # Only reached for names not yet copied in. import_module() holds the per-module import
+        # lock, so concurrent first uses from worker threads all see a fully initialised module.
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_import(name):
+    """
+    Returns a proxy for module `name` without importing it; the real import
+    happens on first attribute access. Used for python-vlc, whose import
+    locates and loads the libvlc shared library - work the GUI does not need
+    before its window is on screen. Import errors surface at first use.
+    """
+    return _LazyModule(name)
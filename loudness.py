@@ -0,0 +1,334 @@
+# loudness.py (Background loudness analysis, per-track normalization gain and waveform overviews)
+import os
+import sys
+import time
+import ctypes
+import sqlite3
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from lazy_import import lazy_import
+vlc = lazy_import("vlc")
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from app_paths import cache_path
+from media_formats import is_url
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+LOUDNESS_DB_NAME = "loudness.sqlite3"
+ANALYSIS_RATE = 48000          # the K-weighting coefficients below are the BS.1770 ones for 48 kHz
+ANALYSIS_CHANNELS = 2          # measured as heard: libvlc downmixes/upmixes to stereo like the default output
+TARGET_LUFS = -18.0            # ReplayGain 2.0 reference level
+MAX_GAIN_DB = 12.0
+WAVEFORM_POINTS = 600
+LATE_GAIN_LIMIT_MS = 3000      # results arriving later than this into a track are kept for its next play
+STALL_TIMEOUT_S = 15.0
+
+# ITU-R BS.1770-4 K-weighting at 48 kHz: high-shelf "head" filter, then the RLB high-pass.
+_K_STAGES = (((1.53512485958697, -2.69169618940638, 1.19839281085285), (1.0, -1.69065929318241, 0.73248077421585)),
+             ((1.0, -2.0, 1.0), (1.0, -1.99004745483398, 0.99007225036621)))
+_ABSOLUTE_GATE_LUFS = -70.0
+_RELATIVE_GATE_LU = -10.0
+
+_PrerenderCb = ctypes.CFUNCTYPE(None, ctypes.c_void_p, ctypes.POINTER(ctypes.POINTER(ctypes.c_uint8)), ctypes.c_size_t)
+_PostrenderCb = ctypes.CFUNCTYPE(None, ctypes.c_void_p, ctypes.POINTER(ctypes.c_uint8), ctypes.c_uint, ctypes.c_uint,
+                                 ctypes.c_uint, ctypes.c_uint, ctypes.c_size_t, ctypes.c_int64)
+
+_worker_instance = None
+
+
+def _k_weights(block):
+    """Per-rfft-bin factors turning a block's spectrum into its K-weighted mean square (Parseval)."""
+    z = np.exp(-2j * np.pi * np.fft.rfftfreq(block))   # e^-jw at each bin
+    response = np.ones_like(z)
+    for b, a in _K_STAGES: response *= (b[0] + b[1] * z + b[2] * z * z) / (a[0] + a[1] * z + a[2] * z * z)
+    weights = np.abs(response) ** 2 * 2.0
+    weights[0] /= 2.0
+    if block % 2 == 0: weights[-1] /= 2.0
+    return weights / (block * block)
+
+
+class LoudnessMeter:
+    """
+    Streaming BS.1770 integrated loudness (gated 400 ms blocks, 75% overlap),
+    sample peak and per-100 ms peaks for a waveform overview. Samples are
+    buffered and measured a few seconds at a time with batched FFTs; the
+    K-weighting is applied as spectral weights on each block, so no
+    per-sample filtering happens in Python.
+    """
+    def __init__(self, rate=ANALYSIS_RATE, batch_seconds=10.0):
+        if np is None: raise RuntimeError("numpy is required for loudness analysis")
+        self.rate = rate; self.hop = rate // 10; self.block = self.hop * 4
+        self.batch_samples = int(batch_seconds * rate)
+        self._weights = _k_weights(self.block)
+        self._chunks = []; self._queued = 0; self._carry = None; self._peaked = 0
+        self._energies = []; self._hop_peaks = []; self.samples = 0
+
+    def add(self, samples):
+        """samples: (frames, channels) float array; copied, so the caller may reuse its buffer."""
+        self._chunks.append(np.array(samples, dtype=np.float32)); self._queued += len(samples); self.samples += len(samples)
+        if self._queued >= self.batch_samples: self._process()
+
+    def _process(self, final=False):
+        parts = ([self._carry] if self._carry is not None else []) + self._chunks
+        self._chunks = []; self._queued = 0
+        if not parts: return
+        data = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        hop, block = self.hop, self.block
+        complete_hops = len(data) // hop
+        if complete_hops > self._peaked:
+            peaks = np.abs(data[self._peaked * hop:complete_hops * hop]).reshape(complete_hops - self._peaked, -1).max(axis=1)
+            self._hop_peaks.append(peaks); self._peaked = complete_hops
+        blocks = (len(data) - block) // hop + 1 if len(data) >= block else 0
+        for start in range(0, blocks, 64):   # bounds the FFT working set to 64 blocks at a time
+            count = min(64, blocks - start)
+            frames = np.lib.stride_tricks.sliding_window_view(data[start * hop:(start + count - 1) * hop + block], block, axis=0)[::hop]
+            power = np.abs(np.fft.rfft(frames, axis=-1)) ** 2            # (count, channels, bins)
+            self._energies.append((power @ self._weights).sum(axis=1))   # channel weights are 1.0 for L/R
+        self._carry = data[blocks * hop:]; self._peaked -= blocks
+        if final and self._peaked * hop < len(self._carry):
+            self._hop_peaks.append(np.abs(self._carry[self._peaked * hop:]).max(keepdims=True).reshape(1))
+
+    def result(self, points=WAVEFORM_POINTS):
+        """Returns {"integrated_lufs", "peak_dbfs", "duration_ms", "waveform"} (loudness None below 400 ms or in silence)."""
+        self._process(final=True)
+        energies = np.concatenate(self._energies) if self._energies else np.zeros(0)
+        integrated = None
+        if len(energies):
+            with np.errstate(divide="ignore"): levels = -0.691 + 10.0 * np.log10(energies)
+            gated = energies[levels > _ABSOLUTE_GATE_LUFS]
+            if len(gated):
+                relative_gate = -0.691 + 10.0 * np.log10(gated.mean()) + _RELATIVE_GATE_LU
+                gated = energies[(levels > _ABSOLUTE_GATE_LUFS) & (levels > relative_gate)]
+                integrated = round(float(-0.691 + 10.0 * np.log10(gated.mean())), 2)
+        peaks = np.concatenate(self._hop_peaks) if self._hop_peaks else np.zeros(0, dtype=np.float32)
+        peak = float(peaks.max()) if len(peaks) else 0.0
+        return {"integrated_lufs": integrated, "peak_dbfs": round(20.0 * np.log10(peak), 2) if peak > 0 else None,
+                "duration_ms": int(self.samples * 1000 / self.rate), "waveform": waveform_overview(peaks, points)}
+
+
+def waveform_overview(hop_peaks, points=WAVEFORM_POINTS):
+    """Reduces per-hop peaks to at most `points` bytes (0-255, max of each span)."""
+    if not len(hop_peaks): return b""
+    if len(hop_peaks) > points:
+        hop_peaks = np.maximum.reduceat(hop_peaks, np.linspace(0, len(hop_peaks), points, endpoint=False).astype(np.int64))
+    return np.clip(hop_peaks * 255.0, 0, 255).astype(np.uint8).tobytes()
+
+
+def track_gain_db(record, target_lufs=TARGET_LUFS, max_gain_db=MAX_GAIN_DB):
+    """Gain bringing a track to target_lufs, limited so boosted peaks stay below full scale. 0.0 if unknown."""
+    if not record or record.get("integrated_lufs") is None: return 0.0
+    gain = target_lufs - record["integrated_lufs"]
+    if record.get("peak_dbfs") is not None: gain = min(gain, -record["peak_dbfs"])
+    return round(max(-max_gain_db * 2, min(max_gain_db, gain)), 2)
+
+
+def decode_audio(instance, path, on_samples, stall_timeout_s=STALL_TIMEOUT_S):
+    """
+    Decodes the audio of path to ANALYSIS_RATE/ANALYSIS_CHANNELS float32 and
+    calls on_samples((frames, channels) array view) for every buffer. Uses the
+    smem stream output's audio callbacks with time-sync off, so decoding runs
+    as fast as the CPU allows instead of at playback speed (the player's own
+    audio callbacks are clocked in real time). Returns the number of frames.
+    """
+    state = {"buffer": None, "frames": 0, "last": time.monotonic(), "error": None}
+
+    def prerender(data, pp_buffer, size):
+        if state["buffer"] is None or len(state["buffer"]) < size: state["buffer"] = ctypes.create_string_buffer(size)
+        pp_buffer[0] = ctypes.cast(state["buffer"], ctypes.POINTER(ctypes.c_uint8))
+
+    def postrender(data, pcm, channels, rate, nb_samples, bits, size, pts):
+        state["last"] = time.monotonic()
+        if state["error"]: return
+        if rate != ANALYSIS_RATE or bits != 32 or channels < 1:
+            state["error"] = f"unexpected PCM format {rate} Hz/{bits} bit/{channels} ch"; return
+        try:
+            on_samples(np.frombuffer(state["buffer"], dtype=np.float32, count=nb_samples * channels).reshape(nb_samples, channels))
+            state["frames"] += nb_samples
+        except Exception as e:
+            state["error"] = str(e)
+
+    prerender_cb = _PrerenderCb(prerender); postrender_cb = _PostrenderCb(postrender)   # must outlive playback
+    address = lambda cb: ctypes.cast(cb, ctypes.c_void_p).value
+    sout = (f"#transcode{{acodec=f32l,channels={ANALYSIS_CHANNELS},samplerate={ANALYSIS_RATE}}}"
+            f":smem{{audio-prerender-callback={address(prerender_cb)},audio-postrender-callback={address(postrender_cb)},time-sync=false}}")
+    media = instance.media_new_path(path)
+    media.add_options(f":sout={sout}", ":no-sout-video", ":no-sout-spu", ":no-sub-autodetect-file")
+    player = instance.media_player_new(); player.set_media(media)
+    done = threading.Event(); events = player.event_manager()
+    for event_type in (vlc.EventType.MediaPlayerEndReached, vlc.EventType.MediaPlayerEncounteredError):
+        events.event_attach(event_type, lambda e: done.set())
+    try:
+        if player.play() == -1: raise RuntimeError("libvlc could not start decoding")
+        while not done.wait(0.5):
+            if time.monotonic() - state["last"] > stall_timeout_s: raise RuntimeError("decoding stalled")
+        if state["error"]: raise RuntimeError(state["error"])
+        if not state["frames"]: raise ValueError("no audio track")
+        return state["frames"]
+    finally:
+        for event_type in (vlc.EventType.MediaPlayerEndReached, vlc.EventType.MediaPlayerEncounteredError):
+            try: events.event_detach(event_type)
+            except Exception: pass
+        player.stop(); player.release(); media.release()
+
+
+def _init_worker():
+    # Analysis is background work: keep decoders from competing with playback.
+    if hasattr(os, "nice"):
+        try: os.nice(10)
+        except OSError: pass
+
+
+def analyze_file(path):
+    """Process-pool worker: measures one file. Returns a cache record (status "done" or "failed")."""
+    global _worker_instance
+    started = time.perf_counter()
+    record = {"path": path, "size": None, "mtime_ns": None, "integrated_lufs": None, "peak_dbfs": None,
+              "duration_ms": None, "waveform": b"", "status": "failed", "error": None}
+    try:
+        st = os.stat(path); record.update(size=st.st_size, mtime_ns=st.st_mtime_ns)
+        if _worker_instance is None:
+            _worker_instance = vlc.Instance(["--quiet", "--no-video", "--no-xlib", "--no-osd", "--no-spu"])
+        meter = LoudnessMeter()
+        decode_audio(_worker_instance, path, meter.add)
+        record.update(meter.result(), status="done")
+    except Exception as e:
+        record["error"] = str(e)
+    record["seconds"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+class LoudnessCache:
+    """
+    SQLite store of analysis results keyed by path and valid only while the
+    file's size and mtime match (its identity). Failed analyses are kept too,
+    so unplayable files are not decoded again until they change.
+    """
+    _FIELDS = ("path", "size", "mtime_ns", "integrated_lufs", "peak_dbfs", "duration_ms", "waveform", "status", "analyzed_at")
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or cache_path(LOUDNESS_DB_NAME)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL"); self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS loudness (
+            path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, integrated_lufs REAL, peak_dbfs REAL,
+            duration_ms INTEGER, waveform BLOB, status TEXT, analyzed_at REAL) WITHOUT ROWID""")
+        self._conn.commit()
+        self._records = {}; self._records_limit = 1024
+
+    def get(self, path):
+        """The stored record for path if it still matches the file on disk, else None."""
+        try: st = os.stat(path)
+        except OSError: return None
+        record = self._records.get(path)
+        if record is None:
+            with self._lock:
+                row = self._conn.execute(f"SELECT {', '.join(self._FIELDS)} FROM loudness WHERE path = ?", (path,)).fetchone()
+            if row is None: return None
+            record = dict(zip(self._FIELDS, row))
+            if len(self._records) >= self._records_limit: self._records.clear()
+            self._records[path] = record
+        if record["size"] != st.st_size or record["mtime_ns"] != st.st_mtime_ns: return None
+        return record
+
+    def put(self, record):
+        if record.get("size") is None: return   # the file vanished; nothing to key it by
+        record = dict(record, analyzed_at=time.time())
+        with self._lock:
+            self._conn.execute(f"INSERT OR REPLACE INTO loudness ({', '.join(self._FIELDS)}) VALUES ({', '.join('?' * len(self._FIELDS))})",
+                               tuple(record.get(f) for f in self._FIELDS))
+            self._conn.commit()
+        self._records.pop(record["path"], None)
+
+    def close(self):
+        with self._lock:
+            try: self._conn.close()
+            except Exception: pass
+
+
+class LoudnessAnalyzer(QObject):
+    """
+    Feeds files to a small process pool (one libvlc instance and NumPy meter
+    per worker) and stores the results in a LoudnessCache. Urgent requests
+    (the current and next track) jump the queue; at most two jobs per worker
+    are in flight, so queueing a 100k-entry playlist costs only a deque.
+    The cache check of non-urgent paths (a stat and a query per file) runs
+    on a helper thread, so a big scan or import does no disk work per entry
+    on the GUI thread.
+    """
+    analyzed = pyqtSignal(str, object)   # path, cache record (status "done" or "failed")
+
+    def __init__(self, cache=None, max_workers=None, parent=None):
+        super().__init__(parent)
+        if np is None: raise RuntimeError("numpy is not installed")
+        self.cache = cache or LoudnessCache()
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) // 4)
+        self._pool = None; self._checker = None; self._queue = deque(); self._queued = set(); self._in_flight = set()
+        self._lock = threading.Lock(); self._closed = False
+        self.analyzed_count = 0; self.failed_count = 0; self.seconds = 0.0
+
+    def lookup(self, path): return self.cache.get(path)
+
+    def request(self, paths, urgent=False):
+        """Queues files without a current cache entry. Urgent paths go to the front, in the given order. Stream URLs are never analyzed."""
+        paths = [p for p in paths if not is_url(p)]
+        if self._closed or not paths: return
+        if urgent: self._enqueue(paths, urgent=True); return   # the current and next track: a couple of files, checked right away
+        if self._checker is None: self._checker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="PyPlayLoudnessCheck")
+        self._checker.submit(self._enqueue, list(paths))
+
+    def _enqueue(self, paths, urgent=False):
+        try:
+            with self._lock:
+                fresh = [p for p in paths if p not in self._in_flight and (urgent or p not in self._queued)]
+            fresh = [p for p in fresh if not self._closed and self.cache.get(p) is None]
+        except Exception as e:   # the cache closes under a check still running at shutdown
+            if not self._closed: print(f"ERROR: Loudness cache check failed: {e}", file=sys.stderr)
+            return
+        if self._closed: return
+        with self._lock:
+            for path in (reversed(fresh) if urgent else fresh):
+                if urgent and path in self._queued: self._queue.remove(path)
+                elif path in self._queued: continue
+                self._queued.add(path)
+                if urgent: self._queue.appendleft(path)
+                else: self._queue.append(path)
+        self._pump()
+
+    def _pump(self):
+        with self._lock:
+            while not self._closed and self._queue and len(self._in_flight) < self.max_workers * 2:
+                path = self._queue.popleft(); self._queued.discard(path); self._in_flight.add(path)
+                if self._pool is None:
+                    # Spawned, not forked: a fork of the GUI process copies locks held by its libvlc and Qt threads into the worker.
+                    self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"), initializer=_init_worker)
+                self._pool.submit(analyze_file, path).add_done_callback(lambda future, path=path: self._job_done(path, future))
+
+    def _job_done(self, path, future):
+        try: record = future.result()
+        except Exception as e: record = {"path": path, "status": "failed", "error": str(e), "size": None}
+        with self._lock: self._in_flight.discard(path)
+        if self._closed: return
+        if record["status"] == "done": self.analyzed_count += 1
+        else:
+            self.failed_count += 1
+            print(f"Warning: Loudness analysis failed for {os.path.basename(path)}: {record.get('error')}", file=sys.stderr)
+        self.seconds += record.get("seconds", 0.0)
+        self.cache.put(record); self.analyzed.emit(path, record)
+        self._pump()
+
+    def shutdown(self):
+        self._closed = True
+        with self._lock: self._queue.clear(); self._queued.clear()
+        if self._checker is not None: self._checker.shutdown(wait=False, cancel_futures=True); self._checker = None
+        if self._pool is not None: self._pool.shutdown(wait=False, cancel_futures=True); self._pool = None
+        if self.analyzed_count or self.failed_count:
+            print(f"Loudness analysis: {self.analyzed_count} files measured, {self.failed_count} failed ({self.seconds:.1f} s of worker time).")
+        self.cache.close()
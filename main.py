@@ -1,10 +1,10 @@
 # main.py (Updated terminal error printing)
+import time
+_STARTED = time.perf_counter()   # reference point for --measure-startup and --trace
 import sys
 import os
+import argparse
 import traceback # Import traceback module
-from PyQt5.QtWidgets import QApplication, QSplashScreen, QMessageBox
-from PyQt5.QtGui import QPixmap, QIcon
-from PyQt5.QtCore import Qt, QTimer, QFile, QTextStream
 
 # --- Paths ---
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -13,87 +13,144 @@ project_root = script_dir
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+import tracing
+from playback_backend import BACKENDS
+
 # --- Style Sheet Path ---
 STYLE_SHEET_PATH = os.path.join(project_root, "style.qss")
 
 # --- Import main window ---
-# Wrap the import itself in a basic try/except for early feedback
-player_ui_module_available = False
-try:
-    from player_ui import PlayerWindow
-    player_ui_module_available = True
-except ImportError as e:
-    # This error happens if player_ui.py is missing or has *internal* import errors
-    print("="*60, file=sys.stderr)
-    print(f"FATAL IMPORT ERROR: Could not import 'PlayerWindow' from 'player_ui.py'.", file=sys.stderr)
-    print(f"Reason: {e}", file=sys.stderr)
-    print(f"Python Path: {sys.path}", file=sys.stderr)
-    traceback.print_exc(file=sys.stderr) # Print traceback for the import error
-    print("="*60, file=sys.stderr)
-    # Try to show a message box, but it might fail if QApplication isn't ready
-    try:
-        _app = QApplication.instance() or QApplication([])
-        QMessageBox.critical(None, "Import Error", f"Could not load UI components (player_ui.py):\n{e}\n\nCheck terminal for details.\nEnsure dependencies (PyQt5, python-vlc) are installed.")
-    except Exception:
-        pass # Ignore if message box fails here
-    sys.exit(1)
-except SyntaxError as e:
-    # Catch SyntaxError specifically during import parsing
-    print("="*60, file=sys.stderr)
-    print(f"FATAL SYNTAX ERROR: Invalid syntax found in 'player_ui.py'.", file=sys.stderr)
-    print(f"Error details: {e}", file=sys.stderr)
-    # SyntaxError already includes file/line info, but traceback adds context
-    traceback.print_exc(file=sys.stderr)
-    print("="*60, file=sys.stderr)
-    try:
-        _app = QApplication.instance() or QApplication([])
-        QMessageBox.critical(None, "Syntax Error", f"Invalid syntax found in player_ui.py\n(Line: {e.lineno}, Offset: {e.offset}):\n\n{e.text}\nCheck terminal for full traceback.")
-    except Exception:
-        pass
-    sys.exit(1)
-except Exception as e:
-    # Catch any other unexpected error during the import phase
-    print("="*60, file=sys.stderr)
-    print(f"UNEXPECTED STARTUP ERROR during import:", file=sys.stderr)
-    print(f"Error details: {e}", file=sys.stderr)
-    traceback.print_exc(file=sys.stderr) # Print full traceback
-    print("="*60, file=sys.stderr)
+# GUI modules are imported on demand so --headless never loads QtWidgets or builds widgets.
+def _import_player_window():
+    global QApplication, QSplashScreen, QMessageBox, QPixmap, QIcon, Qt, QTimer
+    from PyQt5.QtWidgets import QApplication, QSplashScreen, QMessageBox
+    from PyQt5.QtGui import QPixmap, QIcon
+    from PyQt5.QtCore import Qt, QTimer
+    # Wrap the import itself in a basic try/except for early feedback
     try:
-        _app = QApplication.instance() or QApplication([])
-        QMessageBox.critical(None, "Unexpected Startup Error", f"An unexpected error occurred during import:\n{e}\n\nCheck terminal for details.")
-    except Exception:
-        pass
-    sys.exit(1)
+        from player_ui import PlayerWindow
+    except ImportError as e:
+        # This error happens if player_ui.py is missing or has *internal* import errors
+        print("="*60, file=sys.stderr)
+        print(f"FATAL IMPORT ERROR: Could not import 'PlayerWindow' from 'player_ui.py'.", file=sys.stderr)
+        print(f"Reason: {e}", file=sys.stderr)
+        print(f"Python Path: {sys.path}", file=sys.stderr)
+        traceback.print_exc(file=sys.stderr) # Print traceback for the import error
+        print("="*60, file=sys.stderr)
+        # Try to show a message box, but it might fail if QApplication isn't ready
+        try:
+            _app = QApplication.instance() or QApplication([])
+            QMessageBox.critical(None, "Import Error", f"Could not load UI components (player_ui.py):\n{e}\n\nCheck terminal for details.\nEnsure dependencies (PyQt5, python-vlc) are installed.")
+        except Exception:
+            pass # Ignore if message box fails here
+        sys.exit(1)
+    except SyntaxError as e:
+        # Catch SyntaxError specifically during import parsing
+        print("="*60, file=sys.stderr)
+        print(f"FATAL SYNTAX ERROR: Invalid syntax found in 'player_ui.py'.", file=sys.stderr)
+        print(f"Error details: {e}", file=sys.stderr)
+        # SyntaxError already includes file/line info, but traceback adds context
+        traceback.print_exc(file=sys.stderr)
+        print("="*60, file=sys.stderr)
+        try:
+            _app = QApplication.instance() or QApplication([])
+            QMessageBox.critical(None, "Syntax Error", f"Invalid syntax found in player_ui.py\n(Line: {e.lineno}, Offset: {e.offset}):\n\n{e.text}\nCheck terminal for full traceback.")
+        except Exception:
+            pass
+        sys.exit(1)
+    except Exception as e:
+        # Catch any other unexpected error during the import phase
+        print("="*60, file=sys.stderr)
+        print(f"UNEXPECTED STARTUP ERROR during import:", file=sys.stderr)
+        print(f"Error details: {e}", file=sys.stderr)
+        traceback.print_exc(file=sys.stderr) # Print full traceback
+        print("="*60, file=sys.stderr)
+        try:
+            _app = QApplication.instance() or QApplication([])
+            QMessageBox.critical(None, "Unexpected Startup Error", f"An unexpected error occurred during import:\n{e}\n\nCheck terminal for details.")
+        except Exception:
+            pass
+        sys.exit(1)
+    return PlayerWindow
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="PyPlay", description="PyPlay media player.")
+    parser.add_argument("paths", nargs="*", help="Media files, folders or playlists to open.")
+    parser.add_argument("--enqueue", action="store_true", help="Add the paths to the playlist of the running player without interrupting what is playing.")
+    parser.add_argument("--new-instance", action="store_true", help="Start a separate player instead of handing the paths to the running one.")
+    headless_group = parser.add_argument_group("headless mode")
+    headless_group.add_argument("--headless", action="store_true", help="Run without a window (audio playout, probing, batch jobs).")
+    headless_group.add_argument("--probe", action="store_true", help="With --headless: print media metadata instead of playing.")
+    headless_group.add_argument("--loop", action="store_true", help="With --headless: repeat the list forever.")
+    headless_group.add_argument("--volume", type=int, default=None, help="With --headless: playback volume (0-100).")
+    headless_group.add_argument("--status-interval", type=float, default=1.0, help="With --headless: seconds between status lines.")
+    headless_group.add_argument("--json", action="store_true", help="With --headless: report status as JSON lines.")
+    engine_group = parser.add_argument_group("playback engine")
+    engine_group.add_argument("--backend", choices=BACKENDS, default="libvlc", help="Playback engine. 'synthetic' plays made-up media on a clock without decoding anything, for load-testing the UI.")
+    engine_group.add_argument("--synthetic-media", type=int, default=0, metavar="N", help="With --backend synthetic: start with N made-up playlist entries.")
+    engine_group.add_argument("--synthetic-event-rate", type=float, default=None, metavar="HZ", help="With --backend synthetic: time/position events per second (default 60).")
+    parser.add_argument("--trace", metavar="FILE", help=f"Record timed spans (startup, opening, track changes, seeks) to a Chrome trace JSON file. Same as setting {tracing.TRACE_ENV_VAR}=FILE.")
+    parser.add_argument("--measure-startup", action="store_true", help="Print startup timings (time to interactive window, to libvlc ready and to first frame of the given file) as JSON and quit.")
+    sheet_group = parser.add_argument_group("contact sheets")
+    sheet_group.add_argument("--contact-sheet", metavar="OUTDIR", help="Write a tiled contact sheet PNG per video into OUTDIR and exit.")
+    sheet_group.add_argument("--frames", type=int, default=16, help="Evenly spaced frames per sheet (default 16).")
+    sheet_group.add_argument("--interval", type=float, default=None, help="Take one frame every N seconds instead of --frames.")
+    sheet_group.add_argument("--columns", type=int, default=4, help="Tiles per row (default 4).")
+    sheet_group.add_argument("--tile-width", type=int, default=320, help="Maximum tile width/height in pixels (default 320).")
+    sheet_group.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count).")
+    args, _qt_args = parser.parse_known_args(argv)
+    return args
 
 
 def main():
-    # Initialize QApplication only if import was potentially successful
-    # Although the sys.exit() above should prevent this point if import failed
-    if not player_ui_module_available:
-         print("Exiting because PlayerWindow could not be imported.", file=sys.stderr)
-         sys.exit(1)
-
+    args = parse_args(sys.argv[1:])
+    if args.trace: tracing.enable(args.trace)
+    tracing.complete("main.module_imports", _STARTED)
+    if args.contact_sheet:
+        from contact_sheet import run_cli
+        sys.exit(run_cli(args))
+    if args.headless:
+        from headless import run_headless
+        sys.exit(run_headless(args))
+
+    # Hand the paths to a running player before any GUI module is loaded, so a second launch exits in milliseconds.
+    instance_lock = None
+    if not (args.new_instance or args.measure_startup):
+        from single_instance import claim_or_forward
+        with tracing.span("main.single_instance"):
+            forwarded, instance_lock = claim_or_forward(args.paths, play_now=not args.enqueue)
+        if forwarded:
+            tracing.complete("main.forwarded", _STARTED)
+            sys.exit(0)
+
+    with tracing.span("main.import_gui"):
+        PlayerWindow = _import_player_window()
     app = QApplication(sys.argv)
 
+    from startup import load_stylesheet, cached_icon
+    assets_started = time.perf_counter()
+
     # --- Load and Apply Stylesheet ---
-    qss_file = QFile(STYLE_SHEET_PATH)
-    if qss_file.open(QFile.ReadOnly | QFile.Text):
-        stream = QTextStream(qss_file)
-        stylesheet = stream.readAll()
+    stylesheet = load_stylesheet(STYLE_SHEET_PATH)
+    if stylesheet is not None:
         app.setStyleSheet(stylesheet)
-        qss_file.close()
         print(f"Loaded stylesheet from: {STYLE_SHEET_PATH}")
     else:
         print(f"Warning: Could not load stylesheet file: {STYLE_SHEET_PATH}", file=sys.stderr)
 
-    # Set Application Icon
+    # Set Application Icon (pre-scaled sizes are cached so the 500px artwork is not decoded every launch)
     app_icon_path = os.path.join(assets_dir, "icon.png")
-    if os.path.exists(app_icon_path):
-        app.setWindowIcon(QIcon(app_icon_path))
+    app_icon = cached_icon(app_icon_path)
+    if app_icon is not None:
+        app.setWindowIcon(app_icon)
     else:
         print(f"Warning: App icon not found at {app_icon_path}", file=sys.stderr)
 
+    tracing.complete("main.assets", assets_started)
+
     # Optional Splash Screen
+    splash_started = time.perf_counter()
     splash_pix = QPixmap(os.path.join(assets_dir, "splash.png"))
     splash = None
     if not splash_pix.isNull():
@@ -108,21 +165,35 @@ def main():
         app.processEvents()
     else:
         print(f"Warning: Splash screen image not found or invalid at assets/splash.png", file=sys.stderr)
+    tracing.complete("main.splash", splash_started)
 
     # Create and Show Main Window
     player_window = None # Initialize to None
     try:
-        player_window = PlayerWindow() # This is where the __init__ runs
-        player_window.show() # Show the window
-
-        if splash:
-            splash.finish(player_window) # Finish splash after window is shown
-
-        # Load file if provided as argument (AFTER window is shown)
-        if len(sys.argv) > 1:
-            # Use QTimer to load file slightly after event loop starts
-            # This can prevent issues if loading immediately blocks UI
-            QTimer.singleShot(100, lambda: player_window.load_file(sys.argv[1]))
+        backend_options = {"event_rate_hz": args.synthetic_event_rate} if args.backend == "synthetic" and args.synthetic_event_rate else None
+        player_window = PlayerWindow(backend=args.backend, backend_options=backend_options) # This is where the __init__ runs
+        if args.measure_startup:
+            from startup import StartupProbe
+            player_window._startup_probe = StartupProbe(player_window, _STARTED, expect_media=bool(args.paths))
+        with tracing.span("main.show_window"):
+            player_window.show() # Show the window
+
+            if splash:
+                splash.finish(player_window) # Finish splash after window is shown
+
+        # Files/folders given as arguments are queued now and start playing once libvlc is ready
+        if args.paths:
+            player_window.open_paths(args.paths)
+        if args.backend == "synthetic" and args.synthetic_media > 0:
+            from synthetic_backend import synthetic_playlist
+            player_window._handle_opened_files(synthetic_playlist(args.synthetic_media))
+
+        # Later launches hand their paths to this window
+        if instance_lock is not None:
+            from single_instance import InstanceServer
+            instance_server = InstanceServer(instance_lock, parent=player_window)
+            instance_server.open_requested.connect(player_window.open_remote_request)
+            if instance_server.listen(): app.aboutToQuit.connect(instance_server.close)
 
     except Exception as e:
         print("="*60, file=sys.stderr)
@@ -140,12 +211,15 @@ def main():
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
-    # Basic check for dependencies before running main
-    try:
-        import PyQt5
-        import vlc
-    except ImportError as dep_error:
-         print(f"Dependency Error: {dep_error}. Please install PyQt5 and python-vlc.", file=sys.stderr)
+    # Contact-sheet workers are spawned processes on Windows/macOS; they must not re-run main().
+    import multiprocessing
+    multiprocessing.freeze_support()
+
+    # Basic check for dependencies before running main (find_spec only: python-vlc loads libvlc when imported)
+    import importlib.util
+    missing = [name for name in ("PyQt5", "vlc") if importlib.util.find_spec(name) is None]
+    if missing:
+         print(f"Dependency Error: No module named {', '.join(missing)}. Please install PyQt5 and python-vlc.", file=sys.stderr)
          sys.exit(1)
 
     main()
\ No newline at end of file
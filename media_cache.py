@@ -0,0 +1,91 @@
+# media_cache.py (LRU cache of prepared libvlc media and accounting of libvlc object lifetimes)
+import os
+import sys
+from collections import Counter, OrderedDict
+
+MEDIA_CACHE_SIZE = 8
+
+
+class LibvlcObjects:
+    """
+    Counts libvlc objects (instances, players, media, equalizers) created and
+    released, by kind. Anything still live after teardown was leaked.
+    """
+    def __init__(self): self.created = Counter(); self.released = Counter()
+
+    def track(self, kind, obj):
+        if obj is not None: self.created[kind] += 1
+        return obj
+
+    def release(self, kind, obj):
+        if obj is None: return
+        try: obj.release()
+        except Exception as e: print(f"Warning: Could not release libvlc {kind}: {e}", file=sys.stderr)
+        self.released[kind] += 1
+
+    def live(self):
+        """{kind: objects created but not released}, only for kinds with any live."""
+        return {kind: n - self.released[kind] for kind, n in self.created.items() if n > self.released[kind]}
+
+
+def _stamp(path):
+    try: st = os.stat(path); return st.st_size, st.st_mtime_ns
+    except OSError: return None
+
+
+class MediaCache:
+    """
+    Recently used vlc.Media objects by path, least recently used first. Each
+    entry keeps the media already parsed and with its sidecar subtitle
+    attached, so going back and forth within a working set skips media_new,
+    parsing and sidecar discovery. The cache holds one reference per entry
+    and releases it on eviction; the player keeps its own reference to what
+    it is playing. Pinned paths (the current and the prepared next media)
+    are never evicted. An entry whose file changed size or mtime is dropped
+    on lookup.
+    """
+    def __init__(self, capacity=MEDIA_CACHE_SIZE, objects=None):
+        self.capacity = capacity; self.objects = objects or LibvlcObjects()
+        self._entries = OrderedDict()   # path -> (media, subtitle_path, stamp)
+        self._pinned = set()
+        self.hits = 0; self.misses = 0; self.evictions = 0
+
+    def __len__(self): return len(self._entries)
+    def __contains__(self, path): return path in self._entries
+
+    def get(self, path):
+        """Returns (media, subtitle_path) and marks the entry most recently used, or None."""
+        entry = self._entries.get(path)
+        if entry is not None and entry[2] != _stamp(path): self.discard(path); entry = None
+        if entry is None: self.misses += 1; return None
+        self.hits += 1; self._entries.move_to_end(path)
+        return entry[0], entry[1]
+
+    def put(self, path, media, subtitle_path=None):
+        """Adds media (the cache takes over the caller's reference)."""
+        old = self._entries.pop(path, None)
+        if old is not None and old[0] is not media: self.objects.release("media", old[0]); self.evictions += 1
+        self._entries[path] = (media, subtitle_path, _stamp(path)); self._trim()
+
+    def pin(self, *paths):
+        """Protects exactly these paths from eviction (None entries are ignored)."""
+        self._pinned = {p for p in paths if p}; self._trim()
+
+    def discard(self, path):
+        entry = self._entries.pop(path, None)
+        if entry is not None: self.objects.release("media", entry[0]); self.evictions += 1
+
+    def clear(self):
+        for media, _, _ in self._entries.values(): self.objects.release("media", media)
+        self._entries.clear(); self._pinned = set()
+
+    def _trim(self):
+        if len(self._entries) <= self.capacity: return
+        newest = next(reversed(self._entries))   # just added or used; the caller is about to hand it to the player
+        for path in [p for p in self._entries if p not in self._pinned and p != newest][:len(self._entries) - self.capacity]:
+            self.discard(path)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"size": len(self._entries), "capacity": self.capacity, "hits": self.hits, "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0, "evictions": self.evictions}
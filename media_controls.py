@@ -1,59 +1,87 @@
 # media_controller.py (Updated for Delayed Initialization)
 import sys
-import vlc
+from lazy_import import lazy_import
+vlc = lazy_import("vlc")
 import os
 import time
 import traceback
 import pathlib
-from PyQt5.QtCore import QObject, pyqtSignal, QTimer
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer
 
-class MediaController(QObject):
-    time_changed = pyqtSignal(int)
-    position_changed = pyqtSignal(float)
-    duration_changed = pyqtSignal(int)
-    playback_state_changed = pyqtSignal(object)
-    error_occurred = pyqtSignal(str)
-    rate_changed = pyqtSignal(float)
+from playback_backend import PlaybackBackend, PlaybackState, MEDIA_STAT_FIELDS
+from media_cache import MediaCache, LibvlcObjects, MEDIA_CACHE_SIZE
+from subtitles import SidecarFinder, load_subtitle_file, NATIVE_SUBTITLE_EXTENSIONS
+from media_formats import extension_of, is_url
+from network_streams import StreamSettings, StreamProxy, RangeCache, StreamStats
+import tracing
 
-    def __init__(self, parent=None):
+class MediaController(PlaybackBackend):
+    """The libvlc playback engine."""
+    _advance_requested = pyqtSignal()
+    name = "libvlc"
+
+    def __init__(self, parent=None, media_cache_size=MEDIA_CACHE_SIZE):
         super().__init__(parent)
         # --- Variables are set, but VLC is NOT initialized yet ---
+        # Lifecycle: one libvlc instance and one player live from initialize() to release_resources() and are
+        # reused for every track. Media objects are owned by media_cache; self.media/_next_media borrow pinned entries.
+        self.libvlc_objects = LibvlcObjects()
+        self.media_cache = MediaCache(media_cache_size, self.libvlc_objects)
         self._vlc_instance = None
         self.media_player = None
         self.media = None
         self.event_manager = None
-        self._last_time_ms = -1
-        self._last_position = -1.0
         self._last_update_time = 0
         self._last_rate = 1.0
         self._loop_enabled = False
+        # --- Gapless: the next entry is prepared ahead and swapped in on end-of-track ---
+        self._current_media_path = None
+        self._next_media = None; self._next_media_path = None
+        self._seek_trace = None
+        # --- Resume: a start offset is applied by set_time() once the media reports Playing ---
+        self._pending_start_ms = 0; self._next_start_ms = 0
+        self._equalizer = None; self._track_gain_db = 0.0
+        # --- Subtitles: sidecars are discovered here (libvlc's own autodetection is off) and parsed for search/lookup ---
+        self.sidecar_finder = SidecarFinder()
+        self._subtitle_paths = {}   # media path -> sidecar attached to its vlc.Media
+        # --- Network streams: per-source options, a local byte-range cache (started on first use) and startup/rebuffer stats ---
+        self.stream_settings = None; self.stream_proxy = None; self._stream_stats = None
+        # libvlc reports states on its own thread; timers and seeks are handled when the signal reaches the GUI thread.
+        self.playback_state_changed.connect(self._apply_pending_start); self.playback_state_changed.connect(self._state_reached_gui)
+        self._advance_requested.connect(self._advance_to_prepared, Qt.QueuedConnection)
+        self._disabled_video_track = None; self._frames_decoded = 0   # video frames decoded by media played before the current one
         self._update_timer = QTimer(self)
         self._update_timer.setInterval(250)
         self._update_timer.timeout.connect(self._check_time_position_and_rate)
         print("MediaController object created (VLC not yet initialized).")
 
-    def initialize_vlc(self):
+    def initialize(self, extra_args=None):
         """
         This new method performs the actual VLC initialization.
-        It should only be called after the main Qt window is shown.
+        In the GUI it should only be called after the main Qt window is shown;
+        the headless engine calls it directly with e.g. ['--no-video'].
         """
-        print("--- initialize_vlc called. Attempting to create VLC instance. ---")
+        print("--- MediaController.initialize called. Attempting to create VLC instance. ---")
+        started = time.perf_counter()
         try:
             vlc_args = []
             if sys.platform.startswith('linux'):
                  vlc_args.append('--no-xlib')
+            vlc_args.append('--no-sub-autodetect-file')   # SidecarFinder attaches exactly one sidecar per file
+            vlc_args.extend(extra_args or [])
 
-            self._vlc_instance = vlc.Instance(vlc_args)
+            self._vlc_instance = self.libvlc_objects.track("instance", vlc.Instance(vlc_args))
             if not self._vlc_instance:
                 raise vlc.VLCException("Failed to create VLC instance")
 
-            self.media_player = self._vlc_instance.media_player_new()
+            self.media_player = self.libvlc_objects.track("player", self._vlc_instance.media_player_new())
             if not self.media_player:
                  raise vlc.VLCException("Failed to create VLC media player")
 
             print("VLC instance and media player created successfully.")
             self.event_manager = self.media_player.event_manager()
             self._setup_events()
+            self.event_bridge.start()
             return True
         except Exception as e:
             error_msg = f"Failed to initialize VLC: {e}"
@@ -62,9 +90,15 @@ class MediaController(QObject):
             self.error_occurred.emit(error_msg)
             self.release_resources() # Clean up any partial initialization
             return False
+        finally:
+            tracing.complete("MediaController.initialize", started, ok=self.media_player is not None)
+
+    def is_ready(self): return self.media_player is not None
+
+    def version_string(self):
+        try: return f"libvlc {vlc.libvlc_get_version().decode('utf-8', 'ignore')}"
+        except Exception: return "libvlc (version unknown)"
 
-    # The rest of the file remains the same as your fully working version.
-    # I am including it to be complete.
     def _setup_events(self):
         if not self.event_manager: return
         self.event_manager.event_attach(vlc.EventType.MediaPlayerTimeChanged,lambda e: self._on_time_changed(e))
@@ -76,24 +110,21 @@ class MediaController(QObject):
         self.event_manager.event_attach(vlc.EventType.MediaPlayerEndReached,lambda e: self._on_state_changed(e))
         self.event_manager.event_attach(vlc.EventType.MediaPlayerEncounteredError,lambda e: self._on_error(e))
         self.event_manager.event_attach(vlc.EventType.MediaPlayerBuffering,lambda e: self._on_buffering(e))
+        self.event_manager.event_attach(vlc.EventType.MediaPlayerVout,lambda e: self._on_vout(e))
         print("VLC events attached successfully.")
 
     def _on_time_changed(self, event):
-        if self.media_player:
-            current_time = self.media_player.get_time()
-            if current_time != self._last_time_ms:
-                self._last_time_ms = current_time; self.time_changed.emit(current_time)
+        self.event_bridge.post_time(event.u.new_time)
+        if self._seek_trace is not None:
+            # The first time update after set_position() closes the seek span.
+            token, self._seek_trace = self._seek_trace, None; tracing.end_async(token, time_ms=event.u.new_time)
 
     def _on_position_changed(self, event):
-        if self.media_player:
-            current_position = self.media_player.get_position()
-            if abs(current_position - self._last_position) > 0.001:
-                self._last_position = current_position; self.position_changed.emit(current_position)
+        self.event_bridge.post_position(event.u.new_position)
 
     def _check_time_position_and_rate(self):
         if not self.media_player: self._update_timer.stop(); return
-        state = self.media_player.get_state()
-        if state not in [vlc.State.Playing, vlc.State.Paused]:
+        if self.get_state() not in (PlaybackState.Playing, PlaybackState.Paused):
             if self._update_timer.isActive(): self._update_timer.stop()
             return
         current_rate = self.media_player.get_rate()
@@ -101,21 +132,84 @@ class MediaController(QObject):
             self._last_rate = current_rate; self.rate_changed.emit(current_rate)
 
     def _on_length_changed(self, event):
-        if self.media_player: self.duration_changed.emit(self.media_player.get_length())
+        self.event_bridge.post_length(event.u.new_length); self.duration_changed.emit(event.u.new_length)
 
     def _on_state_changed(self, event):
         if self.media_player:
-            state = self.media_player.get_state()
+            state = self.get_state()
+            advance = state == PlaybackState.Ended and not self._loop_enabled and self._next_media is not None
+            if advance:
+                # Flag before emitting so the UI skips its own delayed _play_next.
+                self.advance_pending = True; self._begin_transition("gapless", self._next_media_path)
+            elif state == PlaybackState.Playing:
+                self._finish_transition()
+                if self._stream_stats is not None: self._stream_stats.playing()
+            elif state == PlaybackState.Error and self._transition_started is not None:
+                self._abandon_transition("playback error")
             self.playback_state_changed.emit(state)
-            if state == vlc.State.Ended and self._loop_enabled:
-                QTimer.singleShot(50, self.play)
-            elif state == vlc.State.Playing and not self._update_timer.isActive():
-                self._update_timer.start()
-            elif state in [vlc.State.Stopped, vlc.State.Ended, vlc.State.Error] and self._update_timer.isActive():
-                self._update_timer.stop()
+            if advance: self._advance_requested.emit()
+
+    def _state_reached_gui(self, state):
+        if state == PlaybackState.Ended and self._loop_enabled and not self.advance_pending:
+            QTimer.singleShot(50, self.play)
+        elif state == PlaybackState.Playing:
+            if not self.video_enabled: self._apply_video_enabled()   # a new media starts with its video track on
+            if not self.idle and not self._update_timer.isActive(): self._update_timer.start()
+        elif state in (PlaybackState.Stopped, PlaybackState.Ended, PlaybackState.Error) and self._update_timer.isActive():
+            self._update_timer.stop()
+
+    # --- Idle mode: nobody sees the window ---
+    def set_idle(self, idle):
+        """While idle the rate polling timer is off; time/position events still arrive at the event bridge's rate."""
+        if idle == self.idle: return
+        self.idle = idle
+        if idle: self._update_timer.stop()
+        elif self.media_player and self.get_state() == PlaybackState.Playing:
+            self._update_timer.start(); self._check_time_position_and_rate()
+
+    def set_video_enabled(self, enabled):
+        """Turns decoding of the video track off (audio keeps playing) or back on, for this and the following media."""
+        self.video_enabled = enabled
+        if self.media_player and self.get_state() in (PlaybackState.Playing, PlaybackState.Paused): self._apply_video_enabled()
+
+    def _apply_video_enabled(self):
+        try:
+            current = self.media_player.video_get_track()
+            if not self.video_enabled:
+                if current != -1: self._disabled_video_track = current; self.media_player.video_set_track(-1)
+            elif current == -1:
+                tracks = [track_id for track_id, _ in self.media_player.video_get_track_description() or () if track_id != -1]
+                track = self._disabled_video_track if self._disabled_video_track in tracks else (tracks[0] if tracks else None)
+                if track is not None: self.media_player.video_set_track(track)
+        except Exception as e: print(f"Warning: Could not switch the video track: {e}", file=sys.stderr)
+
+    def media_stats(self):
+        """libvlc's input and decoder counters for the current media, or None before anything is loaded."""
+        if self.media is None: return None
+        stats = vlc.MediaStats()
+        try:
+            if not self.media.get_stats(stats): return None
+        except Exception: return None
+        return {name: getattr(stats, name) for name in MEDIA_STAT_FIELDS}
+
+    def _on_vout(self, event):
+        if event.u.new_count > 0:
+            if self._stream_stats is not None: self._stream_stats.first_frame()
+            tracing.instant("video_output_started", path=self._current_media_path); self.video_output_started.emit()
 
     def _on_buffering(self, event):
-        self.playback_state_changed.emit(vlc.State.Buffering)
+        stats = self._stream_stats
+        if stats is not None and event is not None: stats.buffering(event.u.new_cache)
+        self.playback_state_changed.emit(PlaybackState.Buffering)
+
+    def stream_stats(self):
+        """Startup time, time to first frame and rebuffers of the stream playing now (None for local files)."""
+        return self._stream_stats.as_dict() if self._stream_stats is not None else None
+
+    def _finish_stream_stats(self):
+        if self._stream_stats is None: return
+        stats = self._stream_stats; self._stream_stats = None
+        print(stats.summary()); tracing.instant("stream_finished", **stats.as_dict())
 
     def _on_error(self, event):
         error_msg = "An unknown playback error occurred."
@@ -123,7 +217,7 @@ class MediaController(QObject):
         if err:
             try: error_msg += f"\n({vlc.libvlc_errmsg().decode('utf-8', 'ignore')})"
             except: pass
-        self.playback_state_changed.emit(vlc.State.Error)
+        self.playback_state_changed.emit(PlaybackState.Error)
         self.error_occurred.emit(error_msg)
 
     def set_video_widget(self, win_id):
@@ -132,16 +226,121 @@ class MediaController(QObject):
             elif sys.platform == "win32": self.media_player.set_hwnd(int(win_id))
             elif sys.platform == "darwin": self.media_player.set_nsobject(int(win_id))
 
-    def load_media(self, file_path):
+    def load_media(self, file_path, start_ms=0):
+        """Makes file_path the current media. With start_ms, playback jumps there as soon as it starts."""
         if not self.media_player: return False
-        if not file_path or not os.path.exists(file_path):
-            self.error_occurred.emit(f"File not found: {os.path.basename(file_path or 'Invalid Path')}")
-            return False
+        self._pending_start_ms = max(0, int(start_ms or 0))
+        with tracing.span("MediaController.load_media", path=file_path, start_ms=self._pending_start_ms):
+            if file_path and file_path == self._next_media_path:
+                # The prepared entry was requested directly (e.g. Next button); reuse it.
+                self._begin_transition("prepared", file_path)
+                self._set_current_media(self._take_prepared_media(), file_path); return True
+            self._begin_transition("cached" if file_path in self.media_cache else "cold", file_path)
+            if not file_path or not (is_url(file_path) or os.path.exists(file_path)):
+                self._abandon_transition("file not found")
+                self.error_occurred.emit(f"File not found: {os.path.basename(file_path or 'Invalid Path')}")
+                return False
+            try:
+                self._set_current_media(self._media_for(file_path), file_path); return True
+            except Exception as e:
+                self._abandon_transition(str(e))
+                self.error_occurred.emit(f"Error loading media: {e}"); return False
+
+    def _media_for(self, file_path, parse=False):
+        """The cached vlc.Media for file_path, or a new one with its sidecar attached (and added to the cache)."""
+        cached = self.media_cache.get(file_path)
+        if cached is not None:
+            media, self._subtitle_paths[file_path] = cached; return media
+        if is_url(file_path):
+            media = self.libvlc_objects.track("media", self._vlc_instance.media_new(*self._stream_mrl(file_path)))
+            self.media_cache.put(file_path, media); self._subtitle_paths[file_path] = None
+            return media
+        media = self.libvlc_objects.track("media", self._vlc_instance.media_new(pathlib.Path(file_path).as_uri()))
         try:
-            self.media = self._vlc_instance.media_new(pathlib.Path(file_path).as_uri())
-            self.media_player.set_media(self.media); return True
+            if parse: media.parse_with_options(vlc.MediaParseFlag.local, 0)
+            self._attach_sidecar(media, file_path)
+        finally:
+            self.media_cache.put(file_path, media, self._subtitle_paths.get(file_path))
+        return media
+
+    def _stream_mrl(self, url):
+        """(mrl, *options) for a stream URL: per-source caching options, http(s) routed through the local range cache."""
+        if self.stream_settings is None: self.stream_settings = StreamSettings.load()
+        mrl = url
+        if self.stream_settings.use_cache(url):
+            if self.stream_proxy is None:
+                self.stream_proxy = StreamProxy(RangeCache(max_bytes=self.stream_settings.cache_bytes)); self.stream_proxy.start()
+            mrl = self.stream_proxy.url_for(url)
+        return (mrl, *self.stream_settings.libvlc_options(url))
+
+    def _set_current_media(self, media, file_path):
+        self._finish_stream_stats()
+        previous = self.media_stats()
+        if previous: self._frames_decoded += previous["decoded_video"]
+        self._stream_stats = StreamStats(file_path) if is_url(file_path) else None
+        self.media = media
+        self.media_cache.pin(file_path, self._next_media_path)   # the previous media stays cached for going back
+        if file_path not in self._subtitle_paths: self._attach_sidecar(media, file_path)
+        self.media_player.set_media(self.media); self._current_media_path = file_path
+        self._load_subtitle_track(self._subtitle_paths.pop(file_path, None))
+        self._subtitle_paths = {p: s for p, s in self._subtitle_paths.items() if p == self._next_media_path}
+
+    def _attach_sidecar(self, media, file_path):
+        """Adds the best matching sidecar subtitle to media as a slave, before playback starts."""
+        subtitle_path = None
+        try:
+            subtitle_path = self.sidecar_finder.find(file_path)
+            if subtitle_path: media.slaves_add(vlc.MediaSlaveType.subtitle, 4, pathlib.Path(subtitle_path).as_uri())
+        except Exception as e:
+            print(f"Warning: Could not attach subtitles for {os.path.basename(file_path)}: {e}", file=sys.stderr)
+        self._subtitle_paths[file_path] = subtitle_path
+
+    def _load_subtitle_track(self, subtitle_path):
+        track = None
+        if subtitle_path and extension_of(subtitle_path) in NATIVE_SUBTITLE_EXTENSIONS:
+            try:
+                with tracing.span("MediaController.parse_subtitles", path=subtitle_path) as span:
+                    track = load_subtitle_file(subtitle_path); span.set(cues=len(track))
+            except (OSError, ValueError) as e:
+                print(f"Warning: Could not parse subtitles {subtitle_path}: {e}", file=sys.stderr)
+        self.subtitle_track = track; self.subtitles_changed.emit(track)
+
+    def prepare_next(self, file_path, start_ms=0):
+        """Creates and pre-parses the media for the entry expected to play next (optionally resuming at start_ms)."""
+        if not self._vlc_instance: return
+        if file_path == self._next_media_path: self._next_start_ms = max(0, int(start_ms or 0)); return
+        self.clear_next(); self._next_start_ms = max(0, int(start_ms or 0))
+        if not file_path or not (is_url(file_path) or os.path.exists(file_path)): return
+        try:
+            self._next_media = self._media_for(file_path, parse=True); self._next_media_path = file_path
+            self.media_cache.pin(self._current_media_path, file_path)
         except Exception as e:
-            self.error_occurred.emit(f"Error loading media: {e}"); return False
+            print(f"Warning: Could not prepare next media {file_path}: {e}", file=sys.stderr)
+
+    def clear_next(self):
+        """Drops the prepared entry; its media stays in the cache, unpinned."""
+        self._subtitle_paths.pop(self._next_media_path, None)
+        if self._take_prepared_media() is not None: self.media_cache.pin(self._current_media_path)
+
+    def _take_prepared_media(self):
+        media = self._next_media; self._next_media = self._next_media_path = None
+        return media
+
+    def _advance_to_prepared(self):
+        path = self._next_media_path; media = self._take_prepared_media()
+        self.advance_pending = False
+        if not (self.media_player and media is not None):
+            self._abandon_transition("nothing prepared"); return
+        self._set_current_media(media, path); self._pending_start_ms = self._next_start_ms
+        self.play()
+        self.media_advanced.emit(path)
+
+    def _apply_pending_start(self, state):
+        # Runs on the GUI thread (the signal is queued from libvlc's event thread); libvlc must not be re-entered from its callbacks.
+        if state == PlaybackState.Playing and self._pending_start_ms and self.media_player:
+            start_ms, self._pending_start_ms = self._pending_start_ms, 0
+            if self.media_player.is_seekable():
+                with tracing.span("MediaController.resume_seek", start_ms=start_ms): self.media_player.set_time(start_ms)
 
     def play(self):
         if self.media_player and self.media_player.play() == -1: self._on_error(None)
@@ -154,13 +353,29 @@ class MediaController(QObject):
 
     def seek(self, position_ratio):
         if self.media_player and self.media_player.is_seekable():
-            self.media_player.set_position(max(0.0, min(1.0, position_ratio)))
+            position_ratio = max(0.0, min(1.0, position_ratio))
+            if tracing.enabled():
+                if self._seek_trace is not None: tracing.end_async(self._seek_trace, superseded=True)
+                self._seek_trace = tracing.begin_async("seek", position=round(position_ratio, 4), from_ms=self.media_player.get_time())
+            self.media_player.set_position(position_ratio)
 
     def set_volume(self, volume):
         if self.media_player: self.media_player.audio_set_volume(max(0, min(100, volume)))
 
     def get_volume(self): return self.media_player.audio_get_volume() if self.media_player else 0
 
+    def set_track_gain(self, gain_db):
+        """Per-track normalization gain in dB, applied as the equalizer preamp so the volume setting is untouched. 0 removes it."""
+        if not self.media_player: return
+        gain_db = max(-20.0, min(20.0, float(gain_db or 0.0)))   # libvlc's preamp range
+        if gain_db == self._track_gain_db: return
+        self._track_gain_db = gain_db
+        if abs(gain_db) < 0.1: self.media_player.set_equalizer(None); return
+        if self._equalizer is None: self._equalizer = self.libvlc_objects.track("equalizer", vlc.AudioEqualizer())   # all bands flat
+        self._equalizer.set_preamp(gain_db); self.media_player.set_equalizer(self._equalizer)
+
+    def get_track_gain(self): return self._track_gain_db
+
     def set_playback_rate(self, rate):
         if self.media_player and self.media_player.is_seekable():
             self.media_player.set_rate(max(0.25, min(4.0, rate)))
@@ -169,7 +384,7 @@ class MediaController(QObject):
     def set_loop_current(self, loop): self._loop_enabled = loop
     def get_time_ms(self): return self.media_player.get_time() if self.media_player else 0
     def get_duration_ms(self): return self.media_player.get_length() if self.media_player else 0
-    def get_state(self): return self.media_player.get_state() if self.media_player else vlc.State.NothingSpecial
+    def get_state(self): return PlaybackState(self.media_player.get_state().value) if self.media_player else PlaybackState.NothingSpecial
 
     def get_audio_tracks(self):
         if self.media_player:
@@ -183,25 +398,66 @@ class MediaController(QObject):
     def set_audio_track(self, track_id):
         if self.media_player: self.media_player.audio_set_track(track_id)
 
+    def has_video(self):
+        """True when the current media has a video track (known once playback has started)."""
+        try: return bool(self.media_player) and self.media_player.video_get_track_count() > 0
+        except Exception: return False
+
     def set_aspect_ratio(self, ratio):
         if self.media_player: self.media_player.video_set_aspect_ratio((ratio or "").encode('utf-8'))
 
     def set_subtitle_file(self, subtitle_path):
         if self.media_player and subtitle_path and os.path.exists(subtitle_path):
-            return self.media_player.add_slave(vlc.MediaSlaveType.Subtitle, pathlib.Path(subtitle_path).as_uri(), True) == 0
+            if self.media_player.add_slave(vlc.MediaSlaveType.subtitle, pathlib.Path(subtitle_path).as_uri(), True) != 0: return False
+            self._load_subtitle_track(subtitle_path); return True
         return False
 
+    def set_time_ms(self, time_ms):
+        """Jumps to an absolute time, e.g. the start of a subtitle cue."""
+        if self.media_player and self.media_player.is_seekable():
+            if tracing.enabled():
+                if self._seek_trace is not None: tracing.end_async(self._seek_trace, superseded=True)
+                self._seek_trace = tracing.begin_async("seek", to_ms=int(time_ms), from_ms=self.media_player.get_time())
+            self.media_player.set_time(max(0, int(time_ms)))
+
+    def attach_frame_tap(self, frame_tap):
+        """Routes decoded video into a frame_tap.FrameTap instead of the video widget. Call before play()."""
+        if not self.media_player: return False
+        frame_tap.attach(self.media_player); return True
+
     def take_snapshot(self, save_path):
         return self.media_player.video_take_snapshot(0, save_path, 0, 0) == 0 if self.media_player and save_path else False
 
     def release_resources(self):
         print("Releasing VLC resources...")
         if self._update_timer.isActive(): self._update_timer.stop()
+        if self.event_bridge.is_active():
+            self.event_bridge.stop(); stats = self.event_bridge.stats()
+            print(f"Event bridge: {stats['events_received']} libvlc events, {stats['snapshots_delivered']} UI snapshots ({stats['coalesced_ratio']:.0%} coalesced).")
+        self.clear_next(); self._finish_stream_stats(); self._finish_stats()
+        if self.stream_proxy is not None:
+            proxy = self.stream_proxy.stats(); self.stream_proxy.stop(); self.stream_proxy = None
+            print(f"Stream cache: {proxy['bytes_from_origin']} bytes fetched, {proxy['bytes_served']} served to libvlc ({proxy['block_hits']} block hits, {proxy['block_misses']} misses).")
+        # Teardown order: the player first (it holds its own media reference), then cached media, then the instance.
         if self.media_player:
-            try: self.media_player.stop(); self.media_player.release()
-            except: pass
-        if self._vlc_instance:
-            try: self._vlc_instance.release()
-            except: pass
+            try: self.media_player.stop()
+            except Exception: pass
+        self.libvlc_objects.release("player", self.media_player)
+        cache = self.media_cache.stats(); self.media_cache.clear()
+        self.libvlc_objects.release("equalizer", self._equalizer); self._equalizer = None
+        self.libvlc_objects.release("instance", self._vlc_instance)
         self.media_player = self._vlc_instance = self.media = self.event_manager = None
-        print("VLC resources cleanup finished.")
\ No newline at end of file
+        self._current_media_path = None
+        if cache["hits"] or cache["misses"]:
+            print(f"Media cache: {cache['hits']} hits, {cache['misses']} misses, {cache['evictions']} evictions.")
+        leaked = self.libvlc_objects.live()
+        if leaked: print(f"Warning: libvlc objects not released: {leaked}", file=sys.stderr)
+        print("VLC resources cleanup finished.")
+
+    def resource_stats(self):
+        """Media cache counters plus libvlc objects currently alive, by kind, for monitoring."""
+        stats = self.media_cache.stats(); stats["live_objects"] = self.libvlc_objects.live()
+        stats["objects_created"] = sum(self.libvlc_objects.created.values()); stats["objects_released"] = sum(self.libvlc_objects.released.values())
+        current = self.media_stats(); stats["frames_decoded"] = self._frames_decoded + (current["decoded_video"] if current else 0)
+        if self.stream_proxy is not None: stats["stream_cache"] = self.stream_proxy.stats()
+        return stats
@@ -0,0 +1,23 @@
+# media_formats.py (File extensions and entry kinds shared by the GUI, the scanner and the headless engine)
+import os
+from urllib.parse import urlsplit
+
+SUPPORTED_MEDIA_EXTENSIONS = [".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".mpeg", ".mpg", ".mp3", ".wav", ".ogg", ".flac", ".aac", ".m4a"]
+SUPPORTED_SUBTITLE_EXTENSIONS = [".srt", ".sub", ".ssa", ".ass", ".vtt"]
+AUDIO_ONLY_EXTENSIONS = {".mp3", ".wav", ".ogg", ".flac", ".aac", ".m4a"}
+PLAYLIST_EXTENSIONS = {".m3u", ".m3u8", ".pls", ".xspf"}
+
+
+def extension_of(path): return os.path.splitext(path)[1].lower()
+def is_audio_only(path): return bool(path) and extension_of(path) in AUDIO_ONLY_EXTENSIONS
+
+
+def is_url(entry):
+    """True for scheme://... entries other than file:// (Windows drive letters are not schemes)."""
+    if "://" not in entry: return False   # fast path: plain paths are the vast majority of entries
+    scheme = urlsplit(entry).scheme
+    return len(scheme) > 1 and scheme != "file"
+
+
+def is_playlist_file(path): return extension_of(path) in PLAYLIST_EXTENSIONS and not is_url(path)   # an .m3u8 URL is an HLS stream
+def normalize_entry(entry): return entry if is_url(entry) else os.path.normpath(entry)
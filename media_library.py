@@ -0,0 +1,207 @@
+# media_library.py (Persistent media metadata index filled by background libvlc parsing)
+import os
+import sys
+import json
+import time
+import struct
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from lazy_import import lazy_import
+vlc = lazy_import("vlc")
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from app_paths import data_path
+
+LIBRARY_DB_NAME = "library.sqlite3"
+_FIELDS = ("path", "mtime", "size", "duration_ms", "video_codec", "audio_codec", "width", "height",
+           "video_tracks", "audio_tracks", "subtitle_tracks", "audio_track_names",
+           "title", "artist", "album", "genre", "date", "status", "parsed_at")
+_META_TAGS = (("title", "Title"), ("artist", "Artist"), ("album", "Album"), ("genre", "Genre"), ("date", "Date"))
+
+
+def _fourcc(codec):
+    try: return struct.pack("<I", codec).decode("ascii", "replace").strip("\x00 ") or None
+    except Exception: return None
+
+
+def _text(value):
+    if isinstance(value, bytes): value = value.decode("utf-8", "ignore")
+    return value or None
+
+
+def probe_media(instance, path, timeout_ms=5000):
+    """
+    Parses a local file with libvlc (no playback) and returns a metadata record.
+    Safe to call from worker threads; each call uses its own vlc.Media.
+    """
+    st = os.stat(path)
+    record = dict.fromkeys(_FIELDS); record.update(path=path, mtime=st.st_mtime, size=st.st_size, parsed_at=time.time(),
+                                                  video_tracks=0, audio_tracks=0, subtitle_tracks=0, status="failed")
+    media = instance.media_new_path(path)
+    if not media: return record
+    parsed = threading.Event()
+    events = media.event_manager()
+    events.event_attach(vlc.EventType.MediaParsedChanged, lambda e: parsed.set())
+    try:
+        if media.parse_with_options(vlc.MediaParseFlag.local, timeout_ms) == -1: return record
+        if not parsed.wait(timeout_ms / 1000.0 + 1.0): record["status"] = "timeout"; return record
+        status = media.get_parsed_status()
+        record["status"] = {vlc.MediaParsedStatus.done: "done", vlc.MediaParsedStatus.timeout: "timeout",
+                            vlc.MediaParsedStatus.skipped: "skipped"}.get(status, "failed")
+        if status != vlc.MediaParsedStatus.done: return record
+        duration = media.get_duration(); record["duration_ms"] = duration if duration and duration > 0 else None
+        audio_names = []
+        for track in media.tracks_get() or []:
+            if track.type == vlc.TrackType.video:
+                record["video_tracks"] += 1
+                if record["video_codec"] is None:
+                    record["video_codec"] = _fourcc(track.codec)
+                    if track.video: record["width"] = track.video.contents.width; record["height"] = track.video.contents.height
+            elif track.type == vlc.TrackType.audio:
+                record["audio_tracks"] += 1
+                if record["audio_codec"] is None: record["audio_codec"] = _fourcc(track.codec)
+                name = _text(track.description) or _text(track.language) or f"Track {record['audio_tracks']}"
+                audio_names.append([track.id, name])
+            elif track.type == vlc.TrackType.ext:
+                record["subtitle_tracks"] += 1
+        record["audio_track_names"] = json.dumps(audio_names)
+        for field, meta in _META_TAGS: record[field] = _text(media.get_meta(getattr(vlc.Meta, meta)))
+        return record
+    finally:
+        try: events.event_detach(vlc.EventType.MediaParsedChanged)
+        except Exception: pass
+        media.release()
+
+
+class MediaLibrary:
+    """
+    SQLite-backed metadata index keyed by path, with mtime+size used to decide
+    whether an entry is still current. Durations are mirrored in memory so
+    playlist totals never touch the database.
+    """
+    def __init__(self, db_path=None):
+        self.db_path = db_path or data_path(LIBRARY_DB_NAME)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL"); self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS media (
+            path TEXT PRIMARY KEY, mtime REAL, size INTEGER, duration_ms INTEGER,
+            video_codec TEXT, audio_codec TEXT, width INTEGER, height INTEGER,
+            video_tracks INTEGER, audio_tracks INTEGER, subtitle_tracks INTEGER, audio_track_names TEXT,
+            title TEXT, artist TEXT, album TEXT, genre TEXT, date TEXT, status TEXT, parsed_at REAL)""")
+        self._conn.commit()
+        self._durations = None
+        self._records = {}; self._records_limit = 4096
+
+    def _load_durations(self):
+        with self._lock:
+            if self._durations is None:
+                self._durations = dict(self._conn.execute("SELECT path, duration_ms FROM media WHERE duration_ms > 0"))
+        return self._durations
+
+    def get(self, path):
+        """Returns the stored record for path as a dict, or None."""
+        record = self._records.get(path, False)
+        if record is not False: return record
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(_FIELDS)} FROM media WHERE path = ?", (path,)).fetchone()
+        record = dict(zip(_FIELDS, row)) if row else None
+        if len(self._records) >= self._records_limit: self._records.clear()
+        self._records[path] = record
+        return record
+
+    def duration_ms(self, path): return self._load_durations().get(path)
+
+    def total_duration_ms(self, paths):
+        durations = self._load_durations()
+        return sum(durations.get(p, 0) for p in paths)
+
+    def audio_track_names(self, path):
+        record = self.get(path)
+        try: return [tuple(t) for t in json.loads(record["audio_track_names"])] if record and record["audio_track_names"] else []
+        except ValueError: return []
+
+    def is_current(self, path, mtime, size):
+        with self._lock:
+            row = self._conn.execute("SELECT mtime, size FROM media WHERE path = ?", (path,)).fetchone()
+        return row is not None and row[0] == mtime and row[1] == size
+
+    def put_many(self, records):
+        if not records: return
+        rows = [tuple(r[f] for f in _FIELDS) for r in records]
+        with self._lock:
+            self._conn.executemany(f"INSERT OR REPLACE INTO media ({', '.join(_FIELDS)}) VALUES ({', '.join('?' * len(_FIELDS))})", rows)
+            self._conn.commit()
+            for r in records:
+                self._records.pop(r["path"], None)
+                if self._durations is not None:
+                    if r["duration_ms"]: self._durations[r["path"]] = r["duration_ms"]
+                    else: self._durations.pop(r["path"], None)
+
+    def close(self):
+        with self._lock:
+            try: self._conn.close()
+            except Exception: pass
+
+
+class LibraryIndexer(QObject):
+    """
+    Fills a MediaLibrary from a bounded pool of parser threads sharing one
+    audio/video-less libvlc instance. Files whose mtime and size match the
+    stored entry are skipped, so re-adding a folder only re-parses changes.
+    """
+    entries_updated = pyqtSignal(list)   # paths whose record changed
+    progress = pyqtSignal(int, int)      # processed, queued
+
+    def __init__(self, library, max_workers=2, chunk_size=32, parse_timeout_ms=5000, parent=None):
+        super().__init__(parent)
+        self.library = library; self.chunk_size = chunk_size; self.parse_timeout_ms = parse_timeout_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="PyPlayIndex")
+        self._instance = None; self._instance_lock = threading.Lock()
+        self._counter_lock = threading.Lock(); self._queued = 0; self._processed = 0
+        self._closed = False
+
+    def _vlc_instance(self):
+        with self._instance_lock:
+            if self._instance is None:
+                self._instance = vlc.Instance(["--quiet", "--no-video", "--no-audio", "--no-xlib"])
+            return self._instance
+
+    def enqueue(self, paths):
+        if self._closed: return
+        paths = list(paths)
+        with self._counter_lock: self._queued += len(paths)
+        for start in range(0, len(paths), self.chunk_size):
+            self._executor.submit(self._index_chunk, paths[start:start + self.chunk_size])
+
+    def _index_chunk(self, paths):
+        records = []
+        try:
+            for path in paths:
+                if self._closed: return
+                try:
+                    st = os.stat(path)
+                    if self.library.is_current(path, st.st_mtime, st.st_size): continue
+                    records.append(probe_media(self._vlc_instance(), path, self.parse_timeout_ms))
+                except OSError:
+                    continue
+                except Exception as e:
+                    print(f"Warning: Could not parse metadata for {path}: {e}", file=sys.stderr)
+            if self._closed: return
+            self.library.put_many(records)
+        finally:
+            with self._counter_lock: self._processed += len(paths); processed, queued = self._processed, self._queued
+            if not self._closed:
+                if records: self.entries_updated.emit([r["path"] for r in records])
+                self.progress.emit(processed, queued)
+
+    def shutdown(self):
+        self._closed = True
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        with self._instance_lock:
+            if self._instance is not None:
+                try: self._instance.release()
+                except Exception: pass
+                self._instance = None
@@ -0,0 +1,403 @@
+# network_streams.py (Network sources: per-source libvlc caching options, a local byte-range caching proxy and stream playback stats)
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.error import URLError
+from urllib.parse import urlsplit, urljoin, quote, unquote
+from urllib.request import Request, urlopen
+
+from app_paths import cache_path, data_path
+from media_formats import extension_of
+
+STREAM_SETTINGS_NAME = "streams.json"
+BLOCK_SIZE = 512 * 1024
+READAHEAD_BLOCKS = 4          # missing blocks fetched per origin request
+MAX_CACHE_BYTES = 1024 * 1024 * 1024
+INFO_TTL_S = 24 * 3600        # a cached resource older than this is fetched again
+ORIGIN_TIMEOUT_S = 15
+MAX_PLAYLIST_BYTES = 4 * 1024 * 1024
+USER_AGENT = "PyPlay"
+
+# Defaults per scheme; entries of streams.json override them for matching sources.
+DEFAULT_SOURCES = (
+    {"match": "http", "network_caching_ms": 1500, "cache": True},
+    {"match": "https", "network_caching_ms": 1500, "cache": True},
+    {"match": ".m3u8", "network_caching_ms": 3000},
+    {"match": "rtsp", "network_caching_ms": 500, "rtsp_tcp": True},
+    {"match": "rtmp", "network_caching_ms": 1000},
+    {"match": "udp", "network_caching_ms": 300},
+)
+
+
+class StreamSettings:
+    """
+    Per-source options for network streams, from DEFAULT_SOURCES and the
+    optional streams.json in the data folder:
+
+        {"cache_mb": 1024,
+         "sources": [{"match": "cdn.example.com", "network_caching_ms": 4000, "prefetch_kb": 8192},
+                     {"match": "rtsp://cam.local", "network_caching_ms": 200, "cache": false}]}
+
+    "match" is a scheme ("rtsp"), a host (subdomains included), a URL prefix,
+    or an extension (".m3u8"). Every matching entry applies, later ones
+    overriding earlier ones. Keys: network_caching_ms, prefetch_kb,
+    rtsp_tcp, http_reconnect and cache (route http(s) through the local
+    byte-range cache).
+    """
+    def __init__(self, sources=(), cache_mb=MAX_CACHE_BYTES // (1024 * 1024)):
+        self.sources = list(DEFAULT_SOURCES) + [s for s in sources if isinstance(s, dict) and s.get("match")]
+        self.cache_bytes = int(cache_mb) * 1024 * 1024
+
+    @classmethod
+    def load(cls, path=None):
+        path = path or data_path(STREAM_SETTINGS_NAME)
+        if not os.path.exists(path): return cls()
+        try:
+            with open(path, "r", encoding="utf-8") as f: config = json.load(f)
+            return cls(config.get("sources", []), config.get("cache_mb", MAX_CACHE_BYTES // (1024 * 1024)))
+        except (OSError, ValueError, AttributeError, TypeError) as e:
+            print(f"Warning: Ignoring stream settings {path}: {e}", file=sys.stderr); return cls()
+
+    @staticmethod
+    def _matches(match, url, parts):
+        match = match.lower()
+        if "://" in match: return url.lower().startswith(match)
+        if match.startswith("."): return extension_of(parts.path) == match
+        host = (parts.hostname or "").lower()
+        return match == parts.scheme or host == match or host.endswith("." + match)
+
+    def options_for(self, url):
+        """The merged settings of every source entry matching url."""
+        parts = urlsplit(url); merged = {}
+        for source in self.sources:
+            if self._matches(source["match"], url, parts): merged.update((k, v) for k, v in source.items() if k != "match")
+        return merged
+
+    def libvlc_options(self, url):
+        """Media options (":name=value") for url."""
+        options = self.options_for(url); result = []
+        if options.get("network_caching_ms") is not None: result.append(f":network-caching={int(options['network_caching_ms'])}")
+        if options.get("prefetch_kb"): result.append(f":prefetch-buffer-size={int(options['prefetch_kb'])}")
+        if options.get("rtsp_tcp"): result.append(":rtsp-tcp")
+        if options.get("http_reconnect", urlsplit(url).scheme in ("http", "https")): result.append(":http-reconnect")
+        return result
+
+    def use_cache(self, url):
+        return urlsplit(url).scheme in ("http", "https") and bool(self.options_for(url).get("cache"))
+
+
+class RangeCache:
+    """
+    Fetched byte ranges of remote resources on disk, as fixed-size blocks
+    under one folder per URL (plus info.json with the total length and
+    content type). Size-bounded: least recently read blocks (by mtime,
+    refreshed on hit) are evicted once the total passes max_bytes.
+    """
+    def __init__(self, directory=None, max_bytes=MAX_CACHE_BYTES, block_size=BLOCK_SIZE):
+        self.directory = directory or cache_path("streams"); os.makedirs(self.directory, exist_ok=True)
+        self.max_bytes = max_bytes; self.block_size = block_size
+        self._lock = threading.Lock(); self._sizes = None; self._total = 0
+        self.hits = 0; self.misses = 0
+
+    def _folder(self, url):
+        key = hashlib.sha1(url.encode("utf-8", "surrogatepass")).hexdigest()
+        return os.path.join(self.directory, key[:2], key)
+
+    def _block_file(self, url, index): return os.path.join(self._folder(url), f"{index}.blk")
+
+    def _load_index(self):
+        if self._sizes is not None: return
+        self._sizes = {}; self._total = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".blk"):
+                    file_path = os.path.join(root, name)
+                    try: size = os.path.getsize(file_path)
+                    except OSError: continue
+                    self._sizes[file_path] = size; self._total += size
+
+    def info(self, url):
+        """{"length", "content_type", "stored_at"} of a cached resource, or None (also when it expired)."""
+        try:
+            with open(os.path.join(self._folder(url), "info.json"), "r", encoding="utf-8") as f: info = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - info.get("stored_at", 0) > INFO_TTL_S: self.forget(url); return None
+        return info
+
+    def set_info(self, url, length, content_type):
+        folder = self._folder(url); tmp_path = os.path.join(folder, "info.json.tmp")
+        try:
+            os.makedirs(folder, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"url": url, "length": length, "content_type": content_type, "stored_at": time.time()}, f)
+            os.replace(tmp_path, os.path.join(folder, "info.json"))
+        except OSError as e:
+            print(f"Warning: Could not write stream cache entry: {e}", file=sys.stderr)
+
+    def has_block(self, url, index): return os.path.exists(self._block_file(url, index))
+
+    def get_block(self, url, index):
+        file_path = self._block_file(url, index)
+        try:
+            with open(file_path, "rb") as f: data = f.read()
+            os.utime(file_path)
+        except OSError:
+            self.misses += 1; return None
+        self.hits += 1; return data
+
+    def put_block(self, url, index, data):
+        file_path = self._block_file(url, index); tmp_path = f"{file_path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(tmp_path, "wb") as f: f.write(data)
+            os.replace(tmp_path, file_path)
+        except OSError as e:
+            print(f"Warning: Could not write stream cache block: {e}", file=sys.stderr); return
+        with self._lock:
+            self._load_index()
+            self._total += len(data) - self._sizes.get(file_path, 0); self._sizes[file_path] = len(data)
+            if self._total > self.max_bytes: self._evict()
+
+    def forget(self, url):
+        """Drops everything cached for url (it changed or expired)."""
+        folder = self._folder(url)
+        try: names = os.listdir(folder)
+        except OSError: return
+        with self._lock:
+            self._load_index()
+            for name in names:
+                file_path = os.path.join(folder, name)
+                try: os.remove(file_path)
+                except OSError: pass
+                self._total -= self._sizes.pop(file_path, 0)
+
+    def _evict(self):
+        target = int(self.max_bytes * 0.9); entries = []
+        for file_path in self._sizes:
+            try: entries.append((os.stat(file_path).st_mtime, file_path))
+            except OSError: entries.append((0, file_path))
+        entries.sort()
+        for _, file_path in entries:
+            if self._total <= target: break
+            try: os.remove(file_path)
+            except OSError: pass
+            self._total -= self._sizes.pop(file_path, 0)
+
+    def stats(self):
+        with self._lock: self._load_index(); total = self._total
+        return {"bytes": total, "max_bytes": self.max_bytes, "block_hits": self.hits, "block_misses": self.misses}
+
+
+def _parse_range(header, length):
+    """(start, end) inclusive for a single "bytes=a-b" / "bytes=a-" / "bytes=-n" header, or None for a full response."""
+    match = re.fullmatch(r"\s*bytes=(\d*)-(\d*)\s*", header or "")
+    if not match or not (match.group(1) or match.group(2)): return None
+    if not match.group(1): return max(0, length - int(match.group(2))), length - 1
+    start = int(match.group(1)); end = min(length - 1, int(match.group(2))) if match.group(2) else length - 1
+    return (start, end) if end >= start or start >= length else None
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "PyPlayStreamProxy"
+
+    def do_GET(self): self.server.proxy._handle(self, head=False)
+    def do_HEAD(self): self.server.proxy._handle(self, head=True)
+    def log_message(self, format, *args): pass
+
+
+class StreamProxy:
+    """
+    A local HTTP server that libvlc reads http(s) streams through. A URL is
+    served at http://127.0.0.1:<port>/<scheme>/<host>/<path>, so relative
+    links inside HLS playlists resolve back to the proxy; absolute links in
+    playlists are rewritten. Media bodies (files, HLS segments) are served
+    from RangeCache blocks and only missing blocks are fetched from the
+    origin, READAHEAD_BLOCKS at a time, so seeking back or watching again
+    costs no download. Playlists are never cached (live ones change), and
+    origins without range support are passed through uncached.
+    """
+    def __init__(self, cache=None):
+        self.cache = cache or RangeCache()
+        self._server = None; self._thread = None; self._no_ranges = set()
+        self._lock = threading.Lock()
+        self.requests = 0; self.bytes_served = 0; self.bytes_from_origin = 0
+
+    def start(self):
+        if self._server is not None: return True
+        try:
+            self._server = ThreadingHTTPServer(("127.0.0.1", 0), _ProxyHandler)
+        except OSError as e:
+            print(f"Warning: Stream cache proxy unavailable: {e}", file=sys.stderr); return False
+        self._server.daemon_threads = True; self._server.proxy = self
+        self._thread = threading.Thread(target=self._server.serve_forever, name="PyPlayStreamProxy", daemon=True); self._thread.start()
+        print(f"Stream cache proxy listening on 127.0.0.1:{self._server.server_address[1]}.")
+        return True
+
+    def stop(self):
+        if self._server is None: return
+        self._server.shutdown(); self._server.server_close(); self._thread.join(timeout=2.0)
+        self._server = self._thread = None
+
+    def is_running(self): return self._server is not None
+
+    # --- URL mapping ---
+    def url_for(self, url):
+        """The proxied form of an http(s) URL (unchanged when the proxy is not running or for other schemes)."""
+        parts = urlsplit(url)
+        if self._server is None or parts.scheme not in ("http", "https"): return url
+        proxied = f"http://127.0.0.1:{self._server.server_address[1]}/{parts.scheme}/{quote(parts.netloc, safe='')}{parts.path or '/'}"
+        return proxied + ("?" + parts.query if parts.query else "")
+
+    @staticmethod
+    def origin_of(request_path):
+        scheme, _, rest = request_path.lstrip("/").partition("/")
+        netloc, _, path = rest.partition("/")
+        if scheme not in ("http", "https") or not netloc: return None
+        return f"{scheme}://{unquote(netloc)}/{path}"
+
+    # --- Serving ---
+    def _handle(self, handler, head):
+        origin = self.origin_of(handler.path)
+        if origin is None: handler.send_error(404); return
+        with self._lock: self.requests += 1
+        try:
+            if extension_of(urlsplit(origin).path) in (".m3u8", ".m3u"): self._serve_playlist(handler, origin, head); return
+            info = None if origin in self._no_ranges else self.cache.info(origin) or self._probe(origin)
+            if info is None: self._pass_through(handler, origin, head); return
+            self._serve_blocks(handler, origin, info, head)
+        except (BrokenPipeError, ConnectionResetError):
+            pass   # libvlc dropped the connection (seek, stop); not an error
+        except (URLError, OSError, ValueError) as e:
+            print(f"Warning: Stream proxy could not fetch {origin}: {e}", file=sys.stderr)
+            try: handler.send_error(502)
+            except OSError: pass
+
+    def _open(self, url, start=None, end=None):
+        headers = {"User-Agent": USER_AGENT}
+        if start is not None: headers["Range"] = f"bytes={start}-{end}"
+        return urlopen(Request(url, headers=headers), timeout=ORIGIN_TIMEOUT_S)
+
+    def _count_origin(self, n):
+        with self._lock: self.bytes_from_origin += n
+
+    def _probe(self, origin):
+        """Fetches block 0 with a range request; returns the resource info, or None when the origin ignores ranges."""
+        response = self._open(origin, 0, self.cache.block_size - 1)
+        with response:
+            total = (response.headers.get("Content-Range") or "").rpartition("/")[2]
+            if response.status != 206 or not total.isdigit():
+                self._no_ranges.add(origin); return None
+            data = response.read(); self._count_origin(len(data))
+        content_type = response.headers.get("Content-Type", "application/octet-stream")
+        self.cache.set_info(origin, int(total), content_type); self.cache.put_block(origin, 0, data)
+        return {"length": int(total), "content_type": content_type}
+
+    def _fetch_blocks(self, origin, index, length):
+        """Fetches the run of missing blocks starting at index (at most READAHEAD_BLOCKS) and returns block index."""
+        block_size = self.cache.block_size; last_block = (length - 1) // block_size; run = 1
+        while run < READAHEAD_BLOCKS and index + run <= last_block and not self.cache.has_block(origin, index + run): run += 1
+        start = index * block_size; end = min(length, (index + run) * block_size) - 1
+        first = None
+        with self._open(origin, start, end) as response:
+            total = (response.headers.get("Content-Range") or "").rpartition("/")[2]
+            if response.status != 206 or total != str(length):
+                self.cache.forget(origin); raise ValueError("the resource changed on the server")
+            for i in range(index, index + run):
+                data = response.read(min(block_size, length - i * block_size)); self._count_origin(len(data))
+                if not data: break
+                self.cache.put_block(origin, i, data)
+                if first is None: first = data
+        if first is None: raise ValueError("empty response")
+        return first
+
+    def _serve_blocks(self, handler, origin, info, head):
+        length = info["length"]; requested = _parse_range(handler.headers.get("Range"), length)
+        if requested is not None and requested[0] >= length:
+            handler.send_response(416); handler.send_header("Content-Range", f"bytes */{length}"); handler.send_header("Content-Length", "0"); handler.end_headers(); return
+        start, end = requested or (0, length - 1)
+        handler.send_response(206 if requested else 200)
+        handler.send_header("Content-Type", info.get("content_type") or "application/octet-stream")
+        handler.send_header("Accept-Ranges", "bytes"); handler.send_header("Content-Length", str(end - start + 1))
+        if requested: handler.send_header("Content-Range", f"bytes {start}-{end}/{length}")
+        handler.end_headers()
+        if head: return
+        block_size = self.cache.block_size
+        for index in range(start // block_size, end // block_size + 1):
+            block = self.cache.get_block(origin, index)
+            if block is None: block = self._fetch_blocks(origin, index, length)
+            offset = index * block_size
+            chunk = block[max(start, offset) - offset:min(end, offset + len(block) - 1) - offset + 1]
+            handler.wfile.write(chunk)
+            with self._lock: self.bytes_served += len(chunk)
+
+    def _pass_through(self, handler, origin, head):
+        range_header = handler.headers.get("Range"); headers = {"User-Agent": USER_AGENT}
+        if range_header: headers["Range"] = range_header
+        with urlopen(Request(origin, headers=headers, method="HEAD" if head else "GET"), timeout=ORIGIN_TIMEOUT_S) as response:
+            handler.send_response(response.status)
+            for name in ("Content-Type", "Content-Length", "Content-Range", "Accept-Ranges"):
+                if response.headers.get(name): handler.send_header(name, response.headers[name])
+            if not response.headers.get("Content-Length"): handler.send_header("Connection", "close"); handler.close_connection = True
+            handler.end_headers()
+            while not head:
+                data = response.read(64 * 1024)
+                if not data: break
+                handler.wfile.write(data); self._count_origin(len(data))
+                with self._lock: self.bytes_served += len(data)
+
+    def _serve_playlist(self, handler, origin, head):
+        with self._open(origin) as response:
+            base = response.geturl(); body = response.read(MAX_PLAYLIST_BYTES)
+        self._count_origin(len(body)); text = body.decode("utf-8", "replace")
+        rewrite = lambda link: self.url_for(urljoin(base, link.strip()))
+        lines = [rewrite(line) if line.strip() and not line.startswith("#")
+                 else re.sub(r'URI="([^"]+)"', lambda m: f'URI="{rewrite(m.group(1))}"', line) for line in text.splitlines()]
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        handler.send_response(200); handler.send_header("Content-Type", "application/vnd.apple.mpegurl")
+        handler.send_header("Content-Length", str(len(data))); handler.send_header("Cache-Control", "no-cache"); handler.end_headers()
+        if not head: handler.wfile.write(data)
+
+    def stats(self):
+        stats = self.cache.stats()
+        stats.update(requests=self.requests, bytes_served=self.bytes_served, bytes_from_origin=self.bytes_from_origin)
+        return stats
+
+
+class StreamStats:
+    """Startup and stall accounting for one stream playback, fed from libvlc events on any thread."""
+    def __init__(self, url):
+        self.url = url; self._opened = time.perf_counter()
+        self.playing_ms = None; self.first_frame_ms = None
+        self.rebuffers = 0; self.stalled_ms = 0.0; self._stall_started = None
+
+    def _elapsed_ms(self): return round((time.perf_counter() - self._opened) * 1000.0, 1)
+
+    def playing(self):
+        if self.playing_ms is None: self.playing_ms = self._elapsed_ms()
+
+    def first_frame(self):
+        if self.first_frame_ms is None: self.first_frame_ms = self._elapsed_ms()
+
+    def buffering(self, percent):
+        """libvlc's cache fill (0-100). A drop below 100 once playback has started is a rebuffer."""
+        if self.playing_ms is None: return
+        if percent < 100.0 and self._stall_started is None: self.rebuffers += 1; self._stall_started = time.perf_counter()
+        elif percent >= 100.0 and self._stall_started is not None:
+            self.stalled_ms += (time.perf_counter() - self._stall_started) * 1000.0; self._stall_started = None
+
+    def as_dict(self):
+        stalled = self.stalled_ms + ((time.perf_counter() - self._stall_started) * 1000.0 if self._stall_started is not None else 0.0)
+        return {"url": self.url, "startup_ms": self.playing_ms, "first_frame_ms": self.first_frame_ms,
+                "rebuffers": self.rebuffers, "stalled_ms": round(stalled, 1)}
+
+    def summary(self):
+        stats = self.as_dict(); first = stats["first_frame_ms"] if stats["first_frame_ms"] is not None else stats["startup_ms"]
+        startup = f"{first:.0f} ms to first frame" if first is not None else "never started"
+        return f"Stream {self.url}: {startup}, {stats['rebuffers']} rebuffer(s), {stats['stalled_ms']:.0f} ms stalled."
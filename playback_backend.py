@@ -0,0 +1,153 @@
+# playback_backend.py (The playback engine interface the UI talks to, and the engine factory)
+import time
+from enum import IntEnum
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from event_bridge import PlaybackEventBridge
+import tracing
+
+BACKENDS = ("libvlc", "synthetic")
+
+
+class PlaybackState(IntEnum):
+    """Engine-neutral playback states. The values are libvlc's libvlc_state_t, so converting its states is a lookup."""
+    NothingSpecial = 0
+    Opening = 1
+    Buffering = 2
+    Playing = 3
+    Paused = 4
+    Stopped = 5
+    Ended = 6
+    Error = 7
+
+
+IDLE_STATES = (PlaybackState.NothingSpecial, PlaybackState.Stopped, PlaybackState.Ended, PlaybackState.Error)
+# Counters of libvlc_media_stats_t reported by media_stats(); cumulative since the current media was opened.
+MEDIA_STAT_FIELDS = ("read_bytes", "input_bitrate", "demux_read_bytes", "demux_bitrate", "demux_corrupted", "demux_discontinuity",
+                     "decoded_video", "decoded_audio", "displayed_pictures", "lost_pictures", "played_abuffers", "lost_abuffers")
+
+
+class PlaybackBackend(QObject):
+    """
+    What the UI may use of a playback engine. Engines may emit the signals
+    from their own threads (they reach GUI-thread slots queued); time and
+    position updates go through a PlaybackEventBridge and arrive at most once
+    per UI frame. Paths are plain strings; states are PlaybackState values.
+
+    State:  initialize(), is_ready(), get_state(), current_media_path(), release_resources(), stream_stats(), media_stats()
+            (sampled by stats_recorder, a playback_stats.PlaybackStatsRecorder)
+    Idle:   set_idle() (no polling while nobody sees the window), set_video_enabled() (audio-only playback)
+    Media:  load_media(), prepare_next(), clear_next(), advance_pending
+    Time:   play(), pause(), stop(), seek(), set_time_ms(), get_time_ms(), get_duration_ms(), playback rate, loop
+    Tracks: audio tracks, has_video(), subtitles (subtitle_track, set_subtitle_file), aspect ratio, volume, track gain
+    Frames: set_video_widget(), attach_frame_tap(), take_snapshot()
+    """
+    time_changed = pyqtSignal(int)
+    position_changed = pyqtSignal(float)
+    duration_changed = pyqtSignal(int)
+    playback_state_changed = pyqtSignal(object)   # PlaybackState
+    error_occurred = pyqtSignal(str)
+    rate_changed = pyqtSignal(float)
+    media_advanced = pyqtSignal(str)
+    video_output_started = pyqtSignal()   # a video output opened, i.e. the first frame of the current media is on its way to the screen
+    subtitles_changed = pyqtSignal(object)   # parsed SubtitleTrack of the current media, or None
+
+    name = "abstract"
+    decodes_files = True   # False for engines that play made-up paths; the UI then skips metadata and loudness analysis
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.advance_pending = False; self.subtitle_track = None
+        self.idle = False; self.video_enabled = True; self._current_media_path = None
+        self._last_time_ms = -1; self._last_position = -1.0
+        self._transition_started = None; self._transition_kind = None; self._transition_trace = None
+        # --- Time/position events are coalesced and delivered at most once per UI frame ---
+        self.event_bridge = PlaybackEventBridge(rate_hz=10, parent=self)
+        self.event_bridge.snapshot_ready.connect(self._deliver_snapshot)
+        from playback_stats import PlaybackStatsRecorder
+        self.stats_recorder = PlaybackStatsRecorder(self, parent=self)
+
+    # --- Shared plumbing ---
+    def _deliver_snapshot(self, snapshot):
+        if snapshot.time_ms >= 0 and snapshot.time_ms != self._last_time_ms:
+            self._last_time_ms = snapshot.time_ms; self.time_changed.emit(snapshot.time_ms)
+        if snapshot.position >= 0 and abs(snapshot.position - self._last_position) > 0.001:
+            self._last_position = snapshot.position; self.position_changed.emit(snapshot.position)
+
+    def set_ui_update_rate(self, rate_hz): self.event_bridge.set_rate(rate_hz)
+
+    def _begin_transition(self, kind, path):
+        """Starts timing an open/track change; it ends at the next Playing state."""
+        if self._transition_trace is not None: tracing.end_async(self._transition_trace, superseded=True)
+        self._transition_started = time.perf_counter(); self._transition_kind = kind
+        self._transition_trace = tracing.begin_async("track_change", kind=kind, path=path)
+
+    def _finish_transition(self):
+        if self._transition_started is None: return
+        latency_ms = (time.perf_counter() - self._transition_started) * 1000.0
+        print(f"Track transition ({self._transition_kind}): {latency_ms:.1f} ms to playing.")
+        self._transition_started = None; tracing.end_async(self._transition_trace, latency_ms=round(latency_ms, 1)); self._transition_trace = None
+
+    def _finish_stats(self):
+        self.stats_recorder.stop(); summary = self.stats_recorder.summary()
+        if summary: print(summary)
+
+    def _abandon_transition(self, reason):
+        self._transition_started = None
+        tracing.end_async(self._transition_trace, error=reason); self._transition_trace = None
+
+    # --- Interface ---
+    def initialize(self, extra_args=None): raise NotImplementedError
+    def is_ready(self): raise NotImplementedError
+    def version_string(self): raise NotImplementedError
+    def release_resources(self): raise NotImplementedError
+    def current_media_path(self): return self._current_media_path
+    def resource_stats(self): return {}
+    def stream_stats(self): return None
+    def media_stats(self): return None
+
+    def load_media(self, file_path, start_ms=0): raise NotImplementedError
+    def prepare_next(self, file_path, start_ms=0): raise NotImplementedError
+    def clear_next(self): raise NotImplementedError
+
+    def play(self): raise NotImplementedError
+    def pause(self): raise NotImplementedError
+    def stop(self): raise NotImplementedError
+    def seek(self, position_ratio): raise NotImplementedError
+    def set_time_ms(self, time_ms): raise NotImplementedError
+    def get_time_ms(self): raise NotImplementedError
+    def get_duration_ms(self): raise NotImplementedError
+    def get_state(self): raise NotImplementedError
+    def set_playback_rate(self, rate): raise NotImplementedError
+    def get_playback_rate(self): raise NotImplementedError
+    def set_loop_current(self, loop): raise NotImplementedError
+
+    def set_volume(self, volume): raise NotImplementedError
+    def get_volume(self): raise NotImplementedError
+    def set_track_gain(self, gain_db): raise NotImplementedError
+    def get_track_gain(self): raise NotImplementedError
+    def get_audio_tracks(self): raise NotImplementedError
+    def get_current_audio_track(self): raise NotImplementedError
+    def set_audio_track(self, track_id): raise NotImplementedError
+    def has_video(self): raise NotImplementedError
+    def set_aspect_ratio(self, ratio): raise NotImplementedError
+    def set_subtitle_file(self, subtitle_path): raise NotImplementedError
+    def set_video_enabled(self, enabled): raise NotImplementedError
+
+    def set_idle(self, idle): raise NotImplementedError
+
+    def set_video_widget(self, win_id): raise NotImplementedError
+    def attach_frame_tap(self, frame_tap): raise NotImplementedError
+    def take_snapshot(self, save_path): raise NotImplementedError
+
+
+def create_backend(name="libvlc", parent=None, **options):
+    """Builds the named engine: "libvlc" (MediaController) or "synthetic" (SyntheticBackend, options go to its constructor)."""
+    if name == "libvlc":
+        from media_controls import MediaController
+        return MediaController(parent)
+    if name == "synthetic":
+        from synthetic_backend import SyntheticBackend
+        return SyntheticBackend(parent, **options)
+    raise ValueError(f"Unknown playback backend: {name}")
@@ -0,0 +1,264 @@
+# playback_scheduler.py (What plays next: in order, shuffled or shuffled by folder, with an up-next queue and back-history)
+import os
+import random
+from collections import deque
+
+ORDER_MODES = ("sequential", "shuffle", "shuffle_folders")
+HISTORY_SIZE = 1000
+
+
+class ShuffleOrder:
+    """
+    A no-repeat random order of units (paths or folders) as a permutation
+    array plus a unit -> position index. order[:cursor] were played this
+    cycle, order[cursor] is the current unit, order[cursor + 1:] are still
+    to come in random order. Stepping is O(1); adding or removing a unit is
+    O(1) and keeps the upcoming part uniformly shuffled (new units are
+    swapped to a random upcoming slot, removed ones are filled from the end).
+    When a cycle is used up the whole order is reshuffled once, O(n) per n
+    steps, and never starts with the unit that just played.
+    """
+    def __init__(self, units=(), rng=None):
+        self.rng = rng or random.Random()
+        self.reset(units)
+
+    def reset(self, units):
+        self.order = list(units); self.rng.shuffle(self.order)
+        self.pos = {u: i for i, u in enumerate(self.order)}; self.cursor = -1
+
+    def __len__(self): return len(self.order)
+    def __contains__(self, unit): return unit in self.pos
+
+    def current(self): return self.order[self.cursor] if 0 <= self.cursor < len(self.order) else None
+
+    def _swap(self, i, j):
+        if i == j: return
+        order = self.order; order[i], order[j] = order[j], order[i]
+        self.pos[order[i]] = i; self.pos[order[j]] = j
+
+    def _new_cycle(self):
+        last = self.current()
+        self.rng.shuffle(self.order); self.cursor = -1
+        if len(self.order) > 1 and self.order[0] == last: self._swap(0, self.rng.randrange(1, len(self.order)))
+        self.pos = {u: i for i, u in enumerate(self.order)}
+
+    def peek(self):
+        """The unit after the current one; starts a new cycle when this one is used up."""
+        if not self.order: return None
+        if self.cursor + 1 >= len(self.order): self._new_cycle()
+        return self.order[self.cursor + 1]
+
+    def advance(self):
+        unit = self.peek()
+        if unit is not None: self.cursor += 1
+        return unit
+
+    def select(self, unit):
+        """Makes unit current; an upcoming unit counts as played this cycle from now on."""
+        p = self.pos.get(unit)
+        if p is None: return
+        if p > self.cursor: self._swap(p, self.cursor + 1); self.cursor += 1
+        else: self._swap(p, self.cursor)
+
+    def add(self, units):
+        order = self.order; pos = self.pos; first = self.cursor + 1; random_ = self.rng.random
+        for unit in units:
+            if unit in pos: continue
+            # Inside-out Fisher-Yates over the upcoming part: swap the new unit with a uniform slot in [first, last].
+            last = len(order); j = first + int(random_() * (last - first + 1))
+            if j == last: order.append(unit); pos[unit] = last
+            else: moved = order[j]; order.append(moved); pos[moved] = last; order[j] = unit; pos[unit] = j
+
+    def remove(self, unit):
+        p = self.pos.get(unit)
+        if p is None: return
+        if p < self.cursor:
+            # Keep the played part contiguous: the current unit moves down one slot and the removed one ends up just after it.
+            self._swap(p, self.cursor - 1); self._swap(self.cursor - 1, self.cursor); self.cursor -= 1
+        elif p == self.cursor: self.cursor -= 1
+        p = self.pos.pop(unit); last = len(self.order) - 1
+        if p != last: self.order[p] = self.order[last]; self.pos[self.order[p]] = p
+        self.order.pop()
+
+
+class PlaybackScheduler:
+    """
+    Decides the next and previous entry of a playlist (any sequence of paths
+    with row_of() and `in`, i.e. a PlaylistModel). Entries are identified by
+    path, so removing rows never leaves it pointing at the wrong file.
+
+    next: the forward stack (entries stepped back over), then the up-next
+    queue, then the order mode: "sequential" (playlist order, wrapping),
+    "shuffle" (every entry once per cycle) or "shuffle_folders" (folders in
+    random order, each played through in playlist order).
+    previous: the back-history of what played, else the previous row in
+    sequential mode.
+
+    peek_next()/advance() and peek_previous()/go_back() are O(1) (amortized
+    in shuffle mode); entries_added/entries_removed are O(batch). Removed
+    entries left in the queue or history are skipped when reached.
+    """
+    def __init__(self, playlist, mode="sequential", seed=None):
+        self.playlist = playlist; self.rng = random.Random(seed)
+        self.mode = mode if mode in ORDER_MODES else "sequential"
+        self.current = None; self._resume = None   # after the current entry is removed: (path that followed it,) or None
+        self.queue = deque(); self.history = deque(maxlen=HISTORY_SIZE); self._forward = []
+        self._shuffle = None
+        # shuffle_folders: folder -> [first, last] member, plus successor/predecessor links in playlist order
+        self._heads = {}; self._succ = {}; self._pred = {}
+        self._rebuild()
+
+    # --- Mode ---
+    def set_mode(self, mode):
+        if mode not in ORDER_MODES: raise ValueError(f"Unknown order mode: {mode}")
+        if mode != self.mode: self.mode = mode; self._rebuild()
+
+    def _rebuild(self):
+        self._heads = {}; self._succ = {}; self._pred = {}; self._shuffle = None
+        if self.mode == "shuffle":
+            self._shuffle = ShuffleOrder(self.playlist, self.rng)
+        elif self.mode == "shuffle_folders":
+            for path in self.playlist: self._link(path)
+            self._shuffle = ShuffleOrder(self._heads, self.rng)
+        if self._shuffle is not None and self.current is not None: self._shuffle.select(self._unit(self.current))
+
+    def _unit(self, path): return os.path.dirname(path) if self.mode == "shuffle_folders" else path
+
+    def _link(self, path):
+        folder = os.path.dirname(path); ends = self._heads.get(folder)
+        if ends is None: self._heads[folder] = [path, path]; return True
+        self._succ[ends[1]] = path; self._pred[path] = ends[1]; ends[1] = path
+        return False
+
+    def _unlink(self, path):
+        """Returns True when path was the last member of its folder."""
+        folder = os.path.dirname(path); ends = self._heads[folder]
+        prev = self._pred.pop(path, None); nxt = self._succ.pop(path, None)
+        if prev is not None:
+            if nxt is not None: self._succ[prev] = nxt
+            else: self._succ.pop(prev, None)
+        if nxt is not None:
+            if prev is not None: self._pred[nxt] = prev
+            else: self._pred.pop(nxt, None)
+        if ends[0] == path: ends[0] = nxt
+        if ends[1] == path: ends[1] = prev
+        if ends[0] is None: del self._heads[folder]; return True
+        return False
+
+    # --- Playlist changes ---
+    def entries_added(self, paths):
+        if self.mode == "shuffle": self._shuffle.add(paths)
+        elif self.mode == "shuffle_folders":
+            self._shuffle.add([os.path.dirname(p) for p in paths if self._link(p)])
+
+    def entries_removed(self, paths):
+        """Call before the paths leave the playlist (rowsAboutToBeRemoved), so sequential mode can find what followed."""
+        for path in paths:
+            # Paths arrive in playlist order, so a removed successor is replaced by the one after it.
+            if path == self.current or (self._resume is not None and path == self._resume[0]):
+                self._resume = (self._following(path),); self.current = None
+            if self.mode == "shuffle": self._shuffle.remove(path)
+            elif self.mode == "shuffle_folders":
+                ends = self._heads.get(os.path.dirname(path))
+                if ends is not None and (path == ends[0] or path in self._pred) and self._unlink(path):
+                    self._shuffle.remove(os.path.dirname(path))
+
+    def _following(self, path):
+        """What comes after path once it is gone: the next row in sequential mode, the next member of its folder."""
+        if self.mode == "sequential":
+            row = self.playlist.row_of(path)
+            return self.playlist[row + 1] if 0 <= row < len(self.playlist) - 1 else None
+        if self.mode == "shuffle_folders": return self._succ.get(path)
+        return None
+
+    def reset(self):
+        """The playlist was cleared or replaced."""
+        self.current = None; self._resume = None; self.queue.clear(); self.history.clear(); self._forward = []
+        self._rebuild()
+
+    # --- Queue ---
+    def enqueue(self, paths, front=False):
+        """Adds paths to the up-next queue; with front they play before anything already queued, in the given order."""
+        if front: self.queue.extendleft(reversed(list(paths)))
+        else: self.queue.extend(paths)
+
+    def queued(self): return [p for p in self.queue if p in self.playlist]
+    def clear_queue(self): self.queue.clear()
+
+    # --- Stepping ---
+    def _top(self, stack):
+        """The last live entry of a stack (forward stack, history), dropping removed ones."""
+        while stack and stack[-1] not in self.playlist: stack.pop()
+        return stack[-1] if stack else None
+
+    def _head(self, queue):
+        while queue and queue[0] not in self.playlist: queue.popleft()
+        return queue[0] if queue else None
+
+    def peek_next(self):
+        """The entry that advance() would return, or None."""
+        if not len(self.playlist): return None
+        path = self._top(self._forward)
+        if path is None: path = self._head(self.queue)
+        return path if path is not None else self._next_in_order()
+
+    def _next_in_order(self):
+        if self.mode == "sequential":
+            if self.current is None:   # nothing played yet (or after a clear): Next starts at the top
+                return self._resume[0] if self._resume is not None and self._resume[0] is not None else self.playlist[0]
+            row = self.playlist.row_of(self.current)
+            return self.playlist[(row + 1) % len(self.playlist)] if row >= 0 and len(self.playlist) > 1 else None
+        if self.mode == "shuffle":
+            if self.current is None and len(self._shuffle) == 0: return None
+            path = self._shuffle.peek()
+            return path if path != self.current else None
+        # shuffle_folders: the rest of the current folder, then the first entry of the next folder
+        if self.current is not None: path = self._succ.get(self.current)
+        else: path = self._resume[0] if self._resume is not None else None
+        if path is not None: return path
+        folder = self._shuffle.peek()
+        if folder is None: return None
+        head = self._heads[folder][0]
+        return head if head != self.current else None
+
+    def advance(self):
+        """Moves to the next entry and returns it (None when there is nothing to play)."""
+        path = self.peek_next()
+        if path is None: return None
+        from_forward = bool(self._forward) and self._forward[-1] == path
+        from_queue = not from_forward and bool(self.queue) and self.queue[0] == path
+        if from_forward: self._forward.pop()
+        elif from_queue: self.queue.popleft()
+        if self.current is not None: self.history.append(self.current)
+        if self.mode == "sequential" or from_forward or from_queue: self._set_current(path)
+        elif self.mode == "shuffle": self._shuffle.advance(); self.current = path; self._resume = None
+        else:
+            if os.path.dirname(path) != self._shuffle.current(): self._shuffle.select(os.path.dirname(path))
+            self.current = path; self._resume = None
+        return path
+
+    def peek_previous(self):
+        path = self._top(self.history)
+        if path is not None or self.mode != "sequential": return path
+        if self.current is None: return self.playlist[-1] if self._resume is None and len(self.playlist) else None   # Previous from nothing: the last entry
+        row = self.playlist.row_of(self.current)
+        return self.playlist[(row - 1) % len(self.playlist)] if row >= 0 and len(self.playlist) > 1 else None
+
+    def go_back(self):
+        """Returns to the entry played before the current one; advance() then walks forward again."""
+        path = self.peek_previous()
+        if path is None: return None
+        if self.history and self.history[-1] == path: self.history.pop()
+        if self.current is not None: self._forward.append(self.current)
+        self._set_current(path)
+        return path
+
+    def jump_to(self, path):
+        """The user picked path: it becomes current and the forward stack is dropped."""
+        if path == self.current: return
+        if self.current is not None: self.history.append(self.current)
+        self._forward = []; self._set_current(path)
+
+    def _set_current(self, path):
+        self.current = path; self._resume = None
+        if self._shuffle is not None and self._unit(path) in self._shuffle: self._shuffle.select(self._unit(path))
@@ -0,0 +1,114 @@
+# playback_stats.py (Decoder and input health: libvlc media stats sampled into a ring buffer, drop warnings, CSV/JSON export)
+import os
+import sys
+import csv
+import json
+import time
+from collections import deque, namedtuple
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from playback_backend import PlaybackState
+import tracing
+
+SAMPLE_INTERVAL_MS = 1000
+HISTORY_SAMPLES = 600          # ten minutes at one sample per second
+DROP_WARNING_RATIO = 0.05      # dropped / (displayed + dropped) video frames, or lost / played audio buffers
+DROP_WARNING_WINDOW = 5        # samples a drop ratio is taken over
+DROP_WARNING_MIN_UNITS = 25    # frames or buffers in that window before a ratio counts
+WARNING_COOLDOWN_S = 60.0
+
+StatsSample = namedtuple("StatsSample", "time_s path media_time_ms input_kbps demux_kbps decoded_fps displayed_fps dropped_fps "
+                                        "audio_buffers_per_s lost_audio_per_s demux_corrupted demux_discontinuities")
+_COUNTERS = ("read_bytes", "demux_read_bytes", "decoded_video", "displayed_pictures", "lost_pictures", "played_abuffers", "lost_abuffers",
+             "demux_corrupted", "demux_discontinuity")
+
+
+class PlaybackStatsRecorder(QObject):
+    """
+    Samples engine.media_stats() every interval_ms while the engine plays
+    and keeps the per-second rates of the last `size` samples in a ring
+    buffer (a bounded deque: the oldest sample drops out). A warning is
+    printed, traced and emitted when more than DROP_WARNING_RATIO of the
+    video frames or audio buffers were dropped over the last
+    DROP_WARNING_WINDOW samples, at most once per WARNING_COOLDOWN_S per
+    kind. Runs on the GUI thread; samples are cheap (one libvlc call).
+    """
+    sample_added = pyqtSignal(object)   # StatsSample
+    drop_warning = pyqtSignal(str)
+
+    def __init__(self, engine, interval_ms=SAMPLE_INTERVAL_MS, size=HISTORY_SAMPLES, parent=None):
+        super().__init__(parent)
+        self.engine = engine; self.samples = deque(maxlen=size); self.interval_ms = interval_ms
+        self._started = time.perf_counter(); self._previous = None; self._warned = {}
+        self.totals = dict.fromkeys(("displayed", "dropped", "audio_buffers", "lost_audio"), 0); self.warnings = 0
+        self._timer = QTimer(self); self._timer.setInterval(interval_ms); self._timer.timeout.connect(self.sample)
+        engine.playback_state_changed.connect(self._state_changed)
+
+    def _state_changed(self, state):
+        if state == PlaybackState.Playing:
+            if not self._timer.isActive(): self._timer.start()
+        elif state in (PlaybackState.Paused, PlaybackState.Stopped, PlaybackState.Ended, PlaybackState.Error):
+            # Buffering also arrives while playing (at start, after seeks, on stream rebuffers); sampling carries on through it.
+            self._timer.stop()
+            if state != PlaybackState.Paused: self._previous = None   # the next media (or replay) counts from zero again
+
+    def stop(self): self._timer.stop()
+    def is_active(self): return self._timer.isActive()
+
+    def sample(self):
+        stats = self.engine.media_stats(); path = self.engine.current_media_path()
+        if not stats or not path: return None
+        now = time.perf_counter(); previous = self._previous; self._previous = (path, now, stats)
+        if previous is None or previous[0] != path or any(stats[k] < previous[2][k] for k in _COUNTERS): return None
+        elapsed = now - previous[1]
+        if elapsed <= 0: return None
+        delta = {k: stats[k] - previous[2][k] for k in _COUNTERS}
+        # libvlc's bitrates are bytes per microsecond, averaged over its own window; byte counts are the fallback.
+        input_kbps = stats["input_bitrate"] * 8000.0 if stats.get("input_bitrate") else delta["read_bytes"] * 8 / 1000.0 / elapsed
+        demux_kbps = stats["demux_bitrate"] * 8000.0 if stats.get("demux_bitrate") else delta["demux_read_bytes"] * 8 / 1000.0 / elapsed
+        sample = StatsSample(round(now - self._started, 3), path, self.engine.get_time_ms(), round(input_kbps, 1), round(demux_kbps, 1),
+                             round(delta["decoded_video"] / elapsed, 2), round(delta["displayed_pictures"] / elapsed, 2), round(delta["lost_pictures"] / elapsed, 2),
+                             round(delta["played_abuffers"] / elapsed, 2), round(delta["lost_abuffers"] / elapsed, 2),
+                             delta["demux_corrupted"], delta["demux_discontinuity"])
+        self.samples.append(sample)
+        totals = self.totals
+        totals["displayed"] += delta["displayed_pictures"]; totals["dropped"] += delta["lost_pictures"]
+        totals["audio_buffers"] += delta["played_abuffers"]; totals["lost_audio"] += delta["lost_abuffers"]
+        self._check_drops(path)
+        self.sample_added.emit(sample)
+        return sample
+
+    def _check_drops(self, path):
+        recent = [s for s in list(self.samples)[-DROP_WARNING_WINDOW:] if s.path == path]
+        if len(recent) < DROP_WARNING_WINDOW: return
+        for kind, lost_field, kept_field, what in (("video", "dropped_fps", "displayed_fps", "video frames"),
+                                                   ("audio", "lost_audio_per_s", "audio_buffers_per_s", "audio buffers")):
+            lost = sum(getattr(s, lost_field) for s in recent); total = lost + sum(getattr(s, kept_field) for s in recent)
+            if total * self.interval_ms / 1000.0 < DROP_WARNING_MIN_UNITS or lost / total < DROP_WARNING_RATIO: continue
+            now = time.monotonic()
+            if now - self._warned.get(kind, -WARNING_COOLDOWN_S) < WARNING_COOLDOWN_S: continue
+            self._warned[kind] = now; self.warnings += 1
+            message = f"{os.path.basename(path)}: {lost / total:.0%} of {what} dropped over the last {len(recent) * self.interval_ms / 1000.0:g} s; this machine may not keep up with it."
+            print(f"Warning: {message}", file=sys.stderr); tracing.instant("playback_drops", kind=kind, ratio=round(lost / total, 3), path=path)
+            self.drop_warning.emit(message)
+
+    # --- Reporting ---
+    def summary(self):
+        totals = self.totals
+        if not self.samples and not totals["displayed"] and not totals["audio_buffers"]: return None
+        frames = totals["displayed"] + totals["dropped"]; buffers = totals["audio_buffers"] + totals["lost_audio"]
+        video = f"{totals['dropped']} of {frames} video frames dropped ({totals['dropped'] / frames:.1%})" if frames else "no video"
+        audio = f"{totals['lost_audio']} of {buffers} audio buffers lost" if buffers else "no audio"
+        return f"Playback stats: {video}, {audio}, {self.warnings} warning(s)."
+
+    def export(self, path):
+        """Writes the recorded samples to path: JSON for a .json name, CSV otherwise."""
+        samples = list(self.samples)
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            if path.lower().endswith(".json"):
+                json.dump({"interval_ms": self.interval_ms, "drop_warning_ratio": DROP_WARNING_RATIO, "totals": self.totals,
+                           "samples": [s._asdict() for s in samples]}, f, indent=1)
+            else:
+                writer = csv.writer(f); writer.writerow(StatsSample._fields); writer.writerows(samples)
+        return len(samples)
@@ -3,29 +3,120 @@ import sys
 import os
 import glob
 import datetime
-import vlc
+import time
 from functools import partial
 import traceback
 
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QPushButton, QVBoxLayout, QHBoxLayout,
     QSlider, QLabel, QFrame, QFileDialog, QStyle, QMessageBox, QAction,
-    QSizePolicy, QListWidget, QListWidgetItem, QSplitter, QMenu, QMenuBar,
-    QActionGroup, QDialog
+    QSizePolicy, QListView, QAbstractItemView, QSplitter, QMenu, QMenuBar,
+    QActionGroup, QDialog, QStyledItemDelegate, QStyleOptionViewItem, QInputDialog, QLineEdit, QShortcut,
+    QListWidget, QListWidgetItem, QComboBox, QTreeWidget, QTreeWidgetItem
 )
-from PyQt5.QtCore import Qt, QUrl, QTimer, pyqtSignal, QStandardPaths, QSize, QEvent, PYQT_VERSION_STR
-from PyQt5.QtGui import QIcon, QPalette, QColor, QDesktopServices
+from PyQt5.QtCore import Qt, QUrl, QTimer, pyqtSignal, QStandardPaths, QSize, QEvent, QPoint, QPointF, QLineF, PYQT_VERSION_STR
+from PyQt5.QtGui import QIcon, QPalette, QColor, QDesktopServices, QPixmap, QPainter, QKeySequence, QPolygonF
 
 try:
-    from media_controls import MediaController
+    from playback_backend import PlaybackState, IDLE_STATES, create_backend
+    from playlist_model import PlaylistModel
+    from playlist_search import PlaylistFilterModel
+    from playback_scheduler import PlaybackScheduler
+    from folder_scanner import FolderScanner
+    from media_library import MediaLibrary, LibraryIndexer
+    from media_formats import SUPPORTED_MEDIA_EXTENSIONS, SUPPORTED_SUBTITLE_EXTENSIONS, is_audio_only, is_playlist_file, is_url, normalize_entry
+    from playlist_io import PlaylistImporter, PLAYLIST_FILE_FILTER, write_playlist
+    from watch_history import WatchHistory
+    from idle_mode import VisibilityMonitor, ACTIVE, HIDDEN, IDLE_UI_RATE_HZ
+    from thumbnails import ThumbnailProvider
+    from loudness import LoudnessAnalyzer, track_gain_db, LATE_GAIN_LIMIT_MS
+    import tracing
 except ImportError as e:
-    print(f"Fatal Error: Could not import MediaController: {e}", file=sys.stderr); traceback.print_exc(); sys.exit(1)
+    print(f"Fatal Error: Could not import player modules: {e}", file=sys.stderr); traceback.print_exc(); sys.exit(1)
 
 def format_time(ms):
     if ms is None or ms < 0: ms = 0
     total_seconds = int(ms / 1000); minutes, seconds = divmod(total_seconds, 60)
     return f"{minutes:02}:{seconds:02}"
 
+class SeekSlider(QSlider):
+    """Seek bar that reports the hovered position so the window can show a preview, drawn over a waveform overview when one is known."""
+    hovered = pyqtSignal(float, QPoint)   # position ratio, global cursor position
+    hover_left = pyqtSignal()
+    WAVEFORM_COLOR = QColor(97, 175, 239, 80)
+
+    def __init__(self, orientation, parent=None):
+        super().__init__(orientation, parent); self.setMouseTracking(True)
+        self._waveform = b""; self._waveform_lines = None
+
+    def set_waveform(self, peaks):
+        """peaks: bytes of 0-255 levels spread evenly over the duration (loudness.waveform_overview), or empty to clear."""
+        peaks = peaks or b""
+        if peaks != self._waveform: self._waveform = peaks; self._waveform_lines = None; self.update()
+
+    def _waveform_geometry(self):
+        # One vertical line per pixel column of the groove, rebuilt only when the size or the waveform changes.
+        peaks = self._waveform; width = self.width(); height = self.height()
+        if self._waveform_lines is not None and self._waveform_lines[0] == (width, height): return self._waveform_lines[1]
+        handle = self.style().pixelMetric(QStyle.PM_SliderLength, None, self) // 2
+        span = max(1, width - 2 * handle); mid = height / 2.0; half = mid - 1.0; count = len(peaks); lines = []
+        for x in range(span):
+            first = x * count // span; last = max(first + 1, (x + 1) * count // span)
+            level = max(peaks[first:last]) / 255.0 * half
+            if level >= 0.5: lines.append(QLineF(handle + x + 0.5, mid - level, handle + x + 0.5, mid + level))
+        self._waveform_lines = ((width, height), lines)
+        return lines
+
+    def paintEvent(self, event):
+        if self._waveform:
+            painter = QPainter(self); painter.setPen(self.WAVEFORM_COLOR); painter.drawLines(self._waveform_geometry()); painter.end()
+        super().paintEvent(event)
+
+    def mouseMoveEvent(self, event):
+        if self.isEnabled() and self.maximum() > self.minimum():
+            value = QStyle.sliderValueFromPosition(self.minimum(), self.maximum(), event.x(), self.width())
+            self.hovered.emit((value - self.minimum()) / float(self.maximum() - self.minimum()), event.globalPos())
+        super().mouseMoveEvent(event)
+
+    def leaveEvent(self, event):
+        self.hover_left.emit(); super().leaveEvent(event)
+
+class SeekPreviewPopup(QFrame):
+    """Frameless tooltip-style window showing a thumbnail with the hovered time under it, above the seek bar."""
+    def __init__(self, parent=None):
+        super().__init__(parent, Qt.ToolTip | Qt.FramelessWindowHint)
+        self.setObjectName("seekPreview")
+        self.setStyleSheet("QFrame#seekPreview { background-color: #111; border: 1px solid #444; } QFrame#seekPreview QLabel { color: white; background: transparent; }")
+        layout = QVBoxLayout(self); layout.setContentsMargins(2, 2, 2, 2); layout.setSpacing(2)
+        self.image_label = QLabel(); self.image_label.setAlignment(Qt.AlignCenter); self.image_label.hide()
+        self.time_label = QLabel(); self.time_label.setAlignment(Qt.AlignCenter)
+        layout.addWidget(self.image_label); layout.addWidget(self.time_label)
+
+    def show_preview(self, global_pos, time_text, image=None):
+        """Shows time_text; image replaces the thumbnail, otherwise the last one stays until the next arrives."""
+        if image is not None and not image.isNull(): self.image_label.setPixmap(QPixmap.fromImage(image)); self.image_label.show()
+        self.time_label.setText(time_text); self.adjustSize()
+        self.move(global_pos.x() - self.width() // 2, global_pos.y() - self.height() - 16)
+        if not self.isVisible(): self.show()
+
+    def clear(self):
+        self.image_label.clear(); self.image_label.hide(); self.time_label.clear()
+
+class PlaylistItemDelegate(QStyledItemDelegate):
+    """Draws the file name with its indexed duration right-aligned, like a second column."""
+    def paint(self, painter, option, index):
+        duration = index.data(PlaylistModel.DurationRole)
+        if not duration: super().paint(painter, option, index); return
+        text = format_time(duration); width = option.fontMetrics.horizontalAdvance(text) + 12
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawPrimitive(QStyle.PE_PanelItemViewItem, option, painter, option.widget)
+        name_option = QStyleOptionViewItem(option); name_option.rect = option.rect.adjusted(0, 0, -width, 0)
+        super().paint(painter, name_option, index)
+        painter.save()
+        painter.setPen(option.palette.highlightedText().color() if option.state & QStyle.State_Selected else option.palette.text().color())
+        painter.drawText(option.rect.adjusted(0, 0, -6, 0), Qt.AlignRight | Qt.AlignVCenter, text)
+        painter.restore()
+
 class PlaylistDialog(QDialog):
     # This class is correct and unchanged
     def __init__(self, parent_window):
@@ -33,55 +124,287 @@ class PlaylistDialog(QDialog):
         self.parent_window = parent_window; self.setWindowTitle("PyPlay - Playlist"); self.setWindowIcon(parent_window.windowIcon())
         self.setGeometry(parent_window.x() + parent_window.width() + 10, parent_window.y(), 350, 500)
         layout = QVBoxLayout(self); layout.setContentsMargins(8, 8, 8, 8); layout.setSpacing(6)
-        playlist_label = QLabel("Playlist"); playlist_label.setStyleSheet("font-weight: bold; padding-bottom: 4px;")
-        self.playlist_view = QListWidget(); self.playlist_view.setToolTip("Double-click to play")
+        self.playlist_label = QLabel("Playlist"); self.playlist_label.setStyleSheet("font-weight: bold; padding-bottom: 4px;")
+        self.search_edit = QLineEdit(); self.search_edit.setPlaceholderText("Search playlist (Ctrl+F)"); self.search_edit.setClearButtonEnabled(True)
+        self.filter_model = PlaylistFilterModel(parent_window.playlist, self)
+        self.playlist_view = QListView(); self.playlist_view.setToolTip("Double-click to play")
+        self.playlist_view.setModel(self.filter_model); self.playlist_view.setUniformItemSizes(True); self.playlist_view.setLayoutMode(QListView.Batched)
+        self.playlist_view.setSelectionMode(QAbstractItemView.ExtendedSelection); self.playlist_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.playlist_view.setItemDelegate(PlaylistItemDelegate(self.playlist_view))
         self.add_files_button = QPushButton("Add Files"); self.add_folder_button = QPushButton("Add Folder"); self.remove_item_button = QPushButton("Remove"); self.clear_playlist_button = QPushButton("Clear")
-        buttons_layout = QHBoxLayout(); buttons_layout.addWidget(self.add_files_button); buttons_layout.addWidget(self.add_folder_button); buttons_layout.addStretch(1); buttons_layout.addWidget(self.remove_item_button); buttons_layout.addWidget(self.clear_playlist_button)
-        layout.addWidget(playlist_label); layout.addWidget(self.playlist_view, 1); layout.addLayout(buttons_layout)
-        self.playlist_view.itemDoubleClicked.connect(self.parent_window._playlist_item_activated)
+        self.contact_sheet_button = QPushButton("Contact Sheets..."); self.contact_sheet_button.setToolTip("Export a contact sheet for the selected videos (or all)")
+        self.duplicates_button = QPushButton("Duplicates..."); self.duplicates_button.setToolTip("Find entries with the same content under different paths (among the selected entries, or all)")
+        buttons_layout = QHBoxLayout(); buttons_layout.addWidget(self.add_files_button); buttons_layout.addWidget(self.add_folder_button); buttons_layout.addStretch(1); buttons_layout.addWidget(self.duplicates_button); buttons_layout.addWidget(self.contact_sheet_button); buttons_layout.addWidget(self.remove_item_button); buttons_layout.addWidget(self.clear_playlist_button)
+        layout.addWidget(self.playlist_label); layout.addWidget(self.search_edit); layout.addWidget(self.playlist_view, 1); layout.addLayout(buttons_layout)
+        self.search_edit.textChanged.connect(self.filter_model.set_query); self.search_edit.returnPressed.connect(self._play_first_match)
+        QShortcut(QKeySequence.Find, self, activated=lambda: (self.search_edit.setFocus(), self.search_edit.selectAll()))
+        self.filter_model.search_finished.connect(lambda count: self.parent_window.playlist_summary_timer.start())
+        self.playlist_view.doubleClicked.connect(self.parent_window._playlist_item_activated)
         self.add_files_button.clicked.connect(self.parent_window._add_files_to_playlist); self.add_folder_button.clicked.connect(self.parent_window._add_folder_to_playlist)
         self.remove_item_button.clicked.connect(self.parent_window._remove_selected_playlist_item); self.clear_playlist_button.clicked.connect(self.parent_window._clear_playlist)
-        self.playlist_view.itemSelectionChanged.connect(self.parent_window._playlist_selection_changed)
+        self.contact_sheet_button.clicked.connect(self.parent_window._export_contact_sheets); self.duplicates_button.clicked.connect(self.parent_window._find_duplicates)
+        self.playlist_view.selectionModel().selectionChanged.connect(self.parent_window._playlist_selection_changed)
+        self.playlist_view.setContextMenuPolicy(Qt.CustomContextMenu); self.playlist_view.customContextMenuRequested.connect(self._show_context_menu)
+
+    def _show_context_menu(self, pos):
+        if not self.playlist_view.selectionModel().hasSelection(): return
+        menu = QMenu(self)
+        menu.addAction("Play &Next", lambda: self.parent_window._queue_selected(front=True))
+        menu.addAction("Add to &Up Next", lambda: self.parent_window._queue_selected())
+        menu.addSeparator(); menu.addAction("&Remove", self.parent_window._remove_selected_playlist_item)
+        menu.exec_(self.playlist_view.viewport().mapToGlobal(pos))
+
+    def _play_first_match(self):
+        if self.filter_model.is_filtering() and self.filter_model.rowCount():
+            self.parent_window._playlist_item_activated(self.filter_model.index(0))
+
+    def show_row(self, row):
+        """Makes playlist row current in the view if the active filter shows it."""
+        self.playlist_view.setCurrentIndex(self.filter_model.mapFromSource(self.parent_window.playlist.index(row)))
 
     def closeEvent(self, event):
         self.parent_window._playlist_dialog_closed(); super().closeEvent(event)
 
+class SubtitleSearchDialog(QDialog):
+    """Lists the cues of the current subtitle track matching the search text; activating one seeks to it."""
+    MAX_RESULTS = 5000
+
+    def __init__(self, parent_window):
+        super().__init__(parent_window)
+        self.parent_window = parent_window; self.setWindowTitle("PyPlay - Subtitles"); self.resize(420, 480)
+        self.track = None; self._rows = {}
+        layout = QVBoxLayout(self); layout.setContentsMargins(8, 8, 8, 8); layout.setSpacing(6)
+        self.search_edit = QLineEdit(); self.search_edit.setPlaceholderText("Search subtitle text"); self.search_edit.setClearButtonEnabled(True)
+        self.results = QListWidget(); self.results.setUniformItemSizes(True); self.status_label = QLabel("")
+        layout.addWidget(self.search_edit); layout.addWidget(self.results, 1); layout.addWidget(self.status_label)
+        self.search_edit.textChanged.connect(self._refresh); self.search_edit.returnPressed.connect(self._jump_to_first)
+        self.results.itemActivated.connect(lambda item: self.parent_window._jump_to_cue(item.data(Qt.UserRole)))
+
+    def set_track(self, track):
+        self.track = track; self._refresh()
+
+    def _refresh(self):
+        self.results.clear(); self._rows = {}
+        if self.track is None: self.status_label.setText("No subtitles loaded for this file."); return
+        found = self.track.search(self.search_edit.text())
+        for i in found[:self.MAX_RESULTS]:
+            cue = self.track.cues[i]
+            item = QListWidgetItem(f"{format_time(cue.start_ms)}  {cue.text.replace(chr(10), ' / ')}"); item.setData(Qt.UserRole, i)
+            self._rows[i] = self.results.count(); self.results.addItem(item)
+        shown = f" (first {self.MAX_RESULTS} shown)" if len(found) > self.MAX_RESULTS else ""
+        self.status_label.setText(f"{len(found)} of {len(self.track)} lines{shown} - {os.path.basename(self.track.path or '')}")
+
+    def _jump_to_first(self):
+        if self.results.count(): self.parent_window._jump_to_cue(self.results.item(0).data(Qt.UserRole))
+
+    def set_current_cue(self, index):
+        """Follows playback: selects the line on screen now, if it is in the list."""
+        row = self._rows.get(index)
+        if row is not None and row != self.results.currentRow():
+            self.results.setCurrentRow(row); self.results.scrollToItem(self.results.item(row))
+
+class StatsGraph(QWidget):
+    """Line graph of one series of playback samples, newest on the right, scaled to the largest value shown."""
+    LINE_COLOR = QColor(97, 175, 239); TEXT_COLOR = QColor(150, 150, 150)
+
+    def __init__(self, capacity, parent=None):
+        super().__init__(parent); self.capacity = max(2, capacity); self.setMinimumSize(380, 140)
+        self._values = []; self._unit = ""
+
+    def set_values(self, values, unit):
+        self._values = values[-self.capacity:]; self._unit = unit; self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self); painter.fillRect(self.rect(), QColor(17, 17, 17))
+        values = self._values; top = max(values) if values else 0.0
+        painter.setPen(self.TEXT_COLOR)
+        painter.drawText(self.rect().adjusted(6, 4, -6, -4), Qt.AlignLeft | Qt.AlignTop, f"max {top:g} {self._unit}" if values else "No samples yet")
+        if len(values) >= 2:
+            width = self.width() - 1; height = self.height() - 1; step = width / (self.capacity - 1); first = width - (len(values) - 1) * step
+            scale = (height - 20) / top if top > 0 else 0.0
+            painter.setPen(self.LINE_COLOR); painter.drawPolyline(QPolygonF([QPointF(first + i * step, height - v * scale) for i, v in enumerate(values)]))
+        painter.end()
+
+class PlaybackStatsDialog(QDialog):
+    """Decoder and input statistics of what is playing, sampled once a second by the engine's stats recorder."""
+    SERIES = (("Input bitrate", "input_kbps", "kb/s"), ("Demux bitrate", "demux_kbps", "kb/s"), ("Displayed frames", "displayed_fps", "fps"),
+              ("Dropped frames", "dropped_fps", "fps"), ("Lost audio buffers", "lost_audio_per_s", "/s"))
+
+    def __init__(self, parent_window):
+        super().__init__(parent_window)
+        self.parent_window = parent_window; self.recorder = parent_window.media_controller.stats_recorder
+        self.setWindowTitle("PyPlay - Playback Statistics"); self.resize(460, 360)
+        layout = QVBoxLayout(self); layout.setContentsMargins(8, 8, 8, 8); layout.setSpacing(6)
+        self.series_combo = QComboBox()
+        for label, column, unit in self.SERIES: self.series_combo.addItem(label, (column, unit))
+        self.graph = StatsGraph(self.recorder.samples.maxlen); self.values_label = QLabel(""); self.values_label.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        self.warning_label = QLabel(""); self.warning_label.setWordWrap(True); self.warning_label.setStyleSheet("color: #e5c07b;")
+        self.export_button = QPushButton("Export..."); self.close_button = QPushButton("Close")
+        buttons_layout = QHBoxLayout(); buttons_layout.addWidget(self.series_combo); buttons_layout.addStretch(1); buttons_layout.addWidget(self.export_button); buttons_layout.addWidget(self.close_button)
+        layout.addWidget(self.graph, 1); layout.addWidget(self.values_label); layout.addWidget(self.warning_label); layout.addLayout(buttons_layout)
+        self.series_combo.currentIndexChanged.connect(self._refresh); self.export_button.clicked.connect(self._export); self.close_button.clicked.connect(self.close)
+        self.recorder.sample_added.connect(self._sample_added); self.recorder.drop_warning.connect(self.warning_label.setText)
+
+    def showEvent(self, event):
+        super().showEvent(event); self._refresh()
+
+    def _sample_added(self, sample):
+        if self.isVisible(): self._refresh()   # nothing is drawn for a closed panel
+
+    def _refresh(self):
+        samples = list(self.recorder.samples); column, unit = self.series_combo.currentData()
+        self.graph.set_values([getattr(s, column) for s in samples], unit)
+        if not samples: self.values_label.setText("Waiting for playback..."); return
+        s = samples[-1]; frames = s.displayed_fps + s.dropped_fps
+        self.values_label.setText(f"{os.path.basename(s.path)}\n"
+                                  f"Input {s.input_kbps:g} kb/s, demux {s.demux_kbps:g} kb/s, {s.demux_corrupted} corrupted, {s.demux_discontinuities} discontinuities\n"
+                                  f"Video: {s.decoded_fps:g} decoded, {s.displayed_fps:g} displayed, {s.dropped_fps:g} dropped fps ({(s.dropped_fps / frames if frames else 0.0):.1%})\n"
+                                  f"Audio: {s.audio_buffers_per_s:g} buffers/s, {s.lost_audio_per_s:g} lost/s\n"
+                                  f"{self.recorder.summary() or ''}")
+
+    def _export(self):
+        default = os.path.join(QStandardPaths.writableLocation(QStandardPaths.DocumentsLocation), "pyplay-stats.csv")
+        path, _ = QFileDialog.getSaveFileName(self, "Export Playback Statistics", default, "CSV Files (*.csv);;JSON Files (*.json)")
+        if not path: return
+        try: count = self.recorder.export(path)
+        except OSError as e: QMessageBox.warning(self, "Export Playback Statistics", f"Could not write {path}: {e}"); return
+        print(f"Exported {count} playback samples to {path}.")
+
+class DuplicatesDialog(QDialog):
+    """Groups of playlist entries with the same content. Removing keeps one entry of each checked group; activating a path keeps that one instead."""
+    MAX_GROUPS = 5000
+    KEEP_ROLE = Qt.UserRole + 1
+
+    def __init__(self, parent_window):
+        super().__init__(parent_window)
+        self.parent_window = parent_window; self.setWindowTitle("PyPlay - Duplicates"); self.resize(560, 420)
+        self.groups = []
+        layout = QVBoxLayout(self); layout.setContentsMargins(8, 8, 8, 8); layout.setSpacing(6)
+        self.summary_label = QLabel(""); self.summary_label.setWordWrap(True)
+        self.tree = QTreeWidget(); self.tree.setHeaderHidden(True); self.tree.setUniformRowHeights(True)
+        self.remove_button = QPushButton("Remove Duplicates"); self.close_button = QPushButton("Close")
+        buttons_layout = QHBoxLayout(); buttons_layout.addStretch(1); buttons_layout.addWidget(self.remove_button); buttons_layout.addWidget(self.close_button)
+        layout.addWidget(self.summary_label); layout.addWidget(self.tree, 1); layout.addLayout(buttons_layout)
+        self.tree.itemActivated.connect(self._item_activated); self.remove_button.clicked.connect(self._remove_duplicates); self.close_button.clicked.connect(self.close)
+
+    def set_groups(self, groups, summary):
+        self.groups = groups; self.tree.clear()
+        current = self.parent_window._current_media_path
+        for group in groups[:self.MAX_GROUPS]:
+            top = QTreeWidgetItem(); top.setFlags(top.flags() | Qt.ItemIsUserCheckable); top.setCheckState(0, Qt.Checked)
+            top.setData(0, Qt.UserRole, group)
+            for path in group:
+                child = QTreeWidgetItem([path]); child.setData(0, Qt.UserRole, path); top.addChild(child)
+            self._keep(top, current if current in group else group[0])
+            self.tree.addTopLevelItem(top)
+        if len(groups) > self.MAX_GROUPS: summary += f" The first {self.MAX_GROUPS} groups are listed; the others are removed as well."
+        self.summary_label.setText(summary + " Double-click a path to keep it instead."); self.remove_button.setEnabled(bool(groups))
+
+    def _keep(self, top, path):
+        top.setData(0, self.KEEP_ROLE, path); group = top.data(0, Qt.UserRole)
+        top.setText(0, f"{os.path.basename(path)} ({len(group)} copies)")
+        for i in range(top.childCount()):
+            child = top.child(i); child_path = child.data(0, Qt.UserRole)
+            child.setText(0, f"{child_path}  (kept)" if child_path == path else child_path)
+
+    def _item_activated(self, item, column):
+        if item.parent() is not None: self._keep(item.parent(), item.data(0, Qt.UserRole))
+
+    def _remove_duplicates(self):
+        doomed = []
+        for i in range(self.tree.topLevelItemCount()):
+            top = self.tree.topLevelItem(i)
+            if top.checkState(0) != Qt.Checked: continue
+            keep = top.data(0, self.KEEP_ROLE); doomed.extend(p for p in top.data(0, Qt.UserRole) if p != keep)
+        for group in self.groups[self.MAX_GROUPS:]: doomed.extend(group[1:])
+        removed = self.parent_window._remove_playlist_paths(doomed)
+        print(f"Removed {len(removed)} duplicate playlist entries."); self.close()
+
 class PlayerWindow(QMainWindow):
-    SUPPORTED_MEDIA_EXTENSIONS = [".mp4", ".mkv", ".avi", ".mov", ".wmv", ".flv", ".webm", ".mpeg", ".mpg", ".mp3", ".wav", ".ogg", ".flac", ".aac", ".m4a"]
-    SUPPORTED_SUBTITLE_EXTENSIONS = [".srt", ".sub", ".ssa", ".ass", ".vtt"]
+    startup_stage = pyqtSignal(str)   # "first_paint", "vlc_ready", "vlc_failed"
+    SUPPORTED_MEDIA_EXTENSIONS = SUPPORTED_MEDIA_EXTENSIONS
+    SUPPORTED_SUBTITLE_EXTENSIONS = SUPPORTED_SUBTITLE_EXTENSIONS
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, backend="libvlc", backend_options=None):
+        started = time.perf_counter()
         super().__init__(parent)
         self.setWindowTitle("PyPlay"); self.setGeometry(100, 100, 800, 600)
-        self._vlc_initialized = False
+        self._engine_ready = False; self._startup_finished = False; self._autoplay_on_ready = False; self._play_on_ready = None
         self._is_fullscreen = False; self._is_seeking = False
+        self.visibility = None; self._ui_idle = False; self._ui_updates = 0; self._active_ui_rate = None
         self._current_media_path = None; self._last_volume = 50; self._seek_interval_ms = 5000; self._loop_current_track = False
-        self.playlist = []; self.current_playlist_index = -1
+        self.playlist = PlaylistModel(self); self.current_playlist_index = -1; self.scheduler = PlaybackScheduler(self.playlist)
+        self._scan_max_depth = None; self._scan_follow_symlinks = False; self._scan_autoplay_pending = False; self._scan_play_now = False; self._queued_scans = []
+        self.folder_scanner = FolderScanner(self.SUPPORTED_MEDIA_EXTENSIONS, max_depth=self._scan_max_depth, follow_symlinks=self._scan_follow_symlinks, parent=self)
+        self.playlist_importer = PlaylistImporter(parent=self); self._import_autoplay_pending = False; self._import_play_now = False
+        self.media_controller = create_backend(backend, parent=self, **(backend_options or {}))
+        decodes_files = self.media_controller.decodes_files   # a synthetic engine's paths are made up; nothing to index or analyze
+        self.media_library = None; self.library_indexer = None
+        try:
+            self.media_library = MediaLibrary()
+            if decodes_files: self.library_indexer = LibraryIndexer(self.media_library, parent=self)
+            self.playlist.set_library(self.media_library)
+        except Exception as e:
+            print(f"Warning: Media library unavailable: {e}", file=sys.stderr)
+        self.watch_history = None; self._current_duration_ms = 0
+        try:
+            self.watch_history = WatchHistory(); self.playlist.set_history(self.watch_history)
+        except Exception as e:
+            print(f"Warning: Watch history unavailable: {e}", file=sys.stderr)
+        self.loudness_analyzer = None
+        try: self.loudness_analyzer = LoudnessAnalyzer(parent=self) if decodes_files else None
+        except Exception as e: print(f"Warning: Loudness normalization unavailable: {e}", file=sys.stderr)
+        self.thumbnail_provider = ThumbnailProvider(parent=self); self.seek_preview = SeekPreviewPopup(self)
+        self.contact_sheet_exporter = None; self.subtitle_search_dialog = None; self.stats_dialog = None
+        self.duplicate_finder = None; self.duplicates_dialog = None
+        self._preview_request = None; self._preview_pos = QPoint(); self._preview_time_ms = 0
+        self.playlist_summary_timer = QTimer(self); self.playlist_summary_timer.setSingleShot(True)
+        self.playlist_summary_timer.setInterval(300); self.playlist_summary_timer.timeout.connect(self._update_playlist_summary)
         
         self.setMouseTracking(True)
         self.controls_hide_timer = QTimer(self); self.controls_hide_timer.setSingleShot(True)
         self.controls_hide_timer.setInterval(3000); self.controls_hide_timer.timeout.connect(self._hide_fullscreen_controls)
         
-        self.media_controller = MediaController(self)
-        
         self._create_actions(); self._init_ui(); self._init_menu_bar()
-        self.playlist_dialog = PlaylistDialog(self)
-        self._connect_ui_signals()
-        self.playlist_dialog.hide()
+        # Built on first use; the window is usable long before anyone opens the playlist.
+        self._playlist_dialog = None
+        self._connect_ui_signals(); self._connect_scanner_signals()
+        tracing.complete("PlayerWindow.__init__", started)
+
+    @property
+    def playlist_dialog(self):
+        if self._playlist_dialog is None:
+            self._playlist_dialog = PlaylistDialog(self); self._playlist_dialog.hide()
+            if self.current_playlist_index >= 0: self._playlist_dialog.show_row(self.current_playlist_index)
+            self._update_playlist_controls(); self._update_playlist_summary()
+        return self._playlist_dialog
 
     def showEvent(self, event):
         super().showEvent(event)
-        if not self._vlc_initialized:
-            self._initialize_vlc_and_ui()
+        # Fallback for platforms that never deliver a paint to a hidden/minimized first show.
+        if not self._startup_finished: QTimer.singleShot(250, self._finish_startup)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._startup_finished and not hasattr(self, "_first_paint_seen"):
+            self._first_paint_seen = True; tracing.instant("first_paint"); self.startup_stage.emit("first_paint")
+            QTimer.singleShot(0, self._finish_startup)
+
+    def _finish_startup(self):
+        """Deferred until the window has painted once: loading libvlc and building menus nobody needs at launch."""
+        if self._startup_finished: return
+        self._startup_finished = True
+        with tracing.span("PlayerWindow._initialize_engine_and_ui"): self._initialize_engine_and_ui()
+        with tracing.span("PlayerWindow._populate_deferred_menus"): self._populate_deferred_menus()
 
-    def _initialize_vlc_and_ui(self):
-        print("Window is visible, now initializing VLC...")
-        if not self.media_controller.initialize_vlc():
-            self.close(); return
+    def _initialize_engine_and_ui(self):
+        print(f"Window is visible, now initializing the {self.media_controller.name} playback engine...")
+        if not self.media_controller.initialize():
+            self.startup_stage.emit("vlc_failed"); self.close(); return
         
-        self._vlc_initialized = True
+        self._engine_ready = True
         
-        self._connect_vlc_signals()
+        self._connect_engine_signals()
         
         win_id = self.video_frame.winId()
         if win_id: self.media_controller.set_video_widget(win_id)
@@ -92,45 +415,77 @@ class PlayerWindow(QMainWindow):
         self._update_rate_ui(self.media_controller.get_playback_rate())
         self._update_playlist_controls()
         self._update_playback_state_ui(self.media_controller.get_state())
+        # Idle mode: while nobody can see the window, time/position updates, rate polling and optionally video decoding stop.
+        self._active_ui_rate = self.media_controller.event_bridge.rate_hz
+        self.visibility = VisibilityMonitor(self, self.control_area, counters=self._visibility_counters, parent=self)
+        self.visibility.level_changed.connect(self._visibility_changed); self.visibility.start()
         print("PlayerWindow fully initialized.")
+        self.startup_stage.emit("vlc_ready")
+        play_path, self._play_on_ready = self._play_on_ready, None
+        if play_path is not None and self.playlist.row_of(play_path) >= 0:
+            self._autoplay_on_ready = False; self._play_from_playlist(self.playlist.row_of(play_path))
+        if self._autoplay_on_ready:
+            self._autoplay_on_ready = False
+            if self.playlist and self.current_playlist_index == -1: self._play_from_playlist(0)
     
     def _create_actions(self):
         style = self.style()
         self.open_action = QAction(style.standardIcon(QStyle.SP_FileIcon), "&Open Media File(s)...", self); self.open_action.setShortcut("Ctrl+O"); self.open_action.triggered.connect(self._open_file)
         self.open_folder_action = QAction(style.standardIcon(QStyle.SP_DirIcon), "Open &Folder...", self); self.open_folder_action.setShortcut("Ctrl+Shift+O"); self.open_folder_action.triggered.connect(self._open_folder)
+        self.open_stream_action = QAction("Open &Network Stream...", self); self.open_stream_action.setShortcut("Ctrl+N"); self.open_stream_action.triggered.connect(self._open_network_stream)
+        self.open_playlist_action = QAction("Open &Playlist...", self); self.open_playlist_action.setShortcut("Ctrl+Shift+P"); self.open_playlist_action.triggered.connect(self._open_playlist_file)
+        self.save_playlist_action = QAction("Save Playlist &As...", self); self.save_playlist_action.setShortcut("Ctrl+Shift+S"); self.save_playlist_action.triggered.connect(self._save_playlist_file); self.save_playlist_action.setEnabled(False)
         self.quit_action = QAction("&Quit", self); self.quit_action.setShortcut("Ctrl+Q"); self.quit_action.triggered.connect(self.close)
         self.play_pause_action = QAction(style.standardIcon(QStyle.SP_MediaPlay), "&Play", self); self.play_pause_action.setShortcut(Qt.Key_Space); self.play_pause_action.triggered.connect(self._toggle_play_pause); self.play_pause_action.setEnabled(False)
         self.stop_action = QAction(style.standardIcon(QStyle.SP_MediaStop), "&Stop", self); self.stop_action.setShortcut("S"); self.stop_action.triggered.connect(self._stop_media); self.stop_action.setEnabled(False)
         self.next_action = QAction(style.standardIcon(QStyle.SP_MediaSkipForward), "&Next", self); self.next_action.setShortcut("Ctrl+Right"); self.next_action.triggered.connect(self._play_next); self.next_action.setEnabled(False)
         self.prev_action = QAction(style.standardIcon(QStyle.SP_MediaSkipBackward), "Pre&vious", self); self.prev_action.setShortcut("Ctrl+Left"); self.prev_action.triggered.connect(self._play_previous); self.prev_action.setEnabled(False)
         self.loop_action = QAction("&Loop Current", self); self.loop_action.setCheckable(True); self.loop_action.toggled.connect(self._toggle_loop)
+        self.order_group = QActionGroup(self); self.order_group.setExclusive(True); self.order_actions = {}
+        for mode, label in (("sequential", "&In Order"), ("shuffle", "&Shuffle"), ("shuffle_folders", "Shuffle by &Folder")):
+            action = QAction(label, self); action.setCheckable(True); action.setChecked(mode == self.scheduler.mode)
+            action.triggered.connect(partial(self._set_order_mode, mode)); self.order_group.addAction(action); self.order_actions[mode] = action
+        self.clear_queue_action = QAction("&Clear Up Next", self); self.clear_queue_action.triggered.connect(self._clear_queue)
+        self.normalize_action = QAction("&Normalize Volume", self); self.normalize_action.setCheckable(True); self.normalize_action.setChecked(self.loudness_analyzer is not None); self.normalize_action.setEnabled(self.loudness_analyzer is not None); self.normalize_action.toggled.connect(self._toggle_normalization)
         self.mute_action = QAction("M&ute", self); self.mute_action.setShortcut("M"); self.mute_action.setCheckable(True); self.mute_action.toggled.connect(self._toggle_mute_action)
         self.fullscreen_action = QAction(style.standardIcon(QStyle.SP_TitleBarMaxButton),"&Fullscreen", self); self.fullscreen_action.setShortcut("F"); self.fullscreen_action.setCheckable(True); self.fullscreen_action.toggled.connect(self._toggle_fullscreen_action)
         self.snapshot_action = QAction("&Snapshot", self); self.snapshot_action.setIcon(QIcon.fromTheme("camera-photo", style.standardIcon(QStyle.SP_DialogSaveButton))); self.snapshot_action.setShortcut("Ctrl+P"); self.snapshot_action.triggered.connect(self._take_snapshot); self.snapshot_action.setEnabled(False)
         self.adjust_video_action = QAction("&Video Adjustments...", self); self.adjust_video_action.setEnabled(False)
         self.load_subtitle_action = QAction("Load &Subtitle File...", self); self.load_subtitle_action.setShortcut("Ctrl+L"); self.load_subtitle_action.triggered.connect(self._load_subtitle); self.load_subtitle_action.setEnabled(False)
+        self.search_subtitles_action = QAction("Searc&h Subtitles...", self); self.search_subtitles_action.setShortcut("Ctrl+Shift+F"); self.search_subtitles_action.triggered.connect(self._show_subtitle_search); self.search_subtitles_action.setEnabled(False)
+        self.next_line_action = QAction("&Next Line", self); self.next_line_action.setShortcut("Alt+Right"); self.next_line_action.triggered.connect(lambda: self._jump_subtitle_line(1)); self.next_line_action.setEnabled(False)
+        self.previous_line_action = QAction("&Previous Line", self); self.previous_line_action.setShortcut("Alt+Left"); self.previous_line_action.triggered.connect(lambda: self._jump_subtitle_line(-1)); self.previous_line_action.setEnabled(False)
+        self.stats_action = QAction("Playback S&tatistics...", self); self.stats_action.setShortcut("Ctrl+J"); self.stats_action.triggered.connect(self._show_playback_stats)
+        self.audio_only_minimized_action = QAction("&Audio Only When Minimized", self); self.audio_only_minimized_action.setCheckable(True); self.audio_only_minimized_action.toggled.connect(lambda checked: self._apply_video_enabled())
         self.toggle_playlist_action = QAction("Show/Hide &Playlist", self); self.toggle_playlist_action.setShortcut("Ctrl+T"); self.toggle_playlist_action.setCheckable(True); self.toggle_playlist_action.toggled.connect(self._toggle_playlist_view)
-        self.faq_action = QAction("&FAQ / Help", self); self.faq_action.triggered.connect(self._show_faq)
-        self.about_action = QAction("&About PyPlay", self); self.about_action.triggered.connect(self._show_about)
 
     def _init_menu_bar(self):
         menu_bar = self.menuBar()
-        media_menu = menu_bar.addMenu("&Media"); media_menu.addAction(self.open_action); media_menu.addAction(self.open_folder_action); media_menu.addSeparator(); media_menu.addAction(self.quit_action)
+        media_menu = menu_bar.addMenu("&Media"); media_menu.addAction(self.open_action); media_menu.addAction(self.open_folder_action); media_menu.addAction(self.open_stream_action); media_menu.addSeparator(); media_menu.addAction(self.open_playlist_action); media_menu.addAction(self.save_playlist_action); media_menu.addSeparator(); media_menu.addAction(self.quit_action)
         playback_menu = menu_bar.addMenu("&Playback"); playback_menu.addAction(self.play_pause_action); playback_menu.addAction(self.stop_action); playback_menu.addSeparator(); playback_menu.addAction(self.next_action); playback_menu.addAction(self.prev_action); playback_menu.addSeparator(); playback_menu.addAction(self.loop_action)
-        audio_menu = menu_bar.addMenu("&Audio"); audio_menu.addAction(self.mute_action)
+        order_menu = playback_menu.addMenu("&Order")
+        for action in self.order_actions.values(): order_menu.addAction(action)
+        playback_menu.addAction(self.clear_queue_action)
+        audio_menu = menu_bar.addMenu("&Audio"); audio_menu.addAction(self.mute_action); audio_menu.addAction(self.normalize_action)
         self.audio_track_menu = audio_menu.addMenu("Audio &Track"); self.audio_track_menu.aboutToShow.connect(self._update_audio_tracks_menu); self.audio_track_menu.setEnabled(False)
         video_menu = menu_bar.addMenu("&Video"); video_menu.addAction(self.fullscreen_action); video_menu.addAction(self.snapshot_action); video_menu.addSeparator()
-        self.aspect_ratio_menu = video_menu.addMenu("&Aspect Ratio"); self.aspect_ratio_group = QActionGroup(self); self.aspect_ratio_group.setExclusive(True)
-        ratios = ["Default", "16:9", "4:3", "1:1"]; default_action_set = False
-        for ratio in ratios:
+        self.aspect_ratio_menu = video_menu.addMenu("&Aspect Ratio"); self.aspect_ratio_menu.setEnabled(False)
+        video_menu.addAction(self.audio_only_minimized_action); video_menu.addSeparator(); video_menu.addAction(self.stats_action)
+        subtitle_menu = menu_bar.addMenu("&Subtitles"); subtitle_menu.addAction(self.load_subtitle_action); subtitle_menu.addSeparator(); subtitle_menu.addAction(self.search_subtitles_action); subtitle_menu.addAction(self.previous_line_action); subtitle_menu.addAction(self.next_line_action)
+        view_menu = menu_bar.addMenu("&View"); view_menu.addAction(self.toggle_playlist_action)
+        # Aspect-ratio and Help entries are filled in by _populate_deferred_menus() after the first paint.
+        self.help_menu = menu_bar.addMenu("&Help")
+
+    def _populate_deferred_menus(self):
+        if self.help_menu.actions(): return
+        self.aspect_ratio_group = QActionGroup(self); self.aspect_ratio_group.setExclusive(True)
+        for ratio in ["Default", "16:9", "4:3", "1:1"]:
             action = QAction(ratio, self, checkable=True); action.triggered.connect(partial(self._set_aspect_ratio_action, ratio if ratio != "Default" else None))
             self.aspect_ratio_menu.addAction(action); self.aspect_ratio_group.addAction(action)
-            if ratio == "Default": action.setChecked(True); default_action_set = True
-        if not default_action_set and self.aspect_ratio_group.actions(): self.aspect_ratio_group.actions()[0].setChecked(True)
-        self.aspect_ratio_menu.setEnabled(False)
-        subtitle_menu = menu_bar.addMenu("&Subtitles"); subtitle_menu.addAction(self.load_subtitle_action)
-        view_menu = menu_bar.addMenu("&View"); view_menu.addAction(self.toggle_playlist_action)
-        help_menu = menu_bar.addMenu("&Help"); help_menu.addAction(self.faq_action); help_menu.addSeparator(); help_menu.addAction(self.about_action)
+            if ratio == "Default": action.setChecked(True)
+        self.faq_action = QAction("&FAQ / Help", self); self.faq_action.triggered.connect(self._show_faq)
+        self.about_action = QAction("&About PyPlay", self); self.about_action.triggered.connect(self._show_about)
+        self.help_menu.addAction(self.faq_action); self.help_menu.addSeparator(); self.help_menu.addAction(self.about_action)
 
     def _init_ui(self):
         central_widget = QWidget(self); self.setCentralWidget(central_widget)
@@ -147,7 +502,7 @@ class PlayerWindow(QMainWindow):
         self.control_area = QWidget(); self.control_area.setObjectName("controlArea")
         control_layout = QVBoxLayout(self.control_area); control_layout.setContentsMargins(10, 5, 10, 5)
         seek_layout = QHBoxLayout();
-        self.current_time_label = QLabel("--:--"); self.seek_slider = QSlider(Qt.Horizontal); self.seek_slider.setRange(0, 1000); self.seek_slider.setEnabled(False); self.total_time_label = QLabel("--:--")
+        self.current_time_label = QLabel("--:--"); self.seek_slider = SeekSlider(Qt.Horizontal); self.seek_slider.setRange(0, 1000); self.seek_slider.setEnabled(False); self.total_time_label = QLabel("--:--")
         seek_layout.addWidget(self.current_time_label); seek_layout.addWidget(self.seek_slider, 1); seek_layout.addWidget(self.total_time_label)
         control_layout.addLayout(seek_layout)
         buttons_layout = QHBoxLayout()
@@ -192,15 +547,38 @@ class PlayerWindow(QMainWindow):
         self.volume_button.toggled.connect(self._toggle_mute)
         self.seek_slider.sliderPressed.connect(self._seek_slider_pressed)
         self.seek_slider.sliderReleased.connect(self._seek_slider_released)
+        self.seek_slider.hovered.connect(self._seek_slider_hovered)
+        self.seek_slider.hover_left.connect(self._hide_seek_preview)
+        self.thumbnail_provider.thumbnail_ready.connect(self._thumbnail_ready)
         self.speed_slider.valueChanged.connect(self._set_playback_rate)
 
-    def _connect_vlc_signals(self):
+    def _connect_engine_signals(self):
         self.media_controller.time_changed.connect(self._update_time_label)
+        self.media_controller.time_changed.connect(self._record_watch_position)
         self.media_controller.position_changed.connect(self._update_seek_slider_position)
         self.media_controller.duration_changed.connect(self._update_duration_info)
         self.media_controller.playback_state_changed.connect(self._update_playback_state_ui)
         self.media_controller.error_occurred.connect(self._show_error_message)
         self.media_controller.rate_changed.connect(self._update_rate_ui)
+        self.media_controller.media_advanced.connect(self._media_advanced)
+        self.media_controller.subtitles_changed.connect(self._subtitles_changed)
+        self.media_controller.time_changed.connect(self._follow_subtitle_cue)
+
+    def _connect_scanner_signals(self):
+        self.folder_scanner.batch_found.connect(self._folder_scan_batch)
+        self.folder_scanner.progress.connect(self._folder_scan_progress)
+        self.folder_scanner.finished.connect(self._folder_scan_finished)
+        self.playlist_importer.batch_found.connect(self._playlist_import_batch)
+        self.playlist_importer.progress.connect(self._playlist_import_progress)
+        self.playlist_importer.finished.connect(self._playlist_import_finished)
+        if self.library_indexer: self.library_indexer.entries_updated.connect(self._library_entries_updated)
+        if self.loudness_analyzer: self.loudness_analyzer.analyzed.connect(self._loudness_analyzed)
+        for signal in (self.playlist.rowsInserted, self.playlist.rowsRemoved, self.playlist.modelReset):
+            signal.connect(lambda *args: self.playlist_summary_timer.start())
+        # The scheduler follows the playlist by path, one inserted or removed run at a time.
+        self.playlist.rowsInserted.connect(lambda parent, first, last: self.scheduler.entries_added(self.playlist[first:last + 1]))
+        self.playlist.rowsAboutToBeRemoved.connect(lambda parent, first, last: self.scheduler.entries_removed(self.playlist[first:last + 1]))
+        self.playlist.modelReset.connect(self.scheduler.reset)
 
     def _hide_fullscreen_controls(self):
         if self._is_fullscreen and not self.control_area.underMouse(): self.control_area.hide()
@@ -254,7 +632,7 @@ class PlayerWindow(QMainWindow):
 
     def _show_about(self):
         vlc_ver = "N/A"; pyqt_ver = "N/A"; python_ver = ".".join(map(str, sys.version_info[:3]))
-        try: vlc_ver = vlc.libvlc_get_version().decode('utf-8', 'ignore');
+        try: vlc_ver = self.media_controller.version_string()
         except: pass
         try: pyqt_ver = PYQT_VERSION_STR
         except: pass
@@ -265,18 +643,17 @@ class PlayerWindow(QMainWindow):
         msgBox.exec_()
 
     def _update_track_menus(self):
-        if not self._vlc_initialized: return
+        if not self._engine_ready: return
         self._update_audio_tracks_menu()
-        has_video = False
-        try: has_video = self.media_controller.media_player.video_get_track_count() > 0
-        except: pass
+        has_video = self.media_controller.has_video()
         self.aspect_ratio_menu.setEnabled(has_video); self.adjust_video_action.setEnabled(has_video)
 
     def _update_audio_tracks_menu(self):
-        if not self._vlc_initialized: return
+        if not self._engine_ready: return
         self.audio_track_menu.clear();
         self.audio_track_group = QActionGroup(self); self.audio_track_group.setExclusive(True)
         tracks = self.media_controller.get_audio_tracks()
+        if not tracks and self.media_library and self._current_media_path: tracks = self.media_library.audio_track_names(self._current_media_path)
         current_track_id = self.media_controller.get_current_audio_track()
         if not tracks:
             action = QAction("No Audio Tracks", self); action.setEnabled(False)
@@ -289,63 +666,253 @@ class PlayerWindow(QMainWindow):
         if not self.audio_track_group.checkedAction() and self.audio_track_group.actions(): self.audio_track_group.actions()[0].setChecked(True)
         self.audio_track_menu.setEnabled(len(tracks) > 1)
 
+    def open_paths(self, paths, play_now=False):
+        """
+        Opens files and folders given on the command line; playback starts once libvlc is ready.
+        With play_now the first of them replaces whatever is playing, otherwise they only start when nothing is.
+        """
+        folders = [p for p in paths if os.path.isdir(p)]; files = [p if is_url(p) else os.path.abspath(p) for p in paths if not os.path.isdir(p)]
+        if files: self._handle_opened_files(files, play_now)
+        if folders: self._scan_folder(folders, play_now=play_now and not files)
+
+    def open_remote_request(self, paths, play_now):
+        """Paths handed over by a later launch (see single_instance.py): bring the window forward and open them."""
+        if self.isMinimized(): self.showNormal()
+        self.raise_(); self.activateWindow()
+        if paths: self.open_paths(paths, play_now)
+
+    def _play_now(self, path):
+        path = normalize_entry(path); row = self.playlist.row_of(path)
+        if row < 0: return
+        if self._engine_ready: self._play_from_playlist(row)
+        else: self._play_on_ready = path
+
+    def _can_autoplay(self):
+        """True when nothing is playing. Before libvlc is loaded, playback is queued for when it is."""
+        if not self._engine_ready: self._autoplay_on_ready = True; return False
+        return self.media_controller.get_state() in IDLE_STATES
+
     def _open_file(self):
         media_filter = f"Media Files ({' '.join(['*' + ext for ext in self.SUPPORTED_MEDIA_EXTENSIONS])})"
-        file_paths, _ = QFileDialog.getOpenFileNames(self, "Open Media", QStandardPaths.writableLocation(QStandardPaths.MoviesLocation), f"{media_filter};;All Files (*)")
+        file_paths, _ = QFileDialog.getOpenFileNames(self, "Open Media", QStandardPaths.writableLocation(QStandardPaths.MoviesLocation), f"{media_filter};;{PLAYLIST_FILE_FILTER};;All Files (*)")
         if file_paths: self._handle_opened_files(file_paths)
 
+    def _open_network_stream(self):
+        url, ok = QInputDialog.getText(self, "Open Network Stream", "URL (http, https, rtsp, rtmp, ...; HLS playlists included):")
+        url = url.strip()
+        if not ok or not url: return
+        if not is_url(url): QMessageBox.warning(self, "Open Network Stream", f"Not a stream URL: {url}"); return
+        self._handle_opened_files([url], play_now=True)
+
+    def _open_playlist_file(self):
+        playlist_path, _ = QFileDialog.getOpenFileName(self, "Open Playlist", QStandardPaths.writableLocation(QStandardPaths.MusicLocation), f"{PLAYLIST_FILE_FILTER};;All Files (*)")
+        if playlist_path: self._import_playlist(playlist_path)
+
+    def _import_playlist(self, playlist_paths, play_now=False):
+        self._import_autoplay_pending = True; self._import_play_now = play_now; self.playlist_importer.start(playlist_paths)
+        if self._playlist_dialog: self._playlist_dialog.playlist_label.setText("Playlist (importing...)")
+
+    def _playlist_import_batch(self, entries):
+        first_added = self._add_to_playlist(entries)
+        if self._import_autoplay_pending and first_added >= 0:
+            self._import_autoplay_pending = False
+            if self._import_play_now: self._play_now(self.playlist[first_added])
+            elif self._can_autoplay(): self._play_from_playlist(first_added)
+
+    def _playlist_import_progress(self, entries_read, missing):
+        if self._playlist_dialog: self._playlist_dialog.playlist_label.setText(f"Playlist (importing: {entries_read} entries read, {missing} missing)")
+
+    def _playlist_import_finished(self, added, missing, cancelled):
+        if cancelled: return   # superseded by a newer import, or closing
+        self._import_autoplay_pending = False; self._update_playlist_summary()
+        if not added and not missing:
+            QMessageBox.information(self, "Open Playlist", "No playable entries found in the playlist.")
+        elif missing:
+            QMessageBox.information(self, "Open Playlist", f"Added {added} entries.\n{missing} missing file{'s were' if missing != 1 else ' was'} skipped.")
+
+    def _save_playlist_file(self):
+        if not self.playlist: return
+        default_path = os.path.join(QStandardPaths.writableLocation(QStandardPaths.MusicLocation), "playlist.m3u8")
+        save_path, selected_filter = QFileDialog.getSaveFileName(self, "Save Playlist", default_path, "M3U8 Playlist (*.m3u8);;M3U Playlist (*.m3u);;PLS Playlist (*.pls);;XSPF Playlist (*.xspf)")
+        if not save_path: return
+        if not is_playlist_file(save_path): save_path += "." + selected_filter.split("*.")[-1].rstrip(")")
+        durations = self.media_library.duration_ms if self.media_library else (lambda path: None)
+        def describe(path):
+            duration = durations(path)
+            return (duration / 1000.0 if duration else -1), os.path.splitext(os.path.basename(path))[0]
+        try:
+            count = write_playlist(save_path, self.playlist.paths(), relative=True, describe=describe)
+            print(f"Saved {count} playlist entries to {save_path}.")
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Save Playlist", f"Could not save the playlist:\n{e}")
+
     def _open_folder(self):
         folder_path = QFileDialog.getExistingDirectory(self, "Open Folder", QStandardPaths.writableLocation(QStandardPaths.MoviesLocation))
-        if folder_path:
-            media_files = [os.path.join(folder_path, f) for f in os.listdir(folder_path) if os.path.splitext(f)[1].lower() in self.SUPPORTED_MEDIA_EXTENSIONS]
-            if media_files: self._handle_opened_files(sorted(media_files))
-            else: QMessageBox.information(self, "No Media Found", "No supported media files found in this folder.")
+        if folder_path: self._scan_folder(folder_path)
+
+    def _scan_folder(self, folder_paths, play_now=False):
+        """Scans one folder or a list of them into the playlist. While a scan runs, new folders wait for it instead of cancelling it."""
+        if isinstance(folder_paths, str): folder_paths = [folder_paths]
+        if self.folder_scanner.is_running(): self._queued_scans.append((list(folder_paths), play_now)); return
+        self._scan_autoplay_pending = True; self._scan_play_now = play_now
+        self.folder_scanner.max_depth = self._scan_max_depth; self.folder_scanner.follow_symlinks = self._scan_follow_symlinks
+        self.folder_scanner.start(folder_paths)
+        if self._playlist_dialog: self._playlist_dialog.add_folder_button.setText("Stop Scan"); self._playlist_dialog.playlist_label.setText("Playlist (scanning...)")
+
+    def _folder_scan_batch(self, media_files):
+        self._add_to_playlist(media_files)
+        if self._scan_autoplay_pending:
+            self._scan_autoplay_pending = False
+            if self._scan_play_now and media_files: self._play_now(media_files[0])
+            elif self._can_autoplay() and self.playlist: self._play_from_playlist(0)
 
-    def _handle_opened_files(self, file_paths):
+    def _folder_scan_progress(self, dirs_scanned, files_found):
+        if self._playlist_dialog: self._playlist_dialog.playlist_label.setText(f"Playlist (scanning: {files_found} files in {dirs_scanned} folders)")
+
+    def _folder_scan_finished(self, files_found, cancelled):
+        if self._playlist_dialog: self._playlist_dialog.add_folder_button.setText("Add Folder")
+        self._update_playlist_summary()
+        if not files_found and not cancelled:
+            QMessageBox.information(self, "No Media Found", "No supported media files found in this folder.")
+        self._scan_autoplay_pending = False
+        if cancelled: self._queued_scans = []   # Stop Scan stops the waiting folders too
+        elif self._queued_scans: self._scan_folder(*self._queued_scans.pop(0))
+
+    def _handle_opened_files(self, file_paths, play_now=False):
+        playlists = [p for p in file_paths if is_playlist_file(p)]; file_paths = [p for p in file_paths if not is_playlist_file(p)]
+        if playlists: self._import_playlist(playlists, play_now=play_now and not file_paths)
+        if not file_paths: return
         self._add_to_playlist(file_paths)
-        if self.media_controller and self.media_controller.get_state() in [vlc.State.NothingSpecial, vlc.State.Stopped, vlc.State.Ended, vlc.State.Error]:
-             if self.playlist: self._play_from_playlist(0)
+        if play_now: self._play_now(file_paths[0])
+        elif self._can_autoplay() and self.playlist: self._play_from_playlist(0)
 
     def _add_to_playlist(self, file_paths):
-        existing_paths = {self.playlist_dialog.playlist_view.item(i).data(Qt.UserRole) for i in range(self.playlist_dialog.playlist_view.count())}
-        for path in file_paths:
-            norm_path = os.path.normpath(path)
-            if norm_path not in existing_paths:
-                item = QListWidgetItem(os.path.basename(norm_path)); item.setData(Qt.UserRole, norm_path)
-                self.playlist_dialog.playlist_view.addItem(item); self.playlist.append(norm_path)
-        self._update_playlist_controls()
+        first_added = self.playlist.add_paths(file_paths)
+        local = [p for p in self.playlist[first_added:] if not is_url(p)] if first_added >= 0 else []   # streams are never indexed or analyzed
+        if local and self.library_indexer: self.library_indexer.enqueue(local)
+        if local and self.loudness_analyzer: self.loudness_analyzer.request(local)
+        self._update_playlist_controls(); self._prepare_next_track()
+        return first_added
+
+    def _library_entries_updated(self, paths):
+        self.playlist.refresh_paths(paths); self.playlist_summary_timer.start()
+
+    def _update_playlist_summary(self):
+        if self._playlist_dialog is None or self.folder_scanner.is_running() or self.playlist_importer.is_running(): return
+        count = len(self.playlist)
+        if not count: self.playlist_dialog.playlist_label.setText("Playlist"); return
+        summary = f"Playlist ({count} item{'s' if count != 1 else ''}"
+        total_ms = self.media_library.total_duration_ms(self.playlist) if self.media_library else 0
+        if total_ms:
+            hours, rest = divmod(int(total_ms / 1000), 3600); summary += f", {hours}:{rest // 60:02}:{rest % 60:02}"
+        filter_model = self.playlist_dialog.filter_model
+        if filter_model.is_filtering(): summary += f"; {filter_model.rowCount()} match{'es' if filter_model.rowCount() != 1 else ''}{'...' if filter_model.is_searching() else ''}"
+        self.playlist_dialog.playlist_label.setText(summary + ")")
+
+    def _selected_playlist_rows(self):
+        if self._playlist_dialog is None: return []
+        filter_model = self.playlist_dialog.filter_model
+        return [filter_model.mapToSource(index).row() for index in self.playlist_dialog.playlist_view.selectionModel().selectedRows()]
+
+    def _visible_playlist_rows(self):
+        """Rows shown in the playlist view: the search matches while a filter is active, otherwise all."""
+        if self._playlist_dialog is None or not self._playlist_dialog.filter_model.is_filtering(): return range(len(self.playlist))
+        filter_model = self._playlist_dialog.filter_model
+        return [filter_model.mapToSource(filter_model.index(r)).row() for r in range(filter_model.rowCount())]
 
     def _remove_selected_playlist_item(self):
-        selected_items = self.playlist_dialog.playlist_view.selectedItems()
-        if not selected_items: return
-        paths_to_remove = {item.data(Qt.UserRole) for item in selected_items}
-        for item in selected_items: self.playlist_dialog.playlist_view.takeItem(self.playlist_dialog.playlist_view.row(item))
-        self.playlist = [p for p in self.playlist if p not in paths_to_remove]
-        if self.media_controller and self._current_media_path in paths_to_remove: self._stop_media()
-        self._update_playlist_controls()
+        selected_rows = self._selected_playlist_rows()
+        if selected_rows: self._remove_playlist_rows(selected_rows)
+
+    def _remove_playlist_paths(self, paths):
+        return self._remove_playlist_rows([r for r in map(self.playlist.row_of, paths) if r >= 0])
+
+    def _remove_playlist_rows(self, rows):
+        removed_paths = self.playlist.remove_rows(rows)
+        self.current_playlist_index = self.playlist.current_row()
+        if self.media_controller and self._current_media_path in removed_paths: self._stop_media()
+        self._update_playlist_controls(); self._prepare_next_track()
+        return removed_paths
 
     def _clear_playlist(self):
         if QMessageBox.question(self, "Clear Playlist", "Are you sure?", QMessageBox.Yes | QMessageBox.No) == QMessageBox.Yes:
-            self._stop_media(); self.playlist.clear(); self.playlist_dialog.playlist_view.clear()
+            self._stop_media(); self.playlist.clear(); self.current_playlist_index = -1
             self._update_playlist_controls()
 
-    def _playlist_item_activated(self, item):
-        index = self.playlist_dialog.playlist_view.row(item)
+    def _playlist_item_activated(self, model_index):
+        if model_index.model() is not self.playlist: model_index = model_index.model().mapToSource(model_index)
+        index = model_index.row()
         if 0 <= index < len(self.playlist): self._play_from_playlist(index)
 
-    def _play_from_playlist(self, index):
-        if not (self._vlc_initialized and 0 <= index < len(self.playlist)): return
+    def _play_from_playlist(self, index, scheduled=False):
+        """Plays a playlist row. scheduled is set when the scheduler chose it (next/previous); otherwise it is a jump."""
+        if not (self._engine_ready and 0 <= index < len(self.playlist)): return
         self.current_playlist_index = index
-        self.playlist_dialog.playlist_view.setCurrentRow(index)
+        self.playlist.set_current_row(index)
+        if self._playlist_dialog: self._playlist_dialog.show_row(index)
         media_path = self.playlist[index]
-        if self.media_controller.load_media(media_path):
-            self._current_media_path = media_path; self.setWindowTitle(f"{os.path.basename(media_path)} - PyPlay")
+        if not scheduled: self.scheduler.jump_to(media_path)
+        self._save_watch_position()
+        start_ms = self.watch_history.resume_position(media_path) if self.watch_history else 0
+        if self.media_controller.load_media(media_path, start_ms):
+            self._current_media_path = media_path; self._current_duration_ms = 0; self.setWindowTitle(f"{os.path.basename(media_path)} - PyPlay")
+            if start_ms: print(f"Resuming {os.path.basename(media_path)} at {format_time(start_ms)}.")
+            if self.watch_history: self.watch_history.record_play(media_path)
+            self._apply_loudness(media_path)
             self.media_controller.play()
+            self._prepare_next_track()
+
+    def _prepare_next_track(self):
+        if not self._engine_ready: return
+        next_path = self.scheduler.peek_next()
+        if next_path is None or next_path == self._current_media_path: self.media_controller.clear_next(); return
+        if self.loudness_analyzer: self.loudness_analyzer.request([next_path], urgent=True)
+        self.media_controller.prepare_next(next_path, self.watch_history.resume_position(next_path) if self.watch_history else 0)
+
+    def _media_advanced(self, media_path):
+        if media_path == self.scheduler.peek_next(): self.scheduler.advance()
+        else: self.scheduler.jump_to(media_path)
+        index = self.playlist.row_of(media_path)
+        self.current_playlist_index = index; self.playlist.set_current_row(index)
+        if index >= 0 and self._playlist_dialog: self._playlist_dialog.show_row(index)
+        self._current_media_path = media_path; self._current_duration_ms = 0; self.setWindowTitle(f"{os.path.basename(media_path)} - PyPlay")
+        if self.watch_history: self.watch_history.record_play(media_path)
+        self._apply_loudness(media_path)
+        self._prepare_next_track()
+
+    def _record_watch_position(self, time_ms):
+        # An in-memory update only; WatchHistory writes dirty entries in batches on its own thread.
+        if self.watch_history and self._current_media_path and not self.media_controller.advance_pending:
+            self.watch_history.update_position(self._current_media_path, time_ms, self._current_duration_ms)
+
+    def _save_watch_position(self):
+        """Stores the exact position of the current file before it is replaced or the player closes."""
+        if not (self.watch_history and self._engine_ready and self._current_media_path): return
+        if self.media_controller.get_state() in [PlaybackState.Playing, PlaybackState.Paused]:
+            self.watch_history.update_position(self._current_media_path, self.media_controller.get_time_ms(), self._current_duration_ms)
+
+    def _apply_loudness(self, media_path):
+        """Sets the cached gain and waveform for the file starting now, or asks for it to be measured first."""
+        record = self.loudness_analyzer.lookup(media_path) if self.loudness_analyzer else None
+        self.seek_slider.set_waveform(record["waveform"] if record else None)
+        self.media_controller.set_track_gain(track_gain_db(record) if self.normalize_action.isChecked() else 0.0)
+        if record is None and self.loudness_analyzer: self.loudness_analyzer.request([media_path], urgent=True)
+
+    def _loudness_analyzed(self, path, record):
+        if path != self._current_media_path: return
+        self.seek_slider.set_waveform(record["waveform"] if record["status"] == "done" else None)
+        # A gain change is only inaudible near the start; later, the file plays on unnormalized until next time.
+        if self.normalize_action.isChecked() and self._engine_ready and self.media_controller.get_time_ms() < LATE_GAIN_LIMIT_MS:
+            self.media_controller.set_track_gain(track_gain_db(record))
+
+    def _toggle_normalization(self, checked):
+        if not (self._engine_ready and self._current_media_path and self.loudness_analyzer): return
+        self.media_controller.set_track_gain(track_gain_db(self.loudness_analyzer.lookup(self._current_media_path)) if checked else 0.0)
 
     def _toggle_play_pause(self):
-        if not self._vlc_initialized: return
+        if not self._engine_ready: return
         state = self.media_controller.get_state()
-        if state == vlc.State.Playing: self.media_controller.pause()
+        if state == PlaybackState.Playing: self.media_controller.pause()
         else:
             if self.playlist:
                 if self.current_playlist_index == -1: self._play_from_playlist(0)
@@ -356,27 +923,97 @@ class PlayerWindow(QMainWindow):
         if self.media_controller: self.media_controller.stop()
 
     def _play_next(self):
-        if len(self.playlist) > 1:
-            self.current_playlist_index = (self.current_playlist_index + 1) % len(self.playlist)
-            self._play_from_playlist(self.current_playlist_index)
+        if not self._engine_ready: return
+        path = self.scheduler.advance()
+        if path is not None: self._play_from_playlist(self.playlist.row_of(path), scheduled=True)
 
     def _play_previous(self):
-        if len(self.playlist) > 1:
-            self.current_playlist_index = (self.current_playlist_index - 1 + len(self.playlist)) % len(self.playlist)
-            self._play_from_playlist(self.current_playlist_index)
+        if not self._engine_ready: return
+        path = self.scheduler.go_back()
+        if path is not None: self._play_from_playlist(self.playlist.row_of(path), scheduled=True)
+
+    def _set_order_mode(self, mode):
+        with tracing.span("PlaybackScheduler.set_mode", mode=mode, entries=len(self.playlist)): self.scheduler.set_mode(mode)
+        self._prepare_next_track()
+
+    def _queue_selected(self, front=False):
+        """Play Next (front) / Add to Up Next for the selected playlist rows, in playlist order."""
+        rows = sorted(self._selected_playlist_rows())
+        if not rows: return
+        self.scheduler.enqueue([self.playlist[r] for r in rows], front=front); self._prepare_next_track()
+
+    def _clear_queue(self):
+        self.scheduler.clear_queue(); self._prepare_next_track()
 
     def _update_playlist_controls(self):
         has_items = len(self.playlist) > 0; can_navigate = len(self.playlist) > 1
         self.prev_button.setEnabled(can_navigate); self.next_button.setEnabled(can_navigate)
-        self.prev_action.setEnabled(can_navigate); self.next_action.setEnabled(can_navigate)
+        self.prev_action.setEnabled(can_navigate); self.next_action.setEnabled(can_navigate); self.save_playlist_action.setEnabled(has_items)
+        if self._playlist_dialog is None: return
         self.playlist_dialog.clear_playlist_button.setEnabled(has_items)
-        self.playlist_dialog.remove_item_button.setEnabled(has_items and bool(self.playlist_dialog.playlist_view.selectedItems()))
+        self.playlist_dialog.remove_item_button.setEnabled(has_items and self.playlist_dialog.playlist_view.selectionModel().hasSelection())
+
+    def _playlist_selection_changed(self, *args):
+        self.playlist_dialog.remove_item_button.setEnabled(self.playlist_dialog.playlist_view.selectionModel().hasSelection())
+
+    def _export_contact_sheets(self):
+        from contact_sheet import ContactSheetExporter, make_jobs
+        if self.contact_sheet_exporter is None:
+            self.contact_sheet_exporter = ContactSheetExporter(self)
+            self.contact_sheet_exporter.file_done.connect(self._contact_sheet_file_done); self.contact_sheet_exporter.finished.connect(self._contact_sheets_finished)
+        if self.contact_sheet_exporter.is_running():
+            QMessageBox.information(self, "Contact Sheets", "An export is already running."); return
+        rows = self._selected_playlist_rows() or self._visible_playlist_rows()
+        paths = [self.playlist[r] for r in sorted(rows) if not self._is_audio_only(self.playlist[r]) and not is_url(self.playlist[r])]
+        if not paths: QMessageBox.information(self, "Contact Sheets", "No videos in the playlist."); return
+        frames, ok = QInputDialog.getInt(self, "Contact Sheets", f"Frames per sheet ({len(paths)} video{'s' if len(paths) != 1 else ''}):", 16, 1, 400)
+        if not ok: return
+        output_dir = QFileDialog.getExistingDirectory(self, "Save Contact Sheets To", QStandardPaths.writableLocation(QStandardPaths.PicturesLocation))
+        if not output_dir: return
+        self._contact_sheets_total = len(paths); self._contact_sheets_done = 0
+        self.contact_sheet_exporter.start(make_jobs(paths, output_dir, count=frames))
+        self.playlist_dialog.contact_sheet_button.setText(f"Exporting 0/{len(paths)}...")
+
+    def _contact_sheet_file_done(self, result):
+        self._contact_sheets_done += 1
+        self.playlist_dialog.contact_sheet_button.setText(f"Exporting {self._contact_sheets_done}/{self._contact_sheets_total}...")
+        if result["error"]: print(f"Warning: Contact sheet failed for {result['path']}: {result['error']}", file=sys.stderr)
+
+    def _contact_sheets_finished(self, summary):
+        self.playlist_dialog.contact_sheet_button.setText("Contact Sheets...")
+        QMessageBox.information(self, "Contact Sheets", summary)
 
-    def _playlist_selection_changed(self):
-        self.playlist_dialog.remove_item_button.setEnabled(bool(self.playlist_dialog.playlist_view.selectedItems()))
+    def _find_duplicates(self):
+        from duplicates import DuplicateFinder
+        if self.duplicate_finder is None:
+            self.duplicate_finder = DuplicateFinder(parent=self)
+            self.duplicate_finder.progress.connect(self._duplicates_progress); self.duplicate_finder.finished.connect(self._duplicates_found)
+        if self.duplicate_finder.is_running():
+            QMessageBox.information(self, "Duplicates", "A duplicate check is already running."); return
+        rows = self._selected_playlist_rows()
+        if len(rows) < 2: rows = self._visible_playlist_rows()
+        paths = [self.playlist[r] for r in sorted(rows) if not is_url(self.playlist[r])]   # a stream has no file to compare
+        if len(paths) < 2: QMessageBox.information(self, "Duplicates", "Add at least two local files to the playlist first."); return
+        self.duplicate_finder.start(paths)
+        self.playlist_dialog.duplicates_button.setText("Checking...")
+
+    def _duplicates_progress(self, done, total):
+        if self._playlist_dialog: self._playlist_dialog.duplicates_button.setText(f"Checking {done}/{total}...")
+
+    def _duplicates_found(self, groups, stats):
+        from duplicates import summarize
+        if self._playlist_dialog: self._playlist_dialog.duplicates_button.setText("Duplicates...")
+        if stats is None: QMessageBox.warning(self, "Duplicates", "The duplicate check failed; see the log for details."); return
+        groups = [g for g in ([p for p in group if p in self.playlist] for group in groups) if len(g) > 1]   # entries removed meanwhile
+        if not groups: QMessageBox.information(self, "Duplicates", "No duplicates found.\n" + summarize(stats)); return
+        if self.duplicates_dialog is None: self.duplicates_dialog = DuplicatesDialog(self)
+        self.duplicates_dialog.set_groups(groups, f"{sum(len(g) - 1 for g in groups)} entries are copies of another entry, in {len(groups)} groups.")
+        self.duplicates_dialog.show(); self.duplicates_dialog.raise_()
 
     def _add_files_to_playlist(self): self._open_file()
-    def _add_folder_to_playlist(self): self._open_folder()
+    def _add_folder_to_playlist(self):
+        if self.folder_scanner.is_running(): self.folder_scanner.cancel()
+        else: self._open_folder()
 
     def _load_subtitle(self):
         if not self._current_media_path: QMessageBox.warning(self, "Load Subtitle", "Play a video first."); return
@@ -386,6 +1023,37 @@ class PlayerWindow(QMainWindow):
         if subtitle_path and not self.media_controller.set_subtitle_file(subtitle_path):
             QMessageBox.warning(self, "Subtitle Error", "Failed to load subtitle file.")
 
+    def _subtitles_changed(self, track):
+        for action in (self.search_subtitles_action, self.next_line_action, self.previous_line_action): action.setEnabled(track is not None and len(track) > 0)
+        if self.subtitle_search_dialog: self.subtitle_search_dialog.set_track(track)
+        if track is not None: print(f"Subtitles: {os.path.basename(track.path)} ({len(track)} lines).")
+
+    def _show_subtitle_search(self):
+        if self.subtitle_search_dialog is None:
+            self.subtitle_search_dialog = SubtitleSearchDialog(self); self.subtitle_search_dialog.set_track(self.media_controller.subtitle_track)
+        self.subtitle_search_dialog.show(); self.subtitle_search_dialog.raise_(); self.subtitle_search_dialog.search_edit.setFocus()
+
+    def _show_playback_stats(self):
+        if self.stats_dialog is None: self.stats_dialog = PlaybackStatsDialog(self)
+        self.stats_dialog.show(); self.stats_dialog.raise_()
+
+    def _follow_subtitle_cue(self, time_ms):
+        # One bisect in the track's interval index; only done while the subtitle list is on screen.
+        track = self.media_controller.subtitle_track
+        if track is None or self.subtitle_search_dialog is None or not self.subtitle_search_dialog.isVisible(): return
+        active = track.indices_at(time_ms)
+        if active: self.subtitle_search_dialog.set_current_cue(active[0])
+
+    def _jump_to_cue(self, index):
+        track = self.media_controller.subtitle_track
+        if track is not None and 0 <= index < len(track): self.media_controller.set_time_ms(track.cues[index].start_ms)
+
+    def _jump_subtitle_line(self, direction):
+        track = self.media_controller.subtitle_track
+        if track is None or not self._engine_ready: return
+        time_ms = self.media_controller.get_time_ms()
+        self._jump_to_cue(track.next_index(time_ms) if direction > 0 else track.previous_index(time_ms))
+
     def _set_playback_rate(self, value):
         if self.media_controller: self.media_controller.set_playback_rate(value / 10.0)
 
@@ -395,7 +1063,7 @@ class PlayerWindow(QMainWindow):
             self.speed_label.setText(f"{rate:.1f}x")
 
     def _take_snapshot(self):
-        if not (self.media_controller and self._current_media_path and self.media_controller.media_player.video_get_track_count() > 0):
+        if not (self.media_controller and self._current_media_path and self.media_controller.has_video()):
             QMessageBox.warning(self, "Snapshot Failed", "A video must be playing or paused."); return
         time_str = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         default_path = os.path.join(QStandardPaths.writableLocation(QStandardPaths.PicturesLocation), f"PyPlay_snapshot_{time_str}.png")
@@ -404,9 +1072,7 @@ class PlayerWindow(QMainWindow):
             QMessageBox.warning(self, "Snapshot Failed", "Could not save the snapshot.")
 
     def _is_audio_only(self, file_path):
-        if not file_path: return False
-        _, ext = os.path.splitext(file_path); audio_exts = {".mp3", ".wav", ".ogg", ".flac", ".aac", ".m4a"}
-        return ext.lower() in audio_exts
+        return is_audio_only(file_path)
 
     def _set_volume(self, value):
         if self.media_controller: self.media_controller.set_volume(value)
@@ -423,6 +1089,25 @@ class PlayerWindow(QMainWindow):
         if self._is_seeking and self.media_controller:
              self._is_seeking = False; self.media_controller.seek(self.seek_slider.value() / 1000.0)
 
+    def _seek_slider_hovered(self, ratio, global_pos):
+        duration = self.media_controller.get_duration_ms() if self._engine_ready else 0
+        if duration <= 0 or not self._current_media_path: self._hide_seek_preview(); return
+        time_ms = int(duration * ratio); self._preview_pos = global_pos; self._preview_time_ms = time_ms
+        if self._is_audio_only(self._current_media_path) or not self.media_controller.decodes_files or is_url(self._current_media_path):
+            self.seek_preview.clear(); self.seek_preview.show_preview(global_pos, format_time(time_ms)); return
+        bucket = ThumbnailProvider.bucket_for(time_ms, duration)
+        if self._preview_request != (self._current_media_path, bucket):
+            self._preview_request = (self._current_media_path, bucket)
+            self.thumbnail_provider.request(self._current_media_path, time_ms, duration)
+        self.seek_preview.show_preview(global_pos, format_time(time_ms))
+
+    def _thumbnail_ready(self, path, bucket, image):
+        if self._preview_request == (path, bucket) and self.seek_slider.underMouse():
+            self.seek_preview.show_preview(self._preview_pos, format_time(self._preview_time_ms), image)
+
+    def _hide_seek_preview(self):
+        self._preview_request = None; self.seek_preview.hide(); self.seek_preview.clear()
+
     def _seek_media_label_update(self, value):
         if self._is_seeking and self.media_controller:
             duration = self.media_controller.get_duration_ms()
@@ -435,22 +1120,43 @@ class PlayerWindow(QMainWindow):
             self.media_controller.seek(new_time / duration)
 
     def _update_time_label(self, time_ms):
-        if not self._is_seeking: self.current_time_label.setText(format_time(time_ms))
+        if not self._is_seeking and not self._ui_idle: self.current_time_label.setText(format_time(time_ms)); self._ui_updates += 1
 
     def _update_seek_slider_position(self, position_ratio):
-        if not self._is_seeking:
+        if not self._is_seeking and not self._ui_idle:
             self.seek_slider.blockSignals(True); self.seek_slider.setValue(int(position_ratio * 1000)); self.seek_slider.blockSignals(False)
+            self._ui_updates += 1
+
+    def _visibility_changed(self, level):
+        engine = self.media_controller; self._ui_idle = level != ACTIVE
+        engine.set_ui_update_rate(IDLE_UI_RATE_HZ.get(level, self._active_ui_rate)); engine.set_idle(self._ui_idle)
+        self._apply_video_enabled()
+        if not self._ui_idle:
+            # Catch up at once instead of waiting for the next event.
+            time_ms = engine.get_time_ms(); duration = engine.get_duration_ms()
+            if self._current_media_path: self._update_time_label(time_ms)
+            if self._current_media_path and duration > 0: self._update_seek_slider_position(time_ms / duration)
+
+    def _apply_video_enabled(self):
+        if not self._engine_ready or self.visibility is None: return
+        audio_only = self.audio_only_minimized_action.isChecked() and self.visibility.level == HIDDEN and self.isMinimized()
+        if self.media_controller.video_enabled == audio_only: self.media_controller.set_video_enabled(not audio_only)
+
+    def _visibility_counters(self):
+        return {"ui_updates": self._ui_updates, "engine_events": self.media_controller.event_bridge.events_received,
+                "frames_decoded": self.media_controller.resource_stats().get("frames_decoded", 0)}
 
     def _update_duration_info(self, duration_ms):
+        self._current_duration_ms = duration_ms
         self.total_time_label.setText(format_time(duration_ms)); self.seek_slider.setEnabled(duration_ms > 0)
 
     def _show_error_message(self, message):
         QMessageBox.critical(self, "PyPlay Error", message)
 
     def _update_playback_state_ui(self, state):
-        if not self._vlc_initialized: return
-        is_playing = state == vlc.State.Playing
-        is_active = state in [vlc.State.Playing, vlc.State.Paused, vlc.State.Buffering]
+        if not self._engine_ready: return
+        is_playing = state == PlaybackState.Playing
+        is_active = state in [PlaybackState.Playing, PlaybackState.Paused, PlaybackState.Buffering]
         has_media = bool(self.playlist)
         has_video = self._current_media_path and not self._is_audio_only(self._current_media_path)
         style = self.style()
@@ -463,17 +1169,29 @@ class PlayerWindow(QMainWindow):
         self.snapshot_action.setEnabled(is_active and has_video); self.snapshot_button.setEnabled(is_active and has_video)
         self.aspect_ratio_menu.setEnabled(is_active and has_video)
         self.speed_slider.setEnabled(is_active); self.load_subtitle_action.setEnabled(is_active)
-        if state == vlc.State.Ended and not self._loop_current_track:
+        if state == PlaybackState.Ended and self.watch_history: self.watch_history.mark_finished(self._current_media_path)
+        if state == PlaybackState.Ended and not self._loop_current_track and not self.media_controller.advance_pending:
             QTimer.singleShot(100, self._play_next)
 
     def closeEvent(self, event):
+        self.folder_scanner.shutdown(); self.playlist_importer.shutdown(); self.thumbnail_provider.shutdown()
+        if self.contact_sheet_exporter: self.contact_sheet_exporter.shutdown()
+        if self.duplicate_finder: self.duplicate_finder.shutdown()
+        if self.library_indexer: self.library_indexer.shutdown()
+        if self.loudness_analyzer: self.loudness_analyzer.shutdown()
+        if self.media_library: self.media_library.close()
+        self._save_watch_position()
+        if self.watch_history: self.watch_history.close()
+        if self.visibility:
+            self.visibility.stop(); summary = self.visibility.summary()
+            if summary: print(summary)
         if self.media_controller: self.media_controller.release_resources()
         event.accept()
 
     def keyPressEvent(self, event):
         key = event.key()
         modifiers = QApplication.keyboardModifiers()
-        if isinstance(QApplication.focusWidget(), (QListWidget, QSlider)): super().keyPressEvent(event); return
+        if isinstance(QApplication.focusWidget(), (QListView, QSlider)): super().keyPressEvent(event); return
         if not modifiers:
             if key == Qt.Key_F: self._toggle_fullscreen()
             elif key == Qt.Key_Space: self._toggle_play_pause()
@@ -0,0 +1,206 @@
+# playlist_io.py (Streaming M3U/M3U8, PLS and XSPF import/export)
+import os
+import sys
+import time
+import pathlib
+import threading
+from urllib.parse import urlsplit, unquote, quote
+from urllib.request import url2pathname
+from xml.etree.ElementTree import iterparse
+from xml.sax.saxutils import escape
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from media_formats import extension_of, is_url
+
+XSPF_NS = "{http://xspf.org/ns/0/}"
+PLAYLIST_FILE_FILTER = "Playlists (*.m3u *.m3u8 *.pls *.xspf)"
+
+
+def resolve_entry(entry, base_dir):
+    """Turns a playlist entry (absolute/relative path or file:// URI) into a normalised absolute path. URLs are returned unchanged."""
+    entry = entry.strip()
+    if not entry: return None
+    if entry.lower().startswith("file:"):
+        parts = urlsplit(entry)
+        path = url2pathname(unquote(parts.path))
+        if parts.netloc and parts.netloc != "localhost": path = "//" + parts.netloc + path   # UNC share
+        entry = path
+    elif is_url(entry):
+        return entry
+    if sys.platform != "win32" and "\\" in entry: entry = entry.replace("\\", "/")   # lists written on Windows
+    return os.path.normpath(os.path.join(base_dir, entry))
+
+
+# --- Readers: generators, so a 100k-line list is never held in memory as a whole ---
+def _open_text(path):
+    # .m3u8 is UTF-8 by definition; plain .m3u is usually UTF-8 today, and undecodable bytes must not abort an import.
+    return open(path, "r", encoding="utf-8-sig", errors="replace", newline=None)
+
+
+def iter_m3u(path):
+    with _open_text(path) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"): yield line
+
+
+def iter_pls(path):
+    with _open_text(path) as f:
+        for line in f:
+            key, sep, value = line.strip().partition("=")
+            if sep and key.lower().startswith("file") and key[4:].isdigit(): yield value
+
+
+def iter_xspf(path):
+    location_tag = XSPF_NS + "location"; track_tag = XSPF_NS + "track"
+    in_track = False
+    for event, element in iterparse(path, events=("start", "end")):
+        if element.tag == track_tag:
+            in_track = event == "start"
+            if not in_track: element.clear()   # keeps memory flat on huge lists
+        elif event == "end" and in_track and element.tag == location_tag and element.text:
+            # Locations are URI references: relative ones are percent-encoded paths (file: URIs are decoded by resolve_entry).
+            location = element.text.strip()
+            yield location if location.lower().startswith("file:") or is_url(location) else unquote(location)
+
+
+_READERS = {".m3u": iter_m3u, ".m3u8": iter_m3u, ".pls": iter_pls, ".xspf": iter_xspf}
+
+
+def iter_playlist(path, keep_urls=False):
+    """Yields the resolved entries of a playlist file in order."""
+    reader = _READERS.get(extension_of(path))
+    if reader is None: raise ValueError(f"Unsupported playlist format: {os.path.basename(path)}")
+    base_dir = os.path.dirname(os.path.abspath(path))
+    for raw in reader(path):
+        entry = resolve_entry(raw, base_dir)
+        if entry and (keep_urls or not is_url(entry)): yield entry
+
+
+class ExistenceChecker:
+    """
+    Answers "does this file exist" for many entries with one directory listing
+    per folder instead of one stat() per entry, which matters on network
+    shares. Misses fall back to os.path.exists for case-insensitive filesystems.
+    """
+    def __init__(self): self._listings = {}
+
+    def exists(self, path):
+        directory, name = os.path.split(path)
+        names = self._listings.get(directory, False)
+        if names is False:
+            try: names = frozenset(os.listdir(directory))
+            except OSError: names = None
+            self._listings[directory] = names
+        if names is not None and name in names: return True
+        return names is not None and os.path.exists(path)
+
+
+# --- Writers ---
+def _relative(path, base_dir):
+    try: return os.path.relpath(path, base_dir)
+    except ValueError: return path   # different drive on Windows
+
+
+def _location(path, base_dir):
+    if is_url(path): return path
+    if base_dir:
+        relative = _relative(path, base_dir)
+        if not os.path.isabs(relative): return quote(relative.replace(os.sep, "/"))
+    return pathlib.Path(path).as_uri()
+
+
+def write_playlist(path, entries, relative=True, describe=None):
+    """
+    Writes entries (paths or URLs) as M3U/M3U8, PLS or XSPF, chosen by the
+    extension of path. With relative=True, local paths are stored relative to
+    the playlist's folder where possible. describe(entry) may return
+    (duration_seconds or -1, title) for the #EXTINF/Length/title fields.
+    The file is streamed to a temporary name and swapped in. Returns the entry count.
+    """
+    kind = extension_of(path)
+    if kind not in _READERS: raise ValueError(f"Unsupported playlist format: {os.path.basename(path)}")
+    base_dir = os.path.dirname(os.path.abspath(path)) if relative else None
+    encoding = "utf-8-sig" if kind == ".m3u" and sys.platform == "win32" else "utf-8"
+    tmp_path = path + ".tmp"; count = 0
+    with open(tmp_path, "w", encoding=encoding, newline="\n") as f:
+        if kind in (".m3u", ".m3u8"):
+            f.write("#EXTM3U\n")
+            for entry in entries:
+                if describe:
+                    seconds, title = describe(entry); f.write(f"#EXTINF:{int(seconds)},{title}\n")
+                f.write((entry if is_url(entry) or not base_dir else _relative(entry, base_dir)) + "\n"); count += 1
+        elif kind == ".pls":
+            f.write("[playlist]\n")
+            for entry in entries:
+                count += 1
+                f.write(f"File{count}={entry if is_url(entry) or not base_dir else _relative(entry, base_dir)}\n")
+                if describe:
+                    seconds, title = describe(entry); f.write(f"Title{count}={title}\nLength{count}={int(seconds)}\n")
+            f.write(f"NumberOfEntries={count}\nVersion=2\n")
+        else:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n<playlist version="1" xmlns="http://xspf.org/ns/0/">\n  <trackList>\n')
+            for entry in entries:
+                f.write(f"    <track><location>{escape(_location(entry, base_dir))}</location>")
+                if describe:
+                    seconds, title = describe(entry)
+                    f.write(f"<title>{escape(title)}</title>")
+                    if seconds >= 0: f.write(f"<duration>{int(seconds * 1000)}</duration>")
+                f.write("</track>\n"); count += 1
+            f.write("  </trackList>\n</playlist>\n")
+    os.replace(tmp_path, path)
+    return count
+
+
+class PlaylistImporter(QObject):
+    """
+    Parses a playlist file on a background thread and streams existing entries
+    and stream URLs to the GUI in batches, so the first entries can play while
+    the rest of a long list is still being read. Missing files are skipped and counted.
+    """
+    batch_found = pyqtSignal(list)
+    progress = pyqtSignal(int, int)           # entries read, entries skipped as missing
+    finished = pyqtSignal(int, int, bool)     # entries added, entries missing, cancelled
+
+    def __init__(self, batch_size=256, flush_interval=0.1, parent=None):
+        super().__init__(parent)
+        self.batch_size = batch_size; self.flush_interval = flush_interval
+        self._cancel_event = threading.Event(); self._cancel_event.set(); self._thread = None
+
+    def is_running(self): return not self._cancel_event.is_set()
+
+    def start(self, playlist_paths):
+        """Imports one or more playlist files in order, cancelling any import still in progress."""
+        self.cancel()
+        if isinstance(playlist_paths, str): playlist_paths = [playlist_paths]
+        cancel_event = threading.Event(); self._cancel_event = cancel_event
+        self._thread = threading.Thread(target=self._run, args=(list(playlist_paths), cancel_event), name="PyPlayPlaylistImport", daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def shutdown(self):
+        self.cancel()
+        if self._thread is not None: self._thread.join(timeout=2.0); self._thread = None
+
+    def _run(self, playlist_paths, cancel_event):
+        checker = ExistenceChecker(); batch = []; read = added = missing = 0; last_flush = 0.0
+        for playlist_path in playlist_paths:
+            try:
+                for entry in iter_playlist(playlist_path, keep_urls=True):
+                    if cancel_event.is_set(): break
+                    read += 1
+                    if is_url(entry) or checker.exists(entry): batch.append(entry)
+                    else: missing += 1
+                    now = time.monotonic()
+                    if batch and (len(batch) >= self.batch_size or now - last_flush >= self.flush_interval):
+                        self.batch_found.emit(batch); self.progress.emit(read, missing)
+                        added += len(batch); batch = []; last_flush = now
+            except (OSError, ValueError, SyntaxError) as e:   # xml ParseError is a SyntaxError
+                print(f"Warning: Could not read playlist {playlist_path}: {e}", file=sys.stderr)
+        if batch and not cancel_event.is_set(): self.batch_found.emit(batch); added += len(batch)
+        cancelled = cancel_event.is_set(); cancel_event.set()
+        self.progress.emit(read, missing); self.finished.emit(added, missing, cancelled)
+        print(f"Playlist import finished: {added} entries added, {missing} missing files skipped ({len(playlist_paths)} playlist(s)).")
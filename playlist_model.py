@@ -0,0 +1,161 @@
+# playlist_model.py (Single compact playlist store behind a QListView)
+import os
+import sys
+from itertools import islice
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+from PyQt5.QtGui import QFont
+
+from playlist_search import PlaylistSearchIndex
+from media_formats import normalize_entry
+
+
+class PlaylistModel(QAbstractListModel):
+    """
+    The one and only playlist store. Entries are kept as a flat list of
+    normalized path strings (stream URLs as given) plus a persistent path -> row index, so dedupe and
+    lookup are O(1) and appends are O(batch). Display text is derived on demand
+    and never cached per entry, which keeps memory at one string per file.
+    The model also behaves like a read-only sequence of paths (len, [], in).
+    search_index mirrors every change for the playlist search box.
+    """
+    PathRole = Qt.UserRole
+    DurationRole = Qt.UserRole + 1
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._paths = []
+        self._rows = {}
+        self._current_row = -1
+        self._library = None; self._history = None
+        self.search_index = PlaylistSearchIndex()
+
+    def set_library(self, library):
+        """Attaches a MediaLibrary used for durations and tooltips."""
+        self._library = library
+        if self._paths: self.dataChanged.emit(self.index(0), self.index(len(self._paths) - 1), [self.DurationRole, Qt.ToolTipRole])
+
+    def set_history(self, history):
+        """Attaches a WatchHistory whose resume point and play count are shown in tooltips."""
+        self._history = history
+
+    def refresh_paths(self, paths):
+        """Repaints the rows of paths whose metadata changed."""
+        for path in paths:
+            row = self._rows.get(path)
+            if row is not None: idx = self.index(row); self.dataChanged.emit(idx, idx, [self.DurationRole, Qt.ToolTipRole])
+
+    # --- Sequence protocol ---
+    def __len__(self): return len(self._paths)
+    def __bool__(self): return bool(self._paths)
+    def __getitem__(self, row): return self._paths[row]
+    def __iter__(self): return iter(self._paths)
+    def __contains__(self, path): return path in self._rows
+
+    def paths(self): return list(self._paths)
+    def row_of(self, path): return self._rows.get(path, -1)
+
+    # --- QAbstractListModel ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._paths)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid(): return None
+        row = index.row()
+        if not 0 <= row < len(self._paths): return None
+        path = self._paths[row]
+        if role == Qt.DisplayRole: return os.path.basename(path)
+        if role == self.PathRole: return path
+        if role == self.DurationRole: return self._library.duration_ms(path) if self._library else None
+        if role == Qt.ToolTipRole: return self._describe(path)
+        if role == Qt.FontRole and row == self._current_row:
+            font = QFont(); font.setBold(True); return font
+        return None
+
+    def _describe(self, path):
+        record = self._library.get(path) if self._library else None
+        history = self._history.get(path) if self._history else None
+        details = []
+        if history and history["play_count"]:
+            resume_ms = self._history.resume_position(path)
+            seconds = int(resume_ms / 1000); resume = f", resume at {seconds // 60:02}:{seconds % 60:02}" if resume_ms else ""
+            details.append(f"played {history['play_count']}x{resume}")
+        if not record: return path + ("\n" + " | ".join(details) if details else "")
+        if record["title"]: details.append(record["title"] if not record["artist"] else f"{record['artist']} - {record['title']}")
+        if record["width"] and record["height"]: details.append(f"{record['width']}x{record['height']}")
+        codecs = " / ".join(c for c in (record["video_codec"], record["audio_codec"]) if c)
+        if codecs: details.append(codecs)
+        if record["audio_tracks"] and record["audio_tracks"] > 1: details.append(f"{record['audio_tracks']} audio tracks")
+        if record["subtitle_tracks"]: details.append(f"{record['subtitle_tracks']} subtitle tracks")
+        return path + ("\n" + " | ".join(details) if details else "")
+
+    def flags(self, index):
+        if not index.isValid(): return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemNeverHasChildren
+
+    # --- Mutation ---
+    def add_paths(self, file_paths):
+        """Appends new paths in one batch. Returns the row of the first added entry, or -1."""
+        new_paths = []; seen = self._rows; batch_seen = set()
+        for path in file_paths:
+            norm_path = normalize_entry(path)
+            if norm_path in seen or norm_path in batch_seen: continue
+            batch_seen.add(norm_path); new_paths.append(norm_path)
+        if not new_paths: return -1
+        first = len(self._paths); last = first + len(new_paths) - 1
+        self.search_index.add(new_paths)
+        self.beginInsertRows(QModelIndex(), first, last)
+        self._paths.extend(new_paths)
+        self._rows.update(zip(new_paths, range(first, last + 1)))
+        self.endInsertRows()
+        return first
+
+    def remove_rows(self, rows):
+        """Removes the given rows, one contiguous run at a time, and returns the removed paths."""
+        rows = sorted({r for r in rows if 0 <= r < len(self._paths)})
+        if not rows: return []
+        removed = []
+        runs = []; start = prev = rows[0]
+        for r in rows[1:]:
+            if r != prev + 1: runs.append((start, prev)); start = r
+            prev = r
+        runs.append((start, prev))
+        for first, last in reversed(runs):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            chunk = self._paths[first:last + 1]
+            del self._paths[first:last + 1]
+            for path in chunk: del self._rows[path]
+            removed.extend(chunk)
+            if self._current_row > last: self._current_row -= last - first + 1
+            elif self._current_row >= first: self._current_row = -1
+            self.endRemoveRows()
+        # Only rows behind the first removed one moved; reindex just that tail in a single pass.
+        first_moved = runs[0][0]
+        self._rows.update(zip(islice(self._paths, first_moved, None), range(first_moved, len(self._paths))))
+        self.search_index.remove(removed)
+        return removed
+
+    def remove_paths(self, paths):
+        return self.remove_rows([self._rows[p] for p in paths if p in self._rows])
+
+    def clear(self):
+        self.beginResetModel()
+        self._paths = []; self._rows = {}; self._current_row = -1; self.search_index.clear()
+        self.endResetModel()
+
+    # --- Current entry highlight ---
+    def current_row(self): return self._current_row
+
+    def set_current_row(self, row):
+        old_row, self._current_row = self._current_row, row if 0 <= row < len(self._paths) else -1
+        for r in (old_row, self._current_row):
+            if r >= 0: idx = self.index(r); self.dataChanged.emit(idx, idx, [Qt.FontRole])
+
+    # --- Diagnostics ---
+    def memory_usage(self):
+        """Measures the bytes held by the store (list, index and path strings)."""
+        list_bytes = sys.getsizeof(self._paths); index_bytes = sys.getsizeof(self._rows)
+        string_bytes = sum(map(sys.getsizeof, self._paths))
+        total = list_bytes + index_bytes + string_bytes; count = len(self._paths)
+        return {"entries": count, "list_bytes": list_bytes, "index_bytes": index_bytes, "string_bytes": string_bytes,
+                "total_bytes": total, "bytes_per_entry": (total / count) if count else 0.0}
@@ -0,0 +1,238 @@
+# playlist_search.py (Incremental substring search over the playlist and the filtering view model behind the search box)
+import time
+from bisect import bisect_left, bisect_right
+from itertools import accumulate, compress, repeat
+
+from PyQt5.QtCore import QAbstractProxyModel, QModelIndex, QTimer, pyqtSignal
+
+_SEPARATOR = "\0"          # never part of a path, so a term can't match across two entries
+_SPARSE_MATCHES = 48       # up to this many hits in a block, walk them with find() instead of testing every entry
+
+
+def search_key(path):
+    return path.lower()
+
+
+def query_terms(query):
+    """Lower-cased whitespace-separated terms; an entry matches when it contains all of them."""
+    return [term for term in query.lower().split() if term]
+
+
+def matches(path, terms):
+    key = search_key(path)
+    return all(term in key for term in terms)
+
+
+class _Block:
+    __slots__ = ("paths", "keys", "text", "offsets")
+
+    def __init__(self, paths, keys):
+        self.paths = paths; self.keys = keys; self.rebuild()
+
+    def rebuild(self):
+        self.text = _SEPARATOR.join(self.keys)
+        self.offsets = list(accumulate((len(k) + 1 for k in self.keys[:-1]), initial=0))
+
+
+class PlaylistSearchIndex:
+    """
+    Lower-cased path keys kept in insertion (i.e. playlist) order, grouped in
+    blocks of up to BLOCK_SIZE whose keys are also joined into one string. A
+    query first tests each block's joined text for every term - a C-speed
+    substring scan that skips most blocks outright - and only then looks at
+    the entries of blocks that can match. Appends touch the last block and
+    removals only the blocks that held removed paths, so the index is kept
+    current in O(batch + block) per change rather than rebuilt.
+
+    A per-entry trigram index prunes harder, but building one in Python costs
+    seconds at 200k entries; joined blocks give most of the pruning for the
+    price of one lower() and one join per entry.
+    """
+    BLOCK_SIZE = 1024
+
+    def __init__(self):
+        self._blocks = []; self._block_of = {}
+
+    def __len__(self): return len(self._block_of)
+
+    def add(self, paths):
+        """Appends paths (already deduplicated by the playlist) in order."""
+        paths = [p for p in paths if p not in self._block_of]
+        if not paths: return
+        start = 0
+        if self._blocks and len(self._blocks[-1].paths) < self.BLOCK_SIZE:
+            block = self._blocks[-1]; start = self.BLOCK_SIZE - len(block.paths)
+            chunk = paths[:start]
+            block.paths.extend(chunk); block.keys.extend(map(search_key, chunk)); block.rebuild()
+            for path in chunk: self._block_of[path] = block
+        for i in range(start, len(paths), self.BLOCK_SIZE):
+            chunk = paths[i:i + self.BLOCK_SIZE]; block = _Block(chunk, list(map(search_key, chunk)))
+            self._blocks.append(block)
+            for path in chunk: self._block_of[path] = block
+
+    def remove(self, paths):
+        touched = {}
+        for path in paths:
+            block = self._block_of.pop(path, None)
+            if block is not None: touched.setdefault(id(block), block)
+        if not touched: return
+        for block in touched.values():
+            kept = [(p, k) for p, k in zip(block.paths, block.keys) if p in self._block_of]
+            block.paths = [p for p, _ in kept]; block.keys = [k for _, k in kept]
+            if block.paths: block.rebuild()
+        self._blocks = [b for b in self._blocks if b.paths]
+
+    def clear(self):
+        self._blocks = []; self._block_of = {}
+
+    def search(self, terms):
+        """Yields, block by block and in playlist order, the lists of paths containing every term."""
+        if not terms: return
+        for block in list(self._blocks):
+            text = block.text
+            if not all(term in text for term in terms): continue
+            # Drive the block by its rarest term; the others are checked on those hits only.
+            counts = [text.count(term) for term in terms] if len(terms) > 1 else [text.count(terms[0])]
+            rarest = counts.index(min(counts)); first = terms[rarest]; rest = terms[:rarest] + terms[rarest + 1:]
+            keys = block.keys
+            if counts[rarest] <= _SPARSE_MATCHES:
+                hits = []; offsets = block.offsets; pos = text.find(first)
+                while pos >= 0:
+                    i = bisect_right(offsets, pos) - 1; hits.append(i)
+                    pos = text.find(first, offsets[i + 1]) if i + 1 < len(offsets) else -1
+            else:
+                hits = compress(range(len(keys)), map(str.__contains__, keys, repeat(first)))
+            if rest: hits = [i for i in hits if all(term in keys[i] for term in rest)]
+            found = [block.paths[i] for i in hits]
+            if found: yield found
+
+
+class PlaylistFilterModel(QAbstractProxyModel):
+    """
+    Shows the PlaylistModel rows matching the search text. With no text it is
+    a pass-through. A new query is answered from the index in time slices: the
+    first matches are inserted within one frame and the rest follow on later
+    event-loop turns, so typing never blocks on a common term at 200k entries.
+    Rows appended to or removed from the playlist while a filter is active are
+    matched or dropped individually.
+    """
+    search_finished = pyqtSignal(int)   # number of matching rows
+    SLICE_SECONDS = 0.006
+
+    def __init__(self, playlist, parent=None):
+        super().__init__(parent)
+        self._terms = []; self._rows = None; self._search = None; self._pending_removal = None
+        self._search_limit = 0; self._late_rows = []   # rows appended while a search runs are matched directly
+        self._continue_timer = QTimer(self); self._continue_timer.setSingleShot(True); self._continue_timer.setInterval(0)
+        self._continue_timer.timeout.connect(self._continue_search)
+        # A search interrupted by a removal restarts on the next event-loop turn, once the playlist has reindexed its rows and search index.
+        self._restart_timer = QTimer(self); self._restart_timer.setSingleShot(True); self._restart_timer.setInterval(0)
+        self._restart_timer.timeout.connect(self._restart_search)
+        self.setSourceModel(playlist)
+        playlist.rowsAboutToBeInserted.connect(self._source_rows_about_to_be_inserted); playlist.rowsInserted.connect(self._source_rows_inserted)
+        playlist.rowsAboutToBeRemoved.connect(self._source_rows_about_to_be_removed); playlist.rowsRemoved.connect(self._source_rows_removed)
+        playlist.modelAboutToBeReset.connect(self.beginResetModel); playlist.modelReset.connect(self._source_reset)
+        playlist.dataChanged.connect(self._source_data_changed)
+
+    def is_filtering(self): return self._rows is not None
+    def is_searching(self): return self._search is not None or self._restart_timer.isActive()
+    def query(self): return " ".join(self._terms)
+
+    def set_query(self, text):
+        terms = query_terms(text)
+        if terms == self._terms: return
+        self._terms = terms; self._search = None; self._continue_timer.stop(); self._restart_timer.stop()
+        self.beginResetModel()
+        self._rows = [] if terms else None
+        self.endResetModel()
+        if terms:
+            self._search_limit = len(self.sourceModel()); self._late_rows = []
+            self._search = self.sourceModel().search_index.search(terms); self._continue_search()
+        else:
+            self.search_finished.emit(len(self.sourceModel()))
+
+    def _continue_search(self):
+        if self._search is None: return
+        deadline = time.perf_counter() + self.SLICE_SECONDS; row_of = self.sourceModel().row_of; limit = self._search_limit; found = []
+        for paths in self._search:
+            found.extend(row for row in map(row_of, paths) if 0 <= row < limit)   # -1: removed since the search started
+            if time.perf_counter() >= deadline: break
+        else:
+            self._search = None; found.extend(self._late_rows); self._late_rows = []
+        if found:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(found) - 1); self._rows.extend(found); self.endInsertRows()
+        if self._search is not None: self._continue_timer.start()
+        else: self.search_finished.emit(len(self._rows))
+
+    def _restart_search(self):
+        terms, self._terms = self._terms, []
+        self.set_query(" ".join(terms))
+
+    # --- Source changes ---
+    def _source_rows_about_to_be_inserted(self, parent, first, last):
+        if self._rows is None: self.beginInsertRows(QModelIndex(), first, last)
+
+    def _source_rows_inserted(self, parent, first, last):
+        if self._rows is None: self.endInsertRows(); return
+        playlist = self.sourceModel()
+        added = [row for row in range(first, last + 1) if matches(playlist[row], self._terms)]
+        if self._search is not None: self._late_rows.extend(added); return
+        if not added: return
+        if self._rows and added[0] <= self._rows[-1]: self._restart_search(); return   # not an append; cannot happen today
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(added) - 1); self._rows.extend(added); self.endInsertRows()
+        self.search_finished.emit(len(self._rows))
+
+    def _source_rows_about_to_be_removed(self, parent, first, last):
+        if self._rows is None: self.beginRemoveRows(QModelIndex(), first, last); return
+        lo = bisect_left(self._rows, first); hi = bisect_right(self._rows, last)
+        self._pending_removal = (lo, hi, last - first + 1)
+        if hi > lo: self.beginRemoveRows(QModelIndex(), lo, hi - 1)
+
+    def _source_rows_removed(self, parent, first, last):
+        if self._rows is None: self.endRemoveRows(); return
+        lo, hi, count = self._pending_removal; self._pending_removal = None
+        self._rows[lo:] = [row - count for row in self._rows[hi:]]
+        if hi > lo: self.endRemoveRows()
+        if self._search is not None:   # block positions shifted under the running search
+            self._search = None; self._continue_timer.stop(); self._restart_timer.start()
+        else: self.search_finished.emit(len(self._rows))
+
+    def _source_reset(self):
+        if self._rows is not None: self._rows = []; self._search = None; self._continue_timer.stop()
+        self.endResetModel()
+        if self._terms: self._restart_search()
+
+    def _source_data_changed(self, top_left, bottom_right, roles=()):
+        if self._rows is None: self.dataChanged.emit(self.index(top_left.row(), 0), self.index(bottom_right.row(), 0), roles); return
+        lo = bisect_left(self._rows, top_left.row()); hi = bisect_right(self._rows, bottom_right.row())
+        if hi > lo: self.dataChanged.emit(self.index(lo, 0), self.index(hi - 1, 0), roles)
+
+    # --- QAbstractProxyModel ---
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid(): return 0
+        return len(self.sourceModel()) if self._rows is None else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()): return 0 if parent.isValid() else 1
+
+    def index(self, row, column=0, parent=QModelIndex()):
+        if parent.isValid() or column != 0 or not 0 <= row < self.rowCount(): return QModelIndex()
+        return self.createIndex(row, 0)
+
+    def parent(self, index=QModelIndex()): return QModelIndex()
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid(): return QModelIndex()
+        row = proxy_index.row() if self._rows is None else self._rows[proxy_index.row()]
+        return self.sourceModel().index(row)
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid(): return QModelIndex()
+        row = source_index.row()
+        if self._rows is None: return self.index(row)
+        pos = bisect_left(self._rows, row)
+        return self.index(pos) if pos < len(self._rows) and self._rows[pos] == row else QModelIndex()
+
+    def flags(self, index):
+        return self.sourceModel().flags(self.mapToSource(index))
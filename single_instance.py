@@ -0,0 +1,130 @@
+# single_instance.py (Hands command-line opens to an already running player over a local socket)
+import os
+import sys
+import json
+import time
+import getpass
+import hashlib
+
+from PyQt5.QtCore import QObject, QLockFile, pyqtSignal
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+
+from app_paths import APP_NAME, data_path
+
+CONNECT_TIMEOUT_MS = 200     # a live instance answers a local connect in well under a millisecond
+ACK_TIMEOUT_MS = 2000
+STARTUP_WAIT_S = 5.0         # how long to wait for an instance that holds the lock but is not listening yet
+LOCK_NAME = "instance.lock"
+
+
+def server_name():
+    """Per user and per data folder, so PYPLAY_HOME sandboxes (and other users) get their own instance."""
+    try: user = getpass.getuser()
+    except Exception: user = "user"
+    digest = hashlib.sha1(data_path().encode("utf-8", "surrogatepass")).hexdigest()[:10]
+    return f"{APP_NAME}-{user}-{digest}"
+
+
+def encode_request(paths, play_now=True):
+    # Paths are made absolute here: the running instance has its own working directory.
+    paths = [p if "://" in p else os.path.abspath(p) for p in paths]
+    return (json.dumps({"paths": paths, "play_now": bool(play_now)}) + "\n").encode("utf-8")
+
+
+def decode_request(line):
+    """Returns (paths, play_now) for one request line; raises ValueError when malformed."""
+    request = json.loads(line.decode("utf-8"))
+    paths = request.get("paths", []) if isinstance(request, dict) else None
+    if not isinstance(paths, list) or not all(isinstance(p, str) for p in paths): raise ValueError("bad request")
+    return paths, bool(request.get("play_now", True))
+
+
+def send_request(name, data, connect_timeout_ms=CONNECT_TIMEOUT_MS):
+    """True when a running instance acknowledged the request. Uses blocking QLocalSocket calls; no event loop needed."""
+    socket = QLocalSocket()
+    socket.connectToServer(name)
+    if not socket.waitForConnected(connect_timeout_ms): return False
+    socket.write(data)
+    if not socket.waitForBytesWritten(ACK_TIMEOUT_MS): socket.abort(); return False
+    acknowledged = socket.waitForReadyRead(ACK_TIMEOUT_MS) and socket.readLine().data().strip() == b"ok"
+    socket.disconnectFromServer()
+    if not acknowledged: print("Warning: The running PyPlay instance did not confirm the request.", file=sys.stderr)
+    return acknowledged   # unconfirmed: the caller retries or starts its own instance rather than dropping the paths
+
+
+def claim_or_forward(paths, play_now=True):
+    """
+    Called before any GUI module is loaded. Returns (forwarded, lock):
+    forwarded is True when another instance took the paths (the caller should
+    exit), otherwise lock is the held QLockFile that makes this process the
+    primary instance, or None if it runs as an independent one.
+    """
+    name = server_name(); data = encode_request(paths, play_now)
+    if send_request(name, data): return True, None
+    lock = QLockFile(data_path(LOCK_NAME)); lock.setStaleLockTime(0)   # stale only when the owning PID is gone
+    if lock.tryLock(0): return False, lock
+    # Another instance holds the lock but is still starting up (it listens once its window exists).
+    deadline = time.monotonic() + STARTUP_WAIT_S
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        if send_request(name, data): return True, None
+        if lock.tryLock(0): return False, lock   # it exited meanwhile
+    print("Warning: Another PyPlay instance is not responding; starting a separate one.", file=sys.stderr)
+    return False, None
+
+
+class InstanceServer(QObject):
+    """
+    Listens for requests from later launches: one JSON line
+    {"paths": [...], "play_now": bool} per connection, answered with "ok".
+    Only the lock holder listens, so a socket left behind by a crashed
+    instance can be removed safely before listening.
+    """
+    open_requested = pyqtSignal(list, bool)   # paths, play_now
+
+    def __init__(self, lock, parent=None):
+        super().__init__(parent)
+        self._lock = lock; self._buffers = {}
+        self.server = QLocalServer(self); self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self._new_connection)
+
+    def listen(self):
+        name = server_name()
+        QLocalServer.removeServer(name)
+        if not self.server.listen(name):
+            print(f"Warning: Single-instance server unavailable: {self.server.errorString()}", file=sys.stderr); return False
+        print(f"Listening for open requests on '{name}'.")
+        return True
+
+    def close(self):
+        self.server.close()
+        for socket in list(self._buffers): socket.abort()
+        self._buffers.clear()
+        if self._lock is not None: self._lock.unlock(); self._lock = None
+
+    def _new_connection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection(); self._buffers[socket] = b""
+            socket.readyRead.connect(lambda s=socket: self._read(s))
+            socket.disconnected.connect(lambda s=socket: self._dropped(s))
+            if socket.bytesAvailable(): self._read(socket)
+
+    def _read(self, socket):
+        buffer = self._buffers.get(socket)
+        if buffer is None: return
+        buffer += socket.readAll().data()
+        if b"\n" not in buffer:
+            if len(buffer) > 16 * 1024 * 1024: socket.abort()   # not a PyPlay client
+            else: self._buffers[socket] = buffer
+            return
+        line = buffer.split(b"\n", 1)[0]; self._buffers[socket] = b""
+        try:
+            paths, play_now = decode_request(line)
+        except ValueError as e:   # json.JSONDecodeError and UnicodeDecodeError are ValueErrors
+            print(f"Warning: Ignoring malformed open request: {e}", file=sys.stderr); socket.abort(); return
+        socket.write(b"ok\n"); socket.flush()
+        print(f"Open request from another launch: {len(paths)} path(s), {'play now' if play_now else 'enqueue'}.")
+        self.open_requested.emit(paths, play_now)
+
+    def _dropped(self, socket):
+        self._buffers.pop(socket, None); socket.deleteLater()
@@ -0,0 +1,106 @@
+# startup.py (Fast-start helpers: cached assets and a reproducible startup timing probe)
+import os
+import sys
+import json
+import time
+
+from PyQt5.QtCore import QCoreApplication, QObject, QThread, QTimer, Qt
+from PyQt5.QtGui import QIcon, QImage
+
+from app_paths import cache_path
+from playback_backend import PlaybackState
+
+ICON_SIZES = (16, 24, 32, 48, 64, 128, 256)
+
+
+def load_stylesheet(path):
+    """Reads the application stylesheet as text, or returns None if it is missing."""
+    try:
+        with open(path, "r", encoding="utf-8") as f: return f.read()
+    except OSError:
+        return None
+
+
+def cached_icon(source_path, sizes=ICON_SIZES):
+    """
+    Returns a QIcon backed by pre-scaled PNGs in the cache directory, so the
+    window system never has to decode and downscale the full-size artwork at
+    launch. The cache is rebuilt when the source file's size or mtime changes.
+    """
+    try: st = os.stat(source_path)
+    except OSError: return None
+    directory = cache_path("icons", f"{os.path.splitext(os.path.basename(source_path))[0]}-{st.st_size}-{st.st_mtime_ns}")
+    files = [os.path.join(directory, f"{size}.png") for size in sizes]
+    if not all(os.path.exists(f) for f in files):
+        image = QImage(source_path)
+        if image.isNull(): return None
+        try:
+            os.makedirs(directory, exist_ok=True)
+            for size, file_path in zip(sizes, files):
+                if size < max(image.width(), image.height()):
+                    image.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation).save(file_path, "PNG")
+                else:
+                    image.save(file_path, "PNG")
+        except OSError as e:
+            print(f"Warning: Could not cache icon sizes: {e}", file=sys.stderr)
+            return QIcon(source_path)
+    icon = QIcon()
+    for size, file_path in zip(sizes, files): icon.addFile(file_path)
+    return icon
+
+
+class StartupProbe(QObject):
+    """
+    Measures launch milestones relative to `started` (a time.perf_counter()
+    value taken as early as possible in main.py) and prints them as one JSON
+    line, then quits:
+
+      first_paint_ms   the main window painted for the first time
+      interactive_ms   the event loop was free to handle input after that paint
+      vlc_ready_ms     libvlc loaded and the player created
+      first_frame_ms   a video output opened for the first file (or playback
+                       started, for audio-only files); null without a file
+    """
+    def __init__(self, window, started, expect_media=False, timeout_s=30.0, out=None, parent=None):
+        super().__init__(parent)
+        self.window = window; self.started = started; self.expect_media = expect_media
+        self.out = out or sys.stdout; self.marks = {}; self._done = False
+        window.startup_stage.connect(self._stage)
+        window.media_controller.video_output_started.connect(lambda: self._mark("first_frame_ms"))
+        window.media_controller.playback_state_changed.connect(self._state_changed)
+        QTimer.singleShot(int(timeout_s * 1000), self._finish)
+
+    def _elapsed_ms(self): return round((time.perf_counter() - self.started) * 1000.0, 1)
+
+    def _mark(self, name):
+        if name not in self.marks: self.marks[name] = self._elapsed_ms()
+        if "interactive_ms" in self.marks and "vlc_ready_ms" in self.marks and (not self.expect_media or "first_frame_ms" in self.marks):
+            QTimer.singleShot(0, self._finish)
+
+    def _stage(self, stage):
+        if stage == "first_paint":
+            self._mark("first_paint_ms")
+            # A zero timer fires once the loop has drained the paint and any queued input.
+            QTimer.singleShot(0, lambda: self._mark("interactive_ms"))
+        elif stage == "vlc_ready":
+            self._mark("vlc_ready_ms")
+        elif stage == "vlc_failed":
+            QTimer.singleShot(0, self._finish)
+
+    def _state_changed(self, state):
+        path = self.window._current_media_path
+        if path and self.window._is_audio_only(path) and state == PlaybackState.Playing: self._mark("first_frame_ms")
+
+    def _finish(self):
+        if self._done: return
+        self._done = True
+        result = {name: self.marks.get(name) for name in ("first_paint_ms", "interactive_ms", "vlc_ready_ms", "first_frame_ms")}
+        result["media"] = self.window._current_media_path
+        print(json.dumps(result), file=self.out, flush=True)
+        self.window.close(); self._exit(0 if "vlc_ready_ms" in self.marks else 1)
+
+    def _exit(self, exit_code):
+        # QSplashScreen.finish() spins events while waiting for the window to be exposed, so the whole
+        # measurement can complete before app.exec_() starts; exit() is a no-op until a loop is running.
+        if QThread.currentThread().loopLevel() > 0: QCoreApplication.exit(exit_code)
+        else: QTimer.singleShot(10, lambda: self._exit(exit_code))
@@ -0,0 +1,223 @@
+# subtitles.py (SRT/VTT/ASS parsing, time-indexed cue lookup and sidecar subtitle discovery)
+import os
+import re
+import html
+import locale
+from bisect import bisect_left, bisect_right
+
+from media_formats import SUPPORTED_SUBTITLE_EXTENSIONS, extension_of
+
+NATIVE_SUBTITLE_EXTENSIONS = {".srt", ".vtt", ".ass", ".ssa"}   # .sub (MicroDVD/VobSub) is left to libvlc alone
+SUBTITLE_SUBFOLDERS = ("subs", "subtitles", "sub")
+
+_TIMING = re.compile(r"(?:(\d+):)?(\d{1,2}):(\d{1,2})[,.](\d{1,3})\s*-->\s*(?:(\d+):)?(\d{1,2}):(\d{1,2})[,.](\d{1,3})")
+_HTML_TAG = re.compile(r"</?[a-zA-Z][^>]*>|<\d[\d:.]*>")   # <i>, <font ...>, <c.yellow>, VTT karaoke <00:01.000>
+_ASS_OVERRIDE = re.compile(r"\{[^}]*\}")
+_ASS_DRAWING = re.compile(r"\\p[1-9]")
+
+
+class Cue:
+    __slots__ = ("start_ms", "end_ms", "text")
+
+    def __init__(self, start_ms, end_ms, text): self.start_ms = start_ms; self.end_ms = end_ms; self.text = text
+
+    def __repr__(self): return f"Cue({self.start_ms}, {self.end_ms}, {self.text!r})"
+
+
+def _ms(hours, minutes, seconds, fraction):
+    return ((int(hours or 0) * 60 + int(minutes)) * 60 + int(seconds)) * 1000 + int(fraction.ljust(3, "0")[:3])
+
+
+def _clean(text):
+    text = _ASS_OVERRIDE.sub("", text)          # SRT files often carry {\an8}-style tags too
+    return html.unescape(_HTML_TAG.sub("", text)).strip()
+
+
+def parse_srt(text):
+    """Parses SubRip (and WebVTT) cue blocks. Blocks without a timing line are skipped."""
+    cues = []
+    for block in re.split(r"\n\s*\n", text.replace("\r\n", "\n").replace("\r", "\n")):
+        lines = block.strip("\n").split("\n")
+        for i, line in enumerate(lines[:3]):   # an optional numeric/identifier line may precede the timing
+            match = _TIMING.search(line)
+            if match:
+                g = match.groups(); start = _ms(*g[:4]); end = _ms(*g[4:])
+                body = _clean("\n".join(lines[i + 1:]))
+                if body and end > start: cues.append(Cue(start, end, body))
+                break
+    return cues
+
+
+def parse_vtt(text):
+    # Same cue blocks as SRT; the header and NOTE/STYLE/REGION blocks have no timing line and are skipped.
+    return parse_srt(text)
+
+
+def parse_ass(text):
+    """Parses the [Events] Dialogue lines of SSA/ASS scripts, dropping override tags and drawings."""
+    cues = []; in_events = False; fields = None
+    for line in text.splitlines():
+        line = line.strip()
+        if line.startswith("["): in_events = line.lower() == "[events]"; continue
+        if not in_events: continue
+        key, _, value = line.partition(":")
+        if key == "Format": fields = [f.strip().lower() for f in value.split(",")]
+        elif key == "Dialogue" and fields:
+            parts = value.split(",", len(fields) - 1)
+            if len(parts) < len(fields): continue
+            record = dict(zip(fields, parts)); raw = record.get("text", "")
+            if _ASS_DRAWING.search(raw): continue
+            try:
+                start = _ms(*re.split(r"[:.]", record["start"].strip())); end = _ms(*re.split(r"[:.]", record["end"].strip()))
+            except (KeyError, TypeError, ValueError):
+                continue
+            body = _ASS_OVERRIDE.sub("", raw).replace("\\N", "\n").replace("\\n", "\n").replace("\\h", " ").strip()
+            if body and end > start: cues.append(Cue(start, end, body))
+    return cues
+
+
+_PARSERS = {".srt": parse_srt, ".vtt": parse_vtt, ".ass": parse_ass, ".ssa": parse_ass}
+
+
+def read_text(path):
+    """Decodes a subtitle file: UTF-8/UTF-16 by BOM or validity, else the Windows-1252 most legacy SRTs use."""
+    with open(path, "rb") as f: data = f.read()
+    if data.startswith((b"\xff\xfe", b"\xfe\xff")): return data.decode("utf-16")
+    try: return data.decode("utf-8-sig")
+    except UnicodeDecodeError: return data.decode("cp1252", errors="replace")
+
+
+def load_subtitle_file(path):
+    """Parses path into a SubtitleTrack. Raises ValueError for formats PyPlay does not parse itself."""
+    parser = _PARSERS.get(extension_of(path))
+    if parser is None: raise ValueError(f"Unsupported subtitle format: {os.path.basename(path)}")
+    return SubtitleTrack(parser(read_text(path)), path)
+
+
+class SubtitleTrack:
+    """
+    Cues sorted by start time plus an interval index: the timeline is cut at
+    every cue start and end into elementary segments, each storing the cues
+    active throughout it. Finding what is on screen at a time is one bisect,
+    O(log n), however the cues overlap.
+    """
+    def __init__(self, cues, path=None):
+        self.path = path
+        self.cues = sorted(cues, key=lambda c: (c.start_ms, c.end_ms))
+        self._starts = [c.start_ms for c in self.cues]
+        self._keys = None
+        # Sweep the sorted boundaries once; `active` keeps cue indices in start order.
+        boundaries = sorted({c.start_ms for c in self.cues} | {c.end_ms for c in self.cues})
+        ends_at = {}
+        for i, c in enumerate(self.cues): ends_at.setdefault(c.end_ms, []).append(i)
+        self._bounds = boundaries; self._segments = []; active = []; next_cue = 0
+        for t in boundaries:
+            if t in ends_at:
+                ended = set(ends_at[t]); active = [i for i in active if i not in ended]
+            while next_cue < len(self.cues) and self.cues[next_cue].start_ms == t: active.append(next_cue); next_cue += 1
+            self._segments.append(tuple(active))
+
+    def __len__(self): return len(self.cues)
+
+    def indices_at(self, time_ms):
+        """Indices of the cues showing at time_ms, in start order."""
+        k = bisect_right(self._bounds, time_ms) - 1
+        return self._segments[k] if k >= 0 else ()
+
+    def active_at(self, time_ms): return [self.cues[i] for i in self.indices_at(time_ms)]
+
+    def text_at(self, time_ms): return "\n".join(c.text for c in self.active_at(time_ms))
+
+    def next_index(self, time_ms):
+        """The first cue starting after time_ms, or -1."""
+        i = bisect_right(self._starts, time_ms)
+        return i if i < len(self.cues) else -1
+
+    def previous_index(self, time_ms, tolerance_ms=1000):
+        """The last cue starting before time_ms - tolerance_ms (so repeated presses keep going back), or -1."""
+        return bisect_left(self._starts, time_ms - tolerance_ms) - 1
+
+    def search(self, query):
+        """Indices of cues whose text contains every whitespace-separated term of query, ignoring case."""
+        terms = query.lower().split()
+        if not terms: return list(range(len(self.cues)))
+        if self._keys is None: self._keys = [c.text.lower().replace("\n", " ") for c in self.cues]
+        return [i for i, key in enumerate(self._keys) if all(t in key for t in terms)]
+
+
+def _preferred_languages():
+    code = (locale.getlocale()[0] or os.environ.get("LANG") or "en").split("_")[0].split(".")[0].lower()
+    return (code, "en") if code != "en" else ("en",)
+
+
+_LANGUAGE_ALIASES = {"en": ("en", "eng", "english"), "de": ("de", "ger", "deu", "german"), "fr": ("fr", "fre", "fra", "french"),
+                     "es": ("es", "spa", "spanish"), "it": ("it", "ita", "italian"), "nl": ("nl", "dut", "nld", "dutch"),
+                     "pt": ("pt", "por", "portuguese"), "ru": ("ru", "rus", "russian"), "ja": ("ja", "jpn", "japanese")}
+
+
+class SidecarFinder:
+    """
+    Finds subtitle files belonging to a media file: same folder or a Subs/
+    Subtitles subfolder, named after the media file (movie.srt, movie.en.srt,
+    movie.eng.forced.ass) or placed in Subs/<movie>/. Folder listings are
+    cached per directory and reused until the mtime of the directory or of
+    any subtitle folder below it changes, so a playlist of a thousand
+    episodes lists their folder once.
+    """
+    def __init__(self, extensions=SUPPORTED_SUBTITLE_EXTENSIONS, languages=None, max_directories=256):
+        self.extensions = {e.lower() for e in extensions}
+        self.languages = languages or _preferred_languages(); self.max_directories = max_directories
+        self._listings = {}; self.hits = 0; self.misses = 0
+
+    def _mtime(self, path):
+        try: return os.stat(path).st_mtime_ns
+        except OSError: return None
+
+    def _listing(self, directory):
+        """[(relative lower-case name without extension, extension, path)] of subtitles in directory and its subtitle subfolders."""
+        stamp = self._mtime(directory)
+        cached = self._listings.get(directory)
+        if cached and cached[0] == stamp and all(self._mtime(d) == m for d, m in cached[1]):
+            self.hits += 1; return cached[2]
+        self.misses += 1; entries = []; subfolders = []
+        try: names = os.listdir(directory)
+        except OSError: names = []
+        for name in names:
+            full = os.path.join(directory, name); ext = extension_of(name)
+            if ext in self.extensions: entries.append((name[:-len(ext)].lower(), ext, full))
+            elif name.lower() in SUBTITLE_SUBFOLDERS and os.path.isdir(full):
+                for root, _, files in os.walk(full):
+                    subfolders.append((root, self._mtime(root)))   # every level: a file added to Subs/<movie>/ only changes that folder's mtime
+                    prefix = os.path.relpath(root, full).lower().replace(os.sep, "/")
+                    for sub_name in files:
+                        sub_ext = extension_of(sub_name)
+                        if sub_ext in self.extensions:
+                            stem = sub_name[:-len(sub_ext)].lower()
+                            entries.append((stem if prefix == "." else f"{prefix}/{stem}", sub_ext, os.path.join(root, sub_name)))
+        if len(self._listings) >= self.max_directories: self._listings.clear()
+        self._listings[directory] = (stamp, subfolders, entries)
+        return entries
+
+    def _language_rank(self, tag):
+        parts = set(re.split(r"[._\- ]+", tag.lower()))
+        for rank, language in enumerate(self.languages):
+            if parts & set(_LANGUAGE_ALIASES.get(language, (language,))): return rank
+        return len(self.languages)
+
+    def candidates(self, media_path):
+        """Matching subtitle paths, best first."""
+        directory, name = os.path.split(os.path.abspath(media_path))
+        stem = os.path.splitext(name)[0].lower()
+        ranked = []
+        for sub_stem, ext, path in self._listing(directory):
+            if sub_stem == stem: tag = ""
+            elif sub_stem.startswith(stem + "."): tag = sub_stem[len(stem) + 1:]
+            elif sub_stem.startswith(stem + "/"): tag = sub_stem[len(stem) + 1:]   # Subs/<movie>/2_English.srt
+            else: continue
+            forced = "forced" in tag
+            ranked.append(((forced, 0 if not tag else 1 + self._language_rank(tag), ext not in NATIVE_SUBTITLE_EXTENSIONS, path), path))
+        return [path for _, path in sorted(ranked)]
+
+    def find(self, media_path):
+        found = self.candidates(media_path)
+        return found[0] if found else None
@@ -0,0 +1,268 @@
+# synthetic_backend.py (A playback engine that decodes nothing: made-up media on a clock, for load-testing the UI)
+import os
+import sys
+import time
+import zlib
+import ctypes
+import threading
+
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer
+
+from playback_backend import PlaybackBackend, PlaybackState, MEDIA_STAT_FIELDS
+from media_formats import is_audio_only, extension_of
+from subtitles import load_subtitle_file, NATIVE_SUBTITLE_EXTENSIONS
+
+DEFAULT_EVENT_RATE_HZ = 60       # libvlc sends time/position changes at roughly this rate while playing
+DEFAULT_FRAME_RATE = 25
+MIN_LENGTH_MS = 30 * 1000; MAX_LENGTH_MS = 20 * 60 * 1000
+
+
+def synthetic_length_ms(path):
+    """A stable made-up duration for path, so a given playlist always has the same total length."""
+    return MIN_LENGTH_MS + zlib.crc32(path.encode("utf-8", "surrogatepass")) % (MAX_LENGTH_MS - MIN_LENGTH_MS)
+
+
+def synthetic_playlist(count, per_folder=50):
+    """count made-up media paths in folders of per_folder entries; every seventh is audio-only."""
+    return [f"/synthetic/Artist {i // per_folder + 1:04}/clip {i + 1:06}{'.mp3' if i % 7 == 6 else '.mp4'}" for i in range(count)]
+
+
+class _VideoOutput:
+    """Stands in for a vlc.MediaPlayer when a frame_tap.FrameTap attaches itself."""
+    def __init__(self): self.callbacks = None; self.format = None
+    def video_set_callbacks(self, lock, unlock, display, opaque): self.callbacks = (lock, unlock, display)
+    def video_set_format(self, chroma, width, height, pitch): self.format = (width, height, pitch)
+
+
+class SyntheticBackend(PlaybackBackend):
+    """
+    Plays paths that need not exist. One clock thread advances the current
+    media at speed x the playback rate and reports time and position
+    event_rate_hz times per second, the way libvlc's event thread does, and
+    walks through Opening, Buffering, Playing and Ended with open_delay_ms
+    between the first steps. Durations come from a hash of the path. A
+    prepared next entry is swapped in gaplessly. Video entries "decode"
+    frame_rate frames per second while the video track is enabled; an
+    attached frame tap gets them as pictures filled with a moving gray
+    level. Nothing touches the disk except explicitly set subtitle files.
+    """
+    _advance_requested = pyqtSignal()
+    name = "synthetic"
+    decodes_files = False
+
+    def __init__(self, parent=None, event_rate_hz=DEFAULT_EVENT_RATE_HZ, speed=1.0, open_delay_ms=20, frame_rate=DEFAULT_FRAME_RATE):
+        super().__init__(parent)
+        self.event_rate_hz = max(1.0, float(event_rate_hz)); self.speed = max(0.01, float(speed))
+        self.open_delay_s = max(0.0, open_delay_ms / 1000.0); self.frame_rate = max(1.0, float(frame_rate))
+        self._lock = threading.Lock(); self._wake = threading.Event()
+        self._thread = None; self._running = False
+        self._state = PlaybackState.NothingSpecial; self._state_since = 0.0
+        self._current_media_path = None; self._length_ms = 0; self._time_ms = 0.0
+        self._next_media_path = None; self._next_start_ms = 0; self._pending_start_ms = 0
+        self._rate = 1.0; self._last_rate = 1.0; self._volume = 100; self._track_gain_db = 0.0
+        self._loop_enabled = False; self._vout_reported = False
+        self._video = _VideoOutput(); self._frame_seq = 0
+        self.events_posted = 0; self.frames_rendered = 0; self.frames_decoded = 0; self.media_loaded = 0
+        self._media_frames = 0   # decoded since the current media was opened (media_stats)
+        # States are emitted from the clock thread; timers and the loop restart are handled on the GUI thread.
+        self.playback_state_changed.connect(self._state_reached_gui)
+        self._advance_requested.connect(self._advance_to_prepared, Qt.QueuedConnection)
+        self._update_timer = QTimer(self); self._update_timer.setInterval(250)
+        self._update_timer.timeout.connect(self._check_rate)
+
+    # --- Lifecycle ---
+    def initialize(self, extra_args=None):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="PyPlaySyntheticClock", daemon=True); self._thread.start()
+        self.event_bridge.start()
+        print(f"Synthetic playback engine started ({self.event_rate_hz:g} events/s, speed x{self.speed:g}).")
+        return True
+
+    def is_ready(self): return self._running
+    def version_string(self): return f"synthetic engine ({self.event_rate_hz:g} events/s)"
+
+    def release_resources(self):
+        if self._update_timer.isActive(): self._update_timer.stop()
+        self._finish_stats()
+        if self.event_bridge.is_active():
+            self.event_bridge.stop(); stats = self.event_bridge.stats()
+            print(f"Event bridge: {stats['events_received']} engine events, {stats['snapshots_delivered']} UI snapshots ({stats['coalesced_ratio']:.0%} coalesced).")
+        self._running = False; self._wake.set()
+        if self._thread is not None: self._thread.join(timeout=2.0); self._thread = None
+        self._current_media_path = self._next_media_path = None
+
+    def resource_stats(self):
+        return {"media_loaded": self.media_loaded, "events_posted": self.events_posted, "frames_decoded": self.frames_decoded, "frames_rendered": self.frames_rendered}
+
+    def media_stats(self):
+        if not self._current_media_path: return None
+        stats = dict.fromkeys(MEDIA_STAT_FIELDS, 0)
+        stats["decoded_video"] = stats["displayed_pictures"] = self._media_frames
+        return stats
+
+    # --- Media ---
+    def load_media(self, file_path, start_ms=0):
+        if not self._running or not file_path: return False
+        self._begin_transition("prepared" if file_path == self._next_media_path else "cold", file_path)
+        if file_path == self._next_media_path: self._next_media_path = None
+        self._set_current_media(file_path, start_ms); return True
+
+    def _set_current_media(self, file_path, start_ms):
+        with self._lock:
+            self._current_media_path = file_path; self._length_ms = synthetic_length_ms(file_path)
+            self._time_ms = 0.0; self._pending_start_ms = max(0, int(start_ms or 0)); self._vout_reported = False; self._media_frames = 0
+            self._state = PlaybackState.NothingSpecial
+        self.media_loaded += 1; self.event_bridge.reset()
+        self.subtitle_track = None; self.subtitles_changed.emit(None)
+
+    def prepare_next(self, file_path, start_ms=0):
+        self._next_media_path = file_path or None; self._next_start_ms = max(0, int(start_ms or 0))
+
+    def clear_next(self): self._next_media_path = None
+
+    def _advance_to_prepared(self):
+        path, self._next_media_path = self._next_media_path, None
+        self.advance_pending = False
+        if not path: self._abandon_transition("nothing prepared"); return
+        self._set_current_media(path, self._next_start_ms); self.play()
+        self.media_advanced.emit(path)
+
+    # --- Clock thread ---
+    def _set_state(self, state):
+        """Called with self._lock held; the signal is emitted by the caller after releasing it."""
+        self._state = state; self._state_since = time.monotonic()
+        return state
+
+    def _run(self):
+        event_interval = 1.0 / self.event_rate_hz; frame_interval = 1.0 / self.frame_rate
+        last = time.monotonic(); next_event = last; next_frame = last
+        while self._running:
+            now = time.monotonic(); elapsed = now - last; last = now
+            emitted = []; advance = False; vout = False
+            with self._lock:
+                state = self._state
+                if state in (PlaybackState.Opening, PlaybackState.Buffering) and now - self._state_since >= self.open_delay_s:
+                    emitted.append(self._set_state(PlaybackState.Buffering if state == PlaybackState.Opening else PlaybackState.Playing))
+                    if emitted[-1] == PlaybackState.Playing:
+                        if self._pending_start_ms: self._time_ms = min(self._pending_start_ms, self._length_ms); self._pending_start_ms = 0
+                        vout = not self._vout_reported and self.has_video(); self._vout_reported = True
+                elif state == PlaybackState.Playing:
+                    self._time_ms += elapsed * 1000.0 * self.speed * self._rate
+                    if self._time_ms >= self._length_ms:
+                        self._time_ms = self._length_ms; emitted.append(self._set_state(PlaybackState.Ended))
+                        advance = not self._loop_enabled and self._next_media_path is not None
+                time_ms = int(self._time_ms); length = self._length_ms; playing = self._state == PlaybackState.Playing
+            if emitted and emitted[-1] == PlaybackState.Buffering:
+                self.event_bridge.post_length(length); self.duration_changed.emit(length)
+            if playing and now >= next_event:
+                self.event_bridge.post_time(time_ms); self.event_bridge.post_position(time_ms / length if length else 0.0)
+                self.events_posted += 2; next_event = max(next_event + event_interval, now - event_interval)
+            decoding = playing and self.video_enabled and self.has_video()
+            if decoding and now >= next_frame:
+                self.frames_decoded += 1; self._media_frames += 1
+                if self._video.callbacks: self._render_frame()
+                next_frame = max(next_frame + frame_interval, now - frame_interval)
+            for state in emitted:
+                if state == PlaybackState.Ended and advance:
+                    # Flag before emitting so the UI skips its own delayed _play_next.
+                    self.advance_pending = True; self._begin_transition("gapless", self._next_media_path)
+                elif state == PlaybackState.Playing: self._finish_transition()
+                self.playback_state_changed.emit(state)
+                if advance and state == PlaybackState.Ended: self._advance_requested.emit()
+            if vout: self.video_output_started.emit()
+            if playing: wait = (min(next_event, next_frame) if decoding else next_event) - time.monotonic()
+            elif self._state in (PlaybackState.Opening, PlaybackState.Buffering): wait = self._state_since + self.open_delay_s - time.monotonic()
+            else: wait = 0.5   # idle until play() wakes the clock
+            if wait > 0: self._wake.wait(wait); self._wake.clear()
+
+    def _render_frame(self):
+        lock, unlock, display = self._video.callbacks; width, height, pitch = self._video.format
+        planes = (ctypes.c_void_p * 3)()
+        picture = lock(None, planes)
+        if planes[0]: ctypes.memset(planes[0], self._frame_seq % 256, pitch * height)
+        unlock(None, picture, planes); display(None, picture)
+        self._frame_seq += 1; self.frames_rendered += 1
+
+    def _state_reached_gui(self, state):
+        if state == PlaybackState.Ended and self._loop_enabled and not self.advance_pending:
+            QTimer.singleShot(50, self.play)
+        elif state == PlaybackState.Playing and not self.idle and not self._update_timer.isActive():
+            self._update_timer.start()
+        elif state in (PlaybackState.Stopped, PlaybackState.Ended, PlaybackState.Error) and self._update_timer.isActive():
+            self._update_timer.stop()
+
+    def set_idle(self, idle):
+        if idle == self.idle: return
+        self.idle = idle
+        if idle: self._update_timer.stop()
+        elif self._state == PlaybackState.Playing: self._update_timer.start(); self._check_rate()
+
+    def _check_rate(self):
+        if self._rate != self._last_rate: self._last_rate = self._rate; self.rate_changed.emit(self._rate)
+
+    # --- Transport ---
+    def play(self):
+        with self._lock:
+            if not self._current_media_path: return
+            if self._state == PlaybackState.Paused: state = self._set_state(PlaybackState.Playing)
+            elif self._state in (PlaybackState.Opening, PlaybackState.Buffering, PlaybackState.Playing): return
+            else:
+                if self._state == PlaybackState.Ended: self._time_ms = 0.0
+                state = self._set_state(PlaybackState.Opening)
+        self.playback_state_changed.emit(state); self._wake.set()
+
+    def pause(self):
+        with self._lock:
+            if self._state != PlaybackState.Playing: return
+            state = self._set_state(PlaybackState.Paused)
+        self.playback_state_changed.emit(state)
+
+    def stop(self):
+        with self._lock:
+            if self._state in (PlaybackState.NothingSpecial, PlaybackState.Stopped): return
+            state = self._set_state(PlaybackState.Stopped); self._time_ms = 0.0
+        self.playback_state_changed.emit(state)
+
+    def seek(self, position_ratio):
+        with self._lock: self._time_ms = max(0.0, min(1.0, position_ratio)) * self._length_ms
+        self._wake.set()
+
+    def set_time_ms(self, time_ms):
+        with self._lock: self._time_ms = float(max(0, min(int(time_ms), self._length_ms)))
+        self._wake.set()
+
+    def get_time_ms(self): return int(self._time_ms) if self._current_media_path else 0
+    def get_duration_ms(self): return self._length_ms if self._current_media_path else 0
+    def get_state(self): return self._state
+    def set_playback_rate(self, rate): self._rate = max(0.25, min(4.0, rate))
+    def get_playback_rate(self): return self._rate
+    def set_loop_current(self, loop): self._loop_enabled = loop
+
+    # --- Tracks ---
+    def set_volume(self, volume): self._volume = max(0, min(100, volume))
+    def get_volume(self): return self._volume
+    def set_track_gain(self, gain_db): self._track_gain_db = max(-20.0, min(20.0, float(gain_db or 0.0)))
+    def get_track_gain(self): return self._track_gain_db
+    def get_audio_tracks(self): return [(1, "Synthetic tone")] if self._current_media_path else []
+    def get_current_audio_track(self): return 1 if self._current_media_path else -1
+    def set_audio_track(self, track_id): pass
+    def has_video(self): return bool(self._current_media_path) and not is_audio_only(self._current_media_path)
+    def set_aspect_ratio(self, ratio): pass
+    def set_video_enabled(self, enabled): self.video_enabled = enabled; self._wake.set()
+
+    def set_subtitle_file(self, subtitle_path):
+        if not (self._current_media_path and subtitle_path and os.path.exists(subtitle_path)): return False
+        track = None
+        if extension_of(subtitle_path) in NATIVE_SUBTITLE_EXTENSIONS:
+            try: track = load_subtitle_file(subtitle_path)
+            except (OSError, ValueError) as e: print(f"Warning: Could not parse subtitles {subtitle_path}: {e}", file=sys.stderr)
+        self.subtitle_track = track; self.subtitles_changed.emit(track); return True
+
+    # --- Frames ---
+    def set_video_widget(self, win_id): pass
+
+    def attach_frame_tap(self, frame_tap):
+        """The tap receives generated pictures of its own size at frame_rate while a video entry plays."""
+        frame_tap.attach(self._video); return True
+
+    def take_snapshot(self, save_path): return False
@@ -0,0 +1,174 @@
+# thumbnails.py (Seek-bar hover previews: background frame extraction and a bounded disk cache)
+import os
+import sys
+import hashlib
+import threading
+
+from lazy_import import lazy_import
+vlc = lazy_import("vlc")
+from PyQt5.QtCore import QObject, QBuffer, QByteArray, QIODevice, pyqtSignal
+from PyQt5.QtGui import QImage
+
+from app_paths import cache_path
+from video_frames import FrameGrabber, lower_current_thread_priority
+
+
+def file_identity(path):
+    """(path, size, mtime_ns) - changes whenever the file is replaced or rewritten."""
+    st = os.stat(path)
+    return path, st.st_size, st.st_mtime_ns
+
+
+class ThumbnailCache:
+    """
+    Size-bounded on-disk JPEG cache keyed by file identity and timestamp.
+    Least recently used entries (by file mtime, refreshed on hit) are evicted
+    once the total passes max_bytes.
+    """
+    def __init__(self, directory=None, max_bytes=256 * 1024 * 1024):
+        self.directory = directory or cache_path("thumbnails"); os.makedirs(self.directory, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock(); self._sizes = None; self._total = 0
+
+    @staticmethod
+    def key(identity, time_ms):
+        path, size, mtime_ns = identity
+        return hashlib.sha1(f"{path}\0{size}\0{mtime_ns}\0{int(time_ms)}".encode("utf-8", "surrogatepass")).hexdigest()
+
+    def _file(self, key): return os.path.join(self.directory, key[:2], key + ".jpg")
+
+    def _load_index(self):
+        if self._sizes is not None: return
+        self._sizes = {}; self._total = 0
+        for sub in os.scandir(self.directory):
+            if not sub.is_dir(): continue
+            for entry in os.scandir(sub.path):
+                if entry.name.endswith(".jpg"):
+                    size = entry.stat().st_size; self._sizes[entry.path] = size; self._total += size
+
+    def get(self, key):
+        file_path = self._file(key)
+        try:
+            with open(file_path, "rb") as f: data = f.read()
+            os.utime(file_path)
+            return data
+        except OSError:
+            return None
+
+    def put(self, key, data):
+        file_path = self._file(key); tmp_path = file_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with open(tmp_path, "wb") as f: f.write(data)
+            os.replace(tmp_path, file_path)
+        except OSError as e:
+            print(f"Warning: Could not write thumbnail cache entry: {e}", file=sys.stderr); return
+        with self._lock:
+            self._load_index()
+            self._total += len(data) - self._sizes.get(file_path, 0); self._sizes[file_path] = len(data)
+            if self._total > self.max_bytes: self._evict()
+
+    def _evict(self):
+        target = int(self.max_bytes * 0.9); entries = []
+        for file_path in self._sizes:
+            try: entries.append((os.stat(file_path).st_mtime, file_path))
+            except OSError: entries.append((0, file_path))
+        entries.sort()
+        for _, file_path in entries:
+            if self._total <= target: break
+            try: os.remove(file_path)
+            except OSError: pass
+            self._total -= self._sizes.pop(file_path, 0)
+
+
+class ThumbnailProvider(QObject):
+    """
+    Serves seek-bar previews. Requests are bucketed in time, answered from an
+    in-memory LRU, then the disk cache, and otherwise decoded by one
+    low-priority worker thread with its own libvlc instance. Only the most
+    recent request is kept while the worker is busy, so fast hovering never
+    builds a backlog.
+    """
+    thumbnail_ready = pyqtSignal(str, int, QImage)   # path, bucket time (ms), image
+
+    def __init__(self, cache=None, max_width=240, max_height=135, memory_items=256, parent=None):
+        super().__init__(parent)
+        self.cache = cache or ThumbnailCache()
+        self.max_width = max_width; self.max_height = max_height
+        self._memory = {}; self._memory_items = memory_items; self._memory_lock = threading.Lock()
+        self._condition = threading.Condition(); self._pending = None; self._closed = False
+        self._identities = {}; self._no_video = set()
+        self._thread = None
+
+    @staticmethod
+    def bucket_for(time_ms, duration_ms):
+        step = max(2000, int(duration_ms / 200)) if duration_ms > 0 else 2000
+        return int(time_ms // step) * step
+
+    def request(self, path, time_ms, duration_ms):
+        """Asks for the preview near time_ms. Returns the bucket time the answer will carry."""
+        bucket = self.bucket_for(time_ms, duration_ms)
+        with self._memory_lock:
+            image = self._memory.pop((path, bucket), None)
+            if image is not None: self._memory[(path, bucket)] = image
+        if image is not None:
+            self.thumbnail_ready.emit(path, bucket, image); return bucket
+        if path in self._no_video: return bucket
+        with self._condition:
+            self._pending = (path, bucket); self._condition.notify()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._worker, name="PyPlayThumbnails", daemon=True); self._thread.start()
+        return bucket
+
+    def _remember(self, path, bucket, image):
+        with self._memory_lock:
+            if len(self._memory) >= self._memory_items: self._memory.pop(next(iter(self._memory)))
+            self._memory[(path, bucket)] = image
+
+    def _identity(self, path):
+        identity = self._identities.get(path)
+        if identity is None: identity = self._identities[path] = file_identity(path)
+        return identity
+
+    def _worker(self):
+        lower_current_thread_priority()
+        instance = None; grabber = None
+        try:
+            while True:
+                with self._condition:
+                    while self._pending is None and not self._closed: self._condition.wait()
+                    if self._closed: return
+                    path, bucket = self._pending; self._pending = None
+                try:
+                    key = self.cache.key(self._identity(path), bucket)
+                    data = self.cache.get(key)
+                    if data is None:
+                        if instance is None:
+                            instance = vlc.Instance(["--quiet", "--no-audio", "--no-xlib", "--no-osd", "--no-spu", "--no-sub-autodetect-file"])
+                            grabber = FrameGrabber(instance, self.max_width, self.max_height)
+                        if not grabber.open(path): self._no_video.add(path); continue
+                        frame = grabber.grab(bucket)
+                        if frame is None: continue
+                        image = QImage(frame, grabber.width, grabber.height, grabber.width * 4, QImage.Format_RGB32).copy()
+                        data = self._encode(image); self.cache.put(key, data)
+                    else:
+                        image = QImage.fromData(data, "JPG")
+                    if image.isNull() or self._closed: continue
+                    self._remember(path, bucket, image)
+                    self.thumbnail_ready.emit(path, bucket, image)
+                except Exception as e:
+                    print(f"Warning: Thumbnail extraction failed for {path} @ {bucket} ms: {e}", file=sys.stderr)
+        finally:
+            if grabber is not None: grabber.close()
+            if instance is not None: instance.release()
+
+    @staticmethod
+    def _encode(image):
+        data = QByteArray(); buffer = QBuffer(data); buffer.open(QIODevice.WriteOnly)
+        image.save(buffer, "JPG", 80); buffer.close()
+        return bytes(data)
+
+    def shutdown(self):
+        with self._condition:
+            self._closed = True; self._condition.notify()
+        if self._thread is not None: self._thread.join(timeout=6.0); self._thread = None
@@ -0,0 +1,126 @@
+# tracing.py (Timed spans for startup, media opening, track changes and seeks, written as a Chrome trace)
+import os
+import sys
+import time
+import atexit
+import itertools
+import threading
+
+TRACE_ENV_VAR = "PYPLAY_TRACE"
+
+_events = None          # list of trace events while enabled, None when tracing is off
+_path = None
+_pid = os.getpid()
+_thread_names = {}
+_async_ids = itertools.count(1)
+
+
+def _now_us(): return time.perf_counter_ns() / 1000.0
+
+
+def _base(name, phase, ts):
+    tid = threading.get_ident()
+    if tid not in _thread_names: _thread_names[tid] = threading.current_thread().name
+    return {"name": name, "cat": "pyplay", "ph": phase, "ts": ts, "pid": _pid, "tid": tid}
+
+
+def enable(path):
+    """Starts recording; the trace is written to path at exit (or on write())."""
+    global _events, _path
+    if _events is None: _events = []; atexit.register(write)
+    _path = path
+
+
+def enabled(): return _events is not None
+
+
+class _Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args): self.name = name; self.args = args; self.start = 0.0
+
+    def set(self, **args): self.args.update(args)
+
+    def __enter__(self):
+        self.start = _now_us(); return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event = _base(self.name, "X", self.start); event["dur"] = _now_us() - self.start
+        if exc_type is not None: self.args["error"] = exc_type.__name__
+        if self.args: event["args"] = self.args
+        _events.append(event)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+    def set(self, **args): pass
+    def __enter__(self): return self
+    def __exit__(self, exc_type, exc, tb): return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name, **args):
+    """Context manager timing a block on the current thread. Returns a shared no-op object when tracing is off."""
+    if _events is None: return _NULL_SPAN
+    return _Span(name, args)
+
+
+def complete(name, start, end=None, **args):
+    """Records a span from perf_counter() values taken elsewhere (e.g. before tracing was importable)."""
+    if _events is None: return
+    end = time.perf_counter() if end is None else end
+    event = _base(name, "X", start * 1e6); event["dur"] = (end - start) * 1e6
+    if args: event["args"] = args
+    _events.append(event)
+
+
+def instant(name, **args):
+    if _events is None: return
+    event = _base(name, "i", _now_us()); event["s"] = "p"
+    if args: event["args"] = args
+    _events.append(event)
+
+
+def begin_async(name, **args):
+    """Opens a span that ends on another call or thread (e.g. an open ending at a libvlc event). Returns a token or None."""
+    if _events is None: return None
+    token = (name, next(_async_ids))
+    event = _base(name, "b", _now_us()); event["id"] = token[1]
+    if args: event["args"] = args
+    _events.append(event)
+    return token
+
+
+def end_async(token, **args):
+    if _events is None or token is None: return
+    event = _base(token[0], "e", _now_us()); event["id"] = token[1]
+    if args: event["args"] = args
+    _events.append(event)
+
+
+def write(path=None):
+    """Writes everything recorded so far in Chrome trace-event format (chrome://tracing, ui.perfetto.dev)."""
+    path = path or _path
+    if _events is None or not path or os.getpid() != _pid: return
+    import json
+    metadata = [{"name": "thread_name", "ph": "M", "pid": _pid, "tid": tid, "args": {"name": name}} for tid, name in list(_thread_names.items())]
+    metadata.append({"name": "process_name", "ph": "M", "pid": _pid, "tid": 0, "args": {"name": "PyPlay"}})
+    try:
+        with open(path, "w", encoding="utf-8") as f: json.dump({"traceEvents": metadata + list(_events), "displayTimeUnit": "ms"}, f)
+        print(f"Trace written to {path} ({len(_events)} events).", file=sys.stderr)
+    except OSError as e:
+        print(f"Warning: Could not write trace file {path}: {e}", file=sys.stderr)
+
+
+def _enable_from_environment():
+    path = os.environ.get(TRACE_ENV_VAR)
+    if not path: return
+    # Worker processes (contact sheets, analysis pools) inherit the variable but must not overwrite the trace.
+    import multiprocessing
+    if multiprocessing.parent_process() is None: enable(path)
+
+
+_enable_from_environment()
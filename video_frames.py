@@ -0,0 +1,128 @@
+# video_frames.py (Off-screen frame decoding through libvlc video callbacks)
+import os
+import sys
+import ctypes
+import threading
+
+from lazy_import import lazy_import
+vlc = lazy_import("vlc")
+
+VIDEO_CHROMA = "RV32"   # 32-bit BGRX in memory on little-endian hosts (QImage.Format_RGB32)
+BYTES_PER_PIXEL = 4
+
+
+class AlignedFrameBuffer:
+    """A preallocated picture buffer aligned on the 32-byte boundary libvlc requires for its planes."""
+    ALIGNMENT = 32
+
+    def __init__(self, size):
+        self.size = size
+        self._raw = (ctypes.c_ubyte * (size + self.ALIGNMENT))()
+        base = ctypes.addressof(self._raw); self.offset = (-base) % self.ALIGNMENT
+        self.address = base + self.offset
+
+    def view(self):
+        """Zero-copy view of the picture bytes."""
+        return memoryview(self._raw)[self.offset:self.offset + self.size]
+
+    def copy(self): return ctypes.string_at(self.address, self.size)
+
+
+def source_video_size(media, timeout_ms=3000):
+    """Parses media (if needed) and returns (width, height) of its first video track, or None."""
+    if media.get_parsed_status() != vlc.MediaParsedStatus.done:
+        parsed = threading.Event(); events = media.event_manager()
+        events.event_attach(vlc.EventType.MediaParsedChanged, lambda e: parsed.set())
+        try:
+            media.parse_with_options(vlc.MediaParseFlag.local, timeout_ms)
+            parsed.wait(timeout_ms / 1000.0 + 0.5)
+        finally:
+            try: events.event_detach(vlc.EventType.MediaParsedChanged)
+            except Exception: pass
+    for track in media.tracks_get() or []:
+        if track.type == vlc.TrackType.video and track.video:
+            width, height = track.video.contents.width, track.video.contents.height
+            if width and height:
+                sar_num, sar_den = track.video.contents.sar_num, track.video.contents.sar_den
+                if sar_num and sar_den and sar_num != sar_den: width = width * sar_num // sar_den
+                return width, height
+    return None
+
+
+def fit_size(width, height, max_width, max_height):
+    """Scales (width, height) into the box keeping the aspect ratio, with even dimensions."""
+    scale = min(max_width / float(width), max_height / float(height), 1.0)
+    return max(2, int(width * scale) & ~1), max(2, int(height * scale) & ~1)
+
+
+class FrameGrabber:
+    """
+    Decodes single frames of one file into memory using a private media player
+    with video callbacks, so the on-screen player is never touched. Each grab
+    opens the file at the requested time (keyframe-accurate fast seek), waits
+    for the first displayed picture and stops again.
+    """
+    def __init__(self, instance, max_width=320, max_height=180):
+        self.instance = instance; self.max_width = max_width; self.max_height = max_height
+        self.player = instance.media_player_new()
+        self.path = None; self.width = self.height = 0
+        self._buffer = None; self._frame = None
+        self._frame_ready = threading.Event(); self._wanted = False
+        # Keep references to the ctypes callbacks for as long as the player lives.
+        self._lock_cb = vlc.CallbackDecorators.VideoLockCb(self._lock)
+        self._unlock_cb = vlc.CallbackDecorators.VideoUnlockCb(self._unlock)
+        self._display_cb = vlc.CallbackDecorators.VideoDisplayCb(self._display)
+        self.player.video_set_callbacks(self._lock_cb, self._unlock_cb, self._display_cb, None)
+
+    def _lock(self, opaque, planes):
+        planes[0] = self._buffer.address
+        return None
+
+    def _unlock(self, opaque, picture, planes):
+        pass
+
+    def _display(self, opaque, picture):
+        if self._wanted:
+            self._wanted = False; self._frame = self._buffer.copy(); self._frame_ready.set()
+
+    def open(self, path):
+        """Prepares the grabber for path. Returns (width, height) of the output frames, or None for audio-only files."""
+        if path == self.path and self._buffer is not None: return self.width, self.height
+        media = self.instance.media_new_path(path)
+        try: size = source_video_size(media)
+        finally: media.release()
+        if not size: self.path = None; return None
+        self.width, self.height = fit_size(size[0], size[1], self.max_width, self.max_height)
+        self._buffer = AlignedFrameBuffer(self.width * self.height * BYTES_PER_PIXEL)
+        self.player.video_set_format(VIDEO_CHROMA, self.width, self.height, self.width * BYTES_PER_PIXEL)
+        self.path = path
+        return self.width, self.height
+
+    def grab(self, time_ms, timeout=5.0):
+        """Returns the BGRX bytes of the frame at time_ms, or None on timeout/error."""
+        if self.path is None: return None
+        media = self.instance.media_new_path(self.path)
+        for option in (f":start-time={max(0, time_ms) / 1000.0:.3f}", ":input-fast-seek", ":no-audio", ":no-spu"):
+            media.add_option(option)
+        self._frame = None; self._frame_ready.clear(); self._wanted = True
+        try:
+            self.player.set_media(media)
+            if self.player.play() == -1: return None
+            if not self._frame_ready.wait(timeout): return None
+            return self._frame
+        finally:
+            self._wanted = False
+            self.player.stop(); media.release()
+
+    def close(self):
+        if self.player is not None:
+            try: self.player.stop(); self.player.release()
+            except Exception: pass
+            self.player = None
+
+
+def lower_current_thread_priority(nice_increment=10):
+    """Best effort: lowers the calling thread's priority. libvlc threads started from it inherit the value on Linux."""
+    if sys.platform.startswith("linux"):
+        try: os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), min(19, os.getpriority(os.PRIO_PROCESS, 0) + nice_increment))
+        except (OSError, AttributeError): pass
@@ -0,0 +1,145 @@
+# watch_history.py (Per-file resume positions, last-played times and play counts with write-behind persistence)
+import sys
+import time
+import sqlite3
+import threading
+
+from app_paths import data_path
+
+HISTORY_DB_NAME = "history.sqlite3"
+RESUME_MIN_MS = 5000          # positions closer to the start than this are not worth resuming
+RESUME_END_MARGIN_MS = 15000  # ...and neither are positions this close to the end (treated as finished)
+
+
+class WatchHistory:
+    """
+    SQLite-backed watch history keyed by path. Position updates (several per
+    second while playing) only replace an entry in an in-memory dict; a
+    background thread writes the dirty entries in one transaction every
+    flush_interval seconds, or sooner once max_pending paths are dirty.
+    Lookups consult the pending entries first, then the primary-key index,
+    so cost stays flat at hundreds of thousands of files.
+    """
+    def __init__(self, db_path=None, flush_interval=5.0, max_pending=512):
+        self.db_path = db_path or data_path(HISTORY_DB_NAME)
+        self.flush_interval = flush_interval; self.max_pending = max_pending
+        self._lock = threading.Lock()   # guards the connection
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL"); self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS history (
+            path TEXT PRIMARY KEY, position_ms INTEGER NOT NULL DEFAULT 0, duration_ms INTEGER NOT NULL DEFAULT 0,
+            last_played REAL NOT NULL DEFAULT 0, play_count INTEGER NOT NULL DEFAULT 0) WITHOUT ROWID""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS history_last_played ON history (last_played)")
+        self._conn.commit()
+        # path -> [position_ms, duration_ms, last_played, play_count_delta]
+        self._pending = {}; self._condition = threading.Condition(); self._closed = False
+        self.flushes = 0; self.rows_written = 0; self.updates = 0
+        self._thread = threading.Thread(target=self._flush_loop, name="PyPlayHistory", daemon=True); self._thread.start()
+
+    # --- Updates (any thread; never touch the database) ---
+    def _entry(self, path):
+        entry = self._pending.get(path)
+        if entry is None:
+            entry = self._pending[path] = [None, None, 0.0, 0]
+            if len(self._pending) >= self.max_pending: self._condition.notify()
+        return entry
+
+    def update_position(self, path, position_ms, duration_ms=0):
+        if not path or position_ms is None or position_ms < 0: return
+        with self._condition:
+            entry = self._entry(path); self.updates += 1
+            entry[0] = int(position_ms); entry[2] = time.time()
+            if duration_ms and duration_ms > 0: entry[1] = int(duration_ms)
+
+    def record_play(self, path):
+        """Counts a playback start and stamps last-played."""
+        if not path: return
+        with self._condition:
+            entry = self._entry(path); entry[2] = time.time(); entry[3] += 1
+
+    def mark_finished(self, path):
+        """Playback reached the end: the next open starts from the beginning."""
+        if not path: return
+        with self._condition:
+            entry = self._entry(path); entry[0] = 0; entry[2] = time.time()
+
+    # --- Queries ---
+    def get(self, path):
+        """Returns {"position_ms", "duration_ms", "last_played", "play_count"} for path, or None."""
+        with self._lock:   # flush() swaps and commits under this lock, so pending + stored never double count
+            with self._condition: pending = list(self._pending.get(path) or ()) or None
+            row = self._conn.execute("SELECT position_ms, duration_ms, last_played, play_count FROM history WHERE path = ?", (path,)).fetchone()
+        if row is None and pending is None: return None
+        position_ms, duration_ms, last_played, play_count = row or (0, 0, 0.0, 0)
+        if pending is not None:
+            if pending[0] is not None: position_ms = pending[0]
+            if pending[1] is not None: duration_ms = pending[1]
+            last_played = max(last_played, pending[2]); play_count += pending[3]
+        return {"position_ms": position_ms, "duration_ms": duration_ms, "last_played": last_played, "play_count": play_count}
+
+    def resume_position(self, path):
+        """The saved position worth resuming from, in ms, or 0."""
+        record = self.get(path)
+        if not record: return 0
+        position_ms, duration_ms = record["position_ms"], record["duration_ms"]
+        if position_ms < RESUME_MIN_MS: return 0
+        if duration_ms and position_ms > duration_ms - RESUME_END_MARGIN_MS: return 0
+        return position_ms
+
+    def recent(self, limit=50):
+        """Most recently played paths, newest first (pending entries included)."""
+        self.flush()
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT path FROM history ORDER BY last_played DESC LIMIT ?", (limit,))]
+
+    def __len__(self):
+        self.flush()
+        with self._lock: return self._conn.execute("SELECT COUNT(*) FROM history").fetchone()[0]
+
+    # --- Persistence ---
+    def flush(self):
+        """Writes all pending entries in one transaction. Returns the number of rows written."""
+        with self._lock:
+            with self._condition:
+                if not self._pending: return 0
+                pending, self._pending = self._pending, {}
+            rows = [(path, 0 if e[0] is None else e[0], 0 if e[1] is None else e[1], e[2], e[3],
+                     int(e[0] is not None), int(e[1] is not None)) for path, e in pending.items()]
+            try:
+                # One UPSERT per dirty path: only the fields that were actually updated overwrite stored values.
+                self._conn.executemany("""INSERT INTO history (path, position_ms, duration_ms, last_played, play_count)
+                    VALUES (?1, ?2, ?3, ?4, ?5)
+                    ON CONFLICT(path) DO UPDATE SET
+                        position_ms = CASE WHEN ?6 THEN excluded.position_ms ELSE position_ms END,
+                        duration_ms = CASE WHEN ?7 THEN excluded.duration_ms ELSE duration_ms END,
+                        last_played = MAX(last_played, excluded.last_played),
+                        play_count = play_count + excluded.play_count""", rows)
+                self._conn.commit()
+            except sqlite3.Error as e:
+                print(f"Warning: Could not write watch history ({len(rows)} entries dropped): {e}", file=sys.stderr)
+                return 0
+        self.flushes += 1; self.rows_written += len(rows)
+        return len(rows)
+
+    def _flush_loop(self):
+        while True:
+            with self._condition:
+                if not self._closed and len(self._pending) < self.max_pending: self._condition.wait(self.flush_interval)
+                closed = self._closed
+            self.flush()
+            if closed: return
+
+    def stats(self):
+        return {"updates": self.updates, "flushes": self.flushes, "rows_written": self.rows_written}
+
+    def close(self):
+        with self._condition:
+            if self._closed: return
+            self._closed = True; self._condition.notify()
+        self._thread.join(timeout=5.0)
+        self.flush()
+        stats = self.stats()
+        print(f"Watch history: {stats['updates']} position updates written as {stats['rows_written']} rows in {stats['flushes']} flushes.")
+        with self._lock:
+            try: self._conn.close()
+            except Exception: pass